@@ -1,10 +1,35 @@
+import os
 import streamlit as st
-import pandas as pd
-import psycopg2
-from psycopg2.extras import RealDictCursor
 from datetime import datetime
-import plotly.express as px
-import plotly.graph_objects as go
+from functools import partial
+
+# pandas, plotly, csv_import and export are imported by the pages that use them,
+# so the Dashboard and form pages don't pay for them on a cold start
+from sports_data import analytics, async_queries, cache, db, deletion, fixtures, live, metrics, result_queue, standings
+from sports_data.queries import (
+    get_tournaments,
+    get_teams,
+    search_teams,
+    get_tournament_stats,
+    get_matches,
+    get_match_frame,
+    get_tournament_summaries,
+    get_standings,
+    get_team_analytics,
+    get_team_stats,
+    get_head_to_head,
+    get_tie_breakers,
+    get_fair_play_teams,
+    set_tie_breakers,
+    set_fair_play,
+    add_tournament,
+    delete_tournament,
+    add_team,
+    add_match,
+    resume_pending_work,
+    listen_for_changes,
+    TEAM_SEARCH_LIMIT,
+)
 
 # -------------------------
 # Page Configuration
@@ -112,251 +137,98 @@ st.markdown("""
 # -------------------------
 # Connect to PostgreSQL DB
 # -------------------------
-def get_connection():
-    return psycopg2.connect(
-        host="localhost",
-        user="shreyavarma",
-        password="441107",
-        database="Sports_Event_Tracker"
-    )
-
-# -------------------------
-# Helper functions
-# -------------------------
-def get_tournaments():
-    conn = get_connection()
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
-    try:
-        cursor.execute("SELECT tournament_id, name, start_date, end_date FROM Tournaments ORDER BY tournament_id")
-        tournaments = cursor.fetchall()
-        return tournaments
-    finally:
-        cursor.close()
-        conn.close()
-
-def get_teams(tournament_id):
-    conn = get_connection()
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
-    try:
-        cursor.execute("SELECT team_id, name FROM Teams WHERE tournament_id=%s ORDER BY team_id", (tournament_id,))
-        teams = cursor.fetchall()
-        return teams
-    finally:
-        cursor.close()
-        conn.close()
-
-def get_matches():
-    conn = get_connection()
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
-    try:
-        cursor.execute("""
-            SELECT m.match_id, t1.name AS team1_name, t2.name AS team2_name, 
-                   t.name AS tournament_name, m.match_date, m.team1_score, m.team2_score
-            FROM Matches m
-            JOIN Teams t1 ON m.team1_id = t1.team_id
-            JOIN Teams t2 ON m.team2_id = t2.team_id
-            JOIN Tournaments t ON m.tournament_id = t.tournament_id
-            ORDER BY m.match_date DESC, m.match_id
-        """)
-        matches = cursor.fetchall()
-        return matches
-    finally:
-        cursor.close()
-        conn.close()
-
-def get_tournament_stats(tournament_id):
-    conn = get_connection()
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
-    try:
-        # Get team count
-        cursor.execute("SELECT COUNT(*) as team_count FROM Teams WHERE tournament_id=%s", (tournament_id,))
-        team_count = cursor.fetchone()['team_count']
-        
-        # Get match count
-        cursor.execute("SELECT COUNT(*) as match_count FROM Matches WHERE tournament_id=%s", (tournament_id,))
-        match_count = cursor.fetchone()['match_count']
-        
-        # Get completed matches
-        cursor.execute("SELECT COUNT(*) as completed FROM Matches WHERE tournament_id=%s AND team1_score IS NOT NULL", (tournament_id,))
-        completed = cursor.fetchone()['completed']
-        
-        return team_count, match_count, completed
-    finally:
-        cursor.close()
-        conn.close()
-
-# -------------------------
-# Insert tournament
-# -------------------------
-def add_tournament(name, start_date, end_date):
-    conn = get_connection()
-    cursor = conn.cursor()
+# Settings come from the environment (see sports_data/db.py); a [postgres] section in
+# .streamlit/secrets.toml overrides them.
+def get_db_settings():
     try:
-        cursor.execute(
-            "INSERT INTO Tournaments (name, start_date, end_date) VALUES (%s, %s, %s)",
-            (name, start_date, end_date)
-        )
-        conn.commit()
-    finally:
-        cursor.close()
-        conn.close()
+        return dict(st.secrets.get("postgres", {}))
+    except FileNotFoundError:
+        return {}
 
-# -------------------------
-# Delete tournament
-# -------------------------
-def delete_tournament(tournament_id):
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute("DELETE FROM Matches WHERE tournament_id=%s", (tournament_id,))
-        cursor.execute("DELETE FROM Points_Table WHERE tournament_id=%s", (tournament_id,))
-        cursor.execute("DELETE FROM Teams WHERE tournament_id=%s", (tournament_id,))
-        cursor.execute("DELETE FROM Tournaments WHERE tournament_id=%s", (tournament_id,))
-        conn.commit()
-    finally:
-        cursor.close()
-        conn.close()
-
-# -------------------------
-# Insert team
-# -------------------------
-def add_team(tournament_id, name):
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute(
-            "INSERT INTO Teams (tournament_id, name) VALUES (%s, %s)",
-            (tournament_id, name)
-        )
-        conn.commit()
-    finally:
-        cursor.close()
-        conn.close()
+db.configure(get_db_settings())
 
 # -------------------------
-# Insert match
+# Main UI
 # -------------------------
-def add_match(tournament_id, team1_id, team2_id, match_date):
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute(
-            "INSERT INTO Matches (tournament_id, team1_id, team2_id, match_date, team1_score, team2_score, winner_id) VALUES (%s, %s, %s, %s, %s, %s, %s)",
-            (tournament_id, team1_id, team2_id, match_date, None, None, None)  # Ensure scores are NULL
-        )
-        conn.commit()
-    finally:
-        cursor.close()
-        conn.close()
+RESULTS_PAGE_SIZE = 50
+# Highest score the forms accept; far above any real result, far below int4
+MAX_SCORE = 999
+TEAMS_PAGE_SIZE = 50
+MATCHDAY_LIMIT = 500
+# How often an open page checks whether its data changed (in memory only)
+LIVE_REFRESH_SECONDS = 2
 
-# -------------------------
-# Update match result + points table
-# -------------------------
-def update_match_result(match_id, team1_score, team2_score):
-    conn = get_connection()
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
-    try:
-        cursor.execute(
-            "SELECT team1_id, team2_id, tournament_id FROM Matches WHERE match_id=%s",
-            (match_id,)
-        )
-        match = cursor.fetchone()
-        team1_id = match['team1_id']
-        team2_id = match['team2_id']
-        tournament_id = match['tournament_id']
-
-        if team1_score > team2_score:
-            winner_id = team1_id
-            loser_id = team2_id
-            winner_points, loser_points = 2, 0
-        elif team2_score > team1_score:
-            winner_id = team2_id
-            loser_id = team1_id
-            winner_points, loser_points = 2, 0
+@st.fragment(run_every=1)
+def show_deletion_progress(deleting):
+    # Polls the in-process job state only; no queries until a job finishes
+    all_done = True
+    for tournament in deleting:
+        job = deletion.get_job(tournament['tournament_id'])
+        if job is not None and job.state == "done":
+            st.progress(1.0, text=f"🗑️ {tournament['name']}: deleted")
+            continue
+        all_done = False
+        if job is None:
+            st.info(f"🗑️ {tournament['name']}: being deleted by another server")
+        elif job.state == "failed":
+            st.error(f"❌ {tournament['name']}: deletion failed ({job.error})")
+            if st.button("🔁 Retry", key=f"retry_delete_{tournament['tournament_id']}"):
+                delete_tournament(tournament['tournament_id'])
         else:
-            winner_id = None
-            winner_points = loser_points = 1
-
-        cursor.execute(
-            "UPDATE Matches SET team1_score=%s, team2_score=%s, winner_id=%s WHERE match_id=%s",
-            (team1_score, team2_score, winner_id, match_id)
-        )
-
-        for team_id in [team1_id, team2_id]:
-            cursor.execute(
-                "SELECT * FROM Points_Table WHERE team_id=%s AND tournament_id=%s",
-                (team_id, tournament_id)
+            st.progress(
+                job.fraction_done,
+                text=f"🗑️ {tournament['name']}: {job.deleted:,}/{job.total:,} rows removed"
             )
-            existing = cursor.fetchone()
-            if existing:
-                cursor.execute("""
-                    UPDATE Points_Table
-                    SET matches_played = matches_played + 1,
-                        wins = wins + %s,
-                        losses = losses + %s,
-                        draws = draws + %s,
-                        points = points + %s
-                    WHERE team_id=%s AND tournament_id=%s
-                """, (
-                    1 if team_id == winner_id else 0,
-                    1 if winner_id and team_id != winner_id else 0,
-                    1 if winner_id is None else 0,
-                    winner_points if team_id == winner_id else (loser_points if winner_id else 1),
-                    team_id,
-                    tournament_id
-                ))
-            else:
-                cursor.execute("""
-                    INSERT INTO Points_Table (tournament_id, team_id, matches_played, wins, losses, draws, points)
-                    VALUES (%s, %s, 1, %s, %s, %s, %s)
-                """, (
-                    tournament_id,
-                    team_id,
-                    1 if team_id == winner_id else 0,
-                    1 if winner_id and team_id != winner_id else 0,
-                    1 if winner_id is None else 0,
-                    winner_points if team_id == winner_id else (loser_points if winner_id else 1)
-                ))
-
-        conn.commit()
-    finally:
-        cursor.close()
-        conn.close()
+    if all_done:
+        st.rerun(scope="app")
 
-# -------------------------
-# Main UI
-# -------------------------
+@st.fragment(run_every=LIVE_REFRESH_SECONDS)
+def live_refresh(scope, rendered_version):
+    # A dict lookup per tick: the listener thread (sports_data/live.py)
+    # bumps the version when a write to this scope commits anywhere
+    if live.version(scope) != rendered_version:
+        st.rerun()
 
-# Header
-st.markdown('<h1 class="main-header">🏆 Sports Event Manager</h1>', unsafe_allow_html=True)
+def active_tournaments():
+    # Tournaments being deleted are hidden everywhere except their progress
+    return [t for t in get_tournaments() if not t['deleting']]
 
-# Sidebar with enhanced styling
-with st.sidebar:
-    st.markdown("## 📋 Navigation")
-    
-    menu = st.radio(
-        "",
-        ["🏠 Dashboard", "🏆 Add Tournament", "🗑️ Delete Tournament", "👥 Add Teams", 
-         "📅 Schedule Match", "📊 Update Results", "📁 Upload CSV", "🏅 Standings"],
-        label_visibility="collapsed"
-    )
-    
-    st.markdown("---")
-    st.markdown("### 📈 Quick Stats")
-    
-    # Quick stats in sidebar
-    tournaments = get_tournaments()
-    total_tournaments = len(tournaments)
-    
-    st.metric("Total Tournaments", total_tournaments, delta=None)
-    
-    if tournaments:
-        latest_tournament = tournaments[-1]['name']
-        st.info(f"🆕 Latest: {latest_tournament}")
+def team_picker(label, tournament_id, exclude=None):
+    # Typeahead: only the teams whose name starts with what was typed are
+    # fetched and offered, however many the tournament has
+    typed = st.text_input(f"🔎 Search {label}", placeholder="Type the start of a team name...")
+    teams = [t for t in search_teams(tournament_id, typed.strip(), TEAM_SEARCH_LIMIT + 1) if t['team_id'] != exclude]
+    if not teams:
+        st.caption(f"No team name starts with '{typed.strip()}'" if typed.strip() else "No teams to pick from")
+        return None, None
+    if len(teams) > TEAM_SEARCH_LIMIT:
+        teams = teams[:TEAM_SEARCH_LIMIT]
+        st.caption(f"First {TEAM_SEARCH_LIMIT} matches: type more to narrow them down")
+    names = {t['team_id']: t['name'] for t in teams}
+    team_id = st.selectbox(label, list(names), format_func=names.get)
+    return names[team_id], team_id
+
+# Every page is a fragment: its widgets rerun only that page, not the
+# sidebar, the CSS or the other pages' queries. Writes that change what
+# the sidebar shows call st.rerun() to refresh the whole app.
+# metrics.rerun records a fragment's own reruns on the Diagnostics page;
+# inside a full run it folds into the app's record. The run_every
+# fragments above make no queries and are left out to keep it readable.
 
 # Dashboard
-if menu == "🏠 Dashboard":
+@st.fragment
+@metrics.rerun("dashboard_page")
+def dashboard_page():
     st.markdown('<h2 class="sub-header">📊 Dashboard Overview</h2>', unsafe_allow_html=True)
+    # Any tournament's change can alter the cards or recent matches
+    live_refresh(cache.ALL, live.version(cache.ALL))
+    # The cards and recent matches don't depend on each other: fetch them
+    # together so the page waits for the slower query, not for both
+    data = async_queries.fetch(
+        summaries=get_tournament_summaries,
+        recent_matches=partial(get_matches, limit=5),  # Show last 5 matches
+    )
+    tournaments = active_tournaments()
     
     if not tournaments:
         st.markdown("""
@@ -367,27 +239,27 @@ if menu == "🏠 Dashboard":
         """, unsafe_allow_html=True)
     else:
         # Display tournament cards
-        cols = st.columns(min(3, len(tournaments)))
-        for idx, tournament in enumerate(tournaments):
-            with cols[idx % 3]:
-                team_count, match_count, completed = get_tournament_stats(tournament['tournament_id'])
-                
+        # One grouped query for every card instead of three COUNTs per tournament.
+        # Size the grid from the rows being laid out: the summaries are cached
+        # separately from active_tournaments() and may hold more or fewer rows
+        summaries = data["summaries"]
+        cols = st.columns(max(1, min(3, len(summaries))))
+        for idx, tournament in enumerate(summaries):
+            with cols[idx % len(cols)]:
                 st.markdown(f"""
                 <div class="tournament-card">
                     <h4>🏆 {tournament['name']}</h4>
                     <p><strong>📅 Start:</strong> {tournament['start_date']}</p>
                     <p><strong>📅 End:</strong> {tournament['end_date']}</p>
-                    <p><strong>👥 Teams:</strong> {team_count}</p>
-                    <p><strong>⚽ Matches:</strong> {completed}/{match_count} completed</p>
+                    <p><strong>👥 Teams:</strong> {tournament['team_count']}</p>
+                    <p><strong>⚽ Matches:</strong> {tournament['completed']}/{tournament['match_count']} completed</p>
                 </div>
                 """, unsafe_allow_html=True)
         
         # Recent matches
         st.markdown('<h3 class="sub-header">🔥 Recent Matches</h3>', unsafe_allow_html=True)
-        matches = get_matches()
-        if matches:
-            recent_matches = matches[:5]  # Show last 5 matches
-            
+        recent_matches = data["recent_matches"]
+        if recent_matches:
             for match in recent_matches:
                 col1, col2, col3 = st.columns([2, 1, 2])
                 
@@ -409,7 +281,9 @@ if menu == "🏠 Dashboard":
                 st.markdown("---")
 
 # Add Tournament
-elif menu == "🏆 Add Tournament":
+@st.fragment
+@metrics.rerun("add_tournament_page")
+def add_tournament_page():
     st.markdown('<h2 class="sub-header">🏆 Create New Tournament</h2>', unsafe_allow_html=True)
     
     col1, col2 = st.columns(2)
@@ -444,8 +318,13 @@ elif menu == "🏆 Add Tournament":
                 st.error("❌ Please fill all fields!")
 
 # Delete Tournament
-elif menu == "🗑️ Delete Tournament":
+@st.fragment
+@metrics.rerun("delete_tournament_page")
+def delete_tournament_page():
     st.markdown('<h2 class="sub-header">🗑️ Delete Tournament</h2>', unsafe_allow_html=True)
+    all_tournaments = get_tournaments()
+    tournaments = [t for t in all_tournaments if not t['deleting']]
+    deleting_tournaments = [t for t in all_tournaments if t['deleting']]
     
     if not tournaments:
         st.info("📭 No tournaments available to delete.")
@@ -476,14 +355,21 @@ elif menu == "🗑️ Delete Tournament":
             if st.button("🗑️ Delete Tournament", type="secondary", use_container_width=True):
                 if confirm:
                     delete_tournament(tournament_names[selected_tournament_name])
-                    st.success(f"✅ Tournament '{selected_tournament_name}' deleted successfully!")
+                    st.success(f"✅ Deleting tournament '{selected_tournament_name}' in the background...")
                     st.rerun()
                 else:
                     st.error("❌ Please confirm deletion by checking the checkbox!")
 
+    if deleting_tournaments:
+        st.markdown("### ⏳ Deletions in Progress")
+        show_deletion_progress(deleting_tournaments)
+
 # Add Teams
-elif menu == "👥 Add Teams":
+@st.fragment
+@metrics.rerun("add_teams_page")
+def add_teams_page():
     st.markdown('<h2 class="sub-header">👥 Add Teams to Tournament</h2>', unsafe_allow_html=True)
+    tournaments = active_tournaments()
     
     if not tournaments:
         st.info("📭 No tournaments available. Create a tournament first!")
@@ -511,17 +397,53 @@ elif menu == "👥 Add Teams":
         
         with col2:
             if selected_tournament_name:
-                st.markdown("### 📋 Current Teams")
-                teams = get_teams(tournament_names[selected_tournament_name])
-                if teams:
-                    for idx, team in enumerate(teams, 1):
-                        st.markdown(f"**{idx}.** {team['name']}")
-                else:
-                    st.info("No teams added yet.")
+                show_teams(tournament_names[selected_tournament_name])
+
+def show_teams(tournament_id):
+    import pandas as pd
+
+    team_count = get_tournament_stats(tournament_id)[0]
+    st.markdown(f"### 📋 Current Teams ({team_count:,})")
+    if not team_count:
+        st.info("No teams added yet.")
+        return
+    typed = st.text_input("🔎 Find Team", placeholder="Type the start of a team name...").strip()
+    if typed:
+        found = search_teams(tournament_id, typed, TEAMS_PAGE_SIZE)
+        if found:
+            st.dataframe(pd.DataFrame({"Team": [t['name'] for t in found]}), use_container_width=True, hide_index=True)
+        else:
+            st.info(f"No team name starts with '{typed}'.")
+        return
+
+    # Keyset pagination in the order teams were added: the "after"
+    # cursor of every page visited, per tournament
+    page_cursors = st.session_state.setdefault("team_page_cursors", {}).setdefault(tournament_id, [None])
+    teams = get_teams(tournament_id, limit=TEAMS_PAGE_SIZE + 1, after=page_cursors[-1])
+    has_next_page = len(teams) > TEAMS_PAGE_SIZE
+    teams = teams[:TEAMS_PAGE_SIZE]
+    first = (len(page_cursors) - 1) * TEAMS_PAGE_SIZE + 1
+    st.dataframe(
+        pd.DataFrame({"#": range(first, first + len(teams)), "Team": [t['name'] for t in teams]}),
+        use_container_width=True,
+        hide_index=True
+    )
+    col_prev, col_next = st.columns(2)
+    with col_prev:
+        if len(page_cursors) > 1 and st.button("⬅️ Previous", use_container_width=True, key="teams_previous"):
+            page_cursors.pop()
+            st.rerun(scope="fragment")
+    with col_next:
+        if has_next_page and st.button("Next ➡️", use_container_width=True, key="teams_next"):
+            page_cursors.append(teams[-1]['team_id'])
+            st.rerun(scope="fragment")
 
 # Schedule Match
-elif menu == "📅 Schedule Match":
+@st.fragment
+@metrics.rerun("schedule_match_page")
+def schedule_match_page():
     st.markdown('<h2 class="sub-header">📅 Schedule New Match</h2>', unsafe_allow_html=True)
+    tournaments = active_tournaments()
     
     if not tournaments:
         st.info("📭 No tournaments available. Create a tournament first!")
@@ -535,22 +457,20 @@ elif menu == "📅 Schedule Match":
                 list(tournament_names.keys())
             )
             
-            teams = get_teams(tournament_names[selected_tournament_name])
-            if len(teams) < 2:
+            team_count = get_tournament_stats(tournament_names[selected_tournament_name])[0]
+            team1_name = team2_name = team1_id = team2_id = None
+            if team_count < 2:
                 st.warning("⚠️ At least 2 teams are required to schedule a match!")
-                team1_name = team2_name = None
             else:
-                team_names = {t['name']: t['team_id'] for t in teams}
-                team1_name = st.selectbox("🔴 Select Team 1", list(team_names.keys()))
+                team1_name, team1_id = team_picker("🔴 Team 1", tournament_names[selected_tournament_name])
                 # Remove team1 from team2 options
-                team2_options = [name for name in team_names.keys() if name != team1_name]
-                team2_name = st.selectbox("🔵 Select Team 2", team2_options)
+                team2_name, team2_id = team_picker("🔵 Team 2", tournament_names[selected_tournament_name], exclude=team1_id)
         
         with col2:
             match_date = st.date_input("📅 Match Date", value=datetime.now().date())
             
             st.markdown("### 🆚 Match Preview")
-            if len(teams) >= 2 and team1_name and team2_name and team1_name != team2_name:
+            if team1_id is not None and team2_id is not None:
                 st.markdown(f"""
                 **🔴 {team1_name}**  
                         VS  
@@ -558,86 +478,277 @@ elif menu == "📅 Schedule Match":
                 
                 📅 **Date:** {match_date}
                 """)
-            elif team1_name == team2_name and team1_name is not None:
-                st.error("❌ Teams cannot play against themselves!")
+                tournament_id = tournament_names[selected_tournament_name]
+                st.markdown(
+                    f"**Form (newest first):** 🔴 {get_team_stats(tournament_id, team1_id)['form'] or '–'} · "
+                    f"🔵 {get_team_stats(tournament_id, team2_id)['form'] or '–'}"
+                )
+                meeting = get_head_to_head(tournament_id, team1_id, team2_id)
+                if meeting:
+                    st.markdown(
+                        f"**Head to head:** {meeting['played']} played, {team1_name} "
+                        f"{analytics.record(meeting)} (goals {meeting['goals_for']}-{meeting['goals_against']})"
+                    )
+                else:
+                    st.caption("First meeting in this tournament")
         
         col_btn1, col_btn2, col_btn3 = st.columns([1, 1, 1])
         with col_btn2:
             if st.button("📅 Schedule Match", use_container_width=True):
-                if len(teams) >= 2 and team1_name and team2_name and team1_name != team2_name:
+                if team1_id is not None and team2_id is not None:
                     add_match(
                         tournament_names[selected_tournament_name],
-                        team_names[team1_name],
-                        team_names[team2_name],
+                        team1_id,
+                        team2_id,
                         match_date
                     )
                     st.success("✅ Match scheduled successfully!")
                     st.balloons()
 
+        st.markdown("---")
+        st.markdown("### 🗓️ Generate Fixtures")
+        selected_tournament = next(t for t in tournaments if t['tournament_id'] == tournament_names[selected_tournament_name])
+        fixture_formats = {
+            "Single round-robin": "round_robin",
+            "Double round-robin": "double_round_robin",
+            "Knockout (first round)": "knockout",
+        }
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            fixture_format = fixture_formats[st.selectbox("🔁 Format", list(fixture_formats))]
+        with col2:
+            rest_days = st.number_input("😴 Rest days between matches", min_value=0, value=1, step=1)
+        with col3:
+            per_date = st.number_input("📆 Matches per date", min_value=1, value=max(team_count // 2, 1), step=1)
+        st.caption(
+            f"{fixtures.fixture_count(team_count, fixture_format)} matches for {team_count:,} teams between "
+            f"{selected_tournament['start_date']} and {selected_tournament['end_date']}"
+        )
+        col_btn1, col_btn2, col_btn3 = st.columns([1, 1, 1])
+        with col_btn2:
+            if st.button("🗓️ Generate Fixtures", use_container_width=True, disabled=team_count < 2):
+                try:
+                    count, first_date, last_date = fixtures.create_fixtures(
+                        selected_tournament['tournament_id'], fixture_format,
+                        rest_days=int(rest_days), per_date=int(per_date)
+                    )
+                except ValueError as e:
+                    st.error(f"❌ {e}")
+                else:
+                    st.success(f"✅ Scheduled {count} matches from {first_date} to {last_date}!")
+
 # Update Results
-elif menu == "📊 Update Results":
+@st.fragment
+@metrics.rerun("score_entry")
+def score_entry(match):
+    # Its own fragment, fed the match already on screen: typing a score
+    # reruns only this block and never queries the database
+    st.markdown("### 📊 Enter Scores")
+
+    team1_score = st.number_input(
+        f"🔴 {match['team1_name']} Score", 
+        min_value=0, 
+        max_value=MAX_SCORE,
+        step=1,
+        help="Enter the final score"
+    )
+
+    team2_score = st.number_input(
+        f"🔵 {match['team2_name']} Score", 
+        min_value=0, 
+        max_value=MAX_SCORE,
+        step=1,
+        help="Enter the final score"
+    )
+
+    # Show match result preview
+    if team1_score > team2_score:
+        st.success(f"🏆 Winner: {match['team1_name']}")
+    elif team2_score > team1_score:
+        st.success(f"🏆 Winner: {match['team2_name']}")
+    else:
+        st.info("🤝 Match Result: Draw")
+
+    if st.button("✅ Update Result", use_container_width=True):
+        # Acknowledged once journaled; the applier thread records it
+        result_queue.submit(
+            [(match['match_id'], team1_score, team2_score)],
+            {match['match_id']: f"{match['team1_name']} vs {match['team2_name']}"}
+        )
+        st.success("📨 Result queued: the points table updates as soon as it is applied")
+        st.rerun()
+
+@st.fragment(run_every=1)
+def show_queued_results():
+    # Polls the local journal only; reruns the app once everything is applied
+    queued = result_queue.entries("pending")
+    if not queued:
+        st.rerun(scope="app")
+    st.markdown(f"### ⏳ Queued Results ({len(queued)})")
+    failing = [e for e in queued if e['error']]
+    if failing:
+        st.warning(f"⚠️ Retrying after: {failing[0]['error']} ({failing[0]['attempts']} attempts)")
+    st.dataframe(
+        [
+            {
+                "Match": e['label'] or f"#{e['match_id']}",
+                "Score": f"{e['team1_score']}-{e['team2_score']}",
+                "Queued": datetime.fromtimestamp(e['submitted_at']).strftime("%H:%M:%S"),
+                "Attempts": e['attempts'],
+            }
+            for e in queued
+        ],
+        use_container_width=True,
+        hide_index=True
+    )
+
+@st.fragment
+@metrics.rerun("update_results_page")
+def update_results_page():
     st.markdown('<h2 class="sub-header">📊 Update Match Results</h2>', unsafe_allow_html=True)
     
-    matches = get_matches()
-    if not matches:
-        st.info("📭 No matches scheduled yet.")
-    else:
-        # Filter pending matches
-        pending_matches = [m for m in matches if m['team1_score'] is None]
+    tournament_filter = {"🌐 All Tournaments": None}
+    tournament_filter.update({t['name']: t['tournament_id'] for t in active_tournaments()})
+    selected_filter = st.selectbox("🏆 Filter by Tournament", list(tournament_filter.keys()))
+    filter_id = tournament_filter[selected_filter]
+    
+    queued = result_queue.entries("pending")
+    if queued:
+        show_queued_results()
+    queued_ids = {e['match_id'] for e in queued}
+    settled = sorted(
+        result_queue.entries("applied", limit=10) + result_queue.entries("rejected", limit=10),
+        key=lambda e: e['applied_at'], reverse=True
+    )[:10]
+    if settled:
+        with st.expander("📬 Recently Applied Results"):
+            st.dataframe(
+                [
+                    {
+                        "Match": e['label'] or f"#{e['match_id']}",
+                        "Score": f"{e['team1_score']}-{e['team2_score']}",
+                        "Status": "✅ applied" if e['status'] == "applied" else f"❌ {e['error']}",
+                        "Applied": datetime.fromtimestamp(e['applied_at']).strftime("%H:%M:%S"),
+                    }
+                    for e in settled
+                ],
+                use_container_width=True,
+                hide_index=True
+            )
+    
+    result_mode = st.radio(
+        "Entry Mode",
+        ["⚽ Single Match", "📋 Matchday"],
+        horizontal=True,
+        help="Matchday mode queues every score entered for a date; they are applied in the background like single results"
+    )
+    
+    if result_mode == "📋 Matchday":
+        matchday = st.date_input("📅 Matchday", value=datetime.now().date())
+        # Columnar: the pending scores arrive as empty nullable int columns
+        day_df = get_match_frame(
+            filter_id, status="pending", date_from=matchday, date_to=matchday, limit=MATCHDAY_LIMIT
+        )[["match_id", "team1_name", "team1_score", "team2_score", "team2_name", "tournament_name"]]
         
-        col1, col2 = st.columns([2, 1])
+        if day_df.empty:
+            st.info("📭 No pending matches on this date.")
+        else:
+            
+            # A form keeps score edits client-side until submit
+            with st.form("matchday_results"):
+                edited = st.data_editor(
+                    day_df,
+                    hide_index=True,
+                    use_container_width=True,
+                    disabled=["match_id", "team1_name", "team2_name", "tournament_name"],
+                    column_config={
+                        "match_id": None,
+                        "team1_name": st.column_config.TextColumn("🔴 Team 1"),
+                        "team1_score": st.column_config.NumberColumn("🔴 Score", min_value=0, max_value=MAX_SCORE, step=1),
+                        "team2_score": st.column_config.NumberColumn("🔵 Score", min_value=0, max_value=MAX_SCORE, step=1),
+                        "team2_name": st.column_config.TextColumn("🔵 Team 2"),
+                        "tournament_name": st.column_config.TextColumn("🏆 Tournament"),
+                    }
+                )
+                submitted = st.form_submit_button("✅ Record Matchday Results", use_container_width=True)
+            
+            if submitted:
+                filled = edited.dropna(subset=["team1_score", "team2_score"])
+                if filled.empty:
+                    st.error("❌ Enter both scores for at least one match!")
+                else:
+                    queued = result_queue.submit(
+                        zip(filled["match_id"], filled["team1_score"], filled["team2_score"]),
+                        {
+                            row.match_id: f"{row.team1_name} vs {row.team2_name}"
+                            for row in filled.itertuples()
+                        }
+                    )
+                    st.success(f"📨 {len(queued)} results queued: the points table updates as soon as they are applied")
+                    st.rerun()
+    
+    else:
+        # Keyset pagination: the "after" cursor of every page visited, per filter
+        page_cursors = st.session_state.setdefault("pending_page_cursors", {}).setdefault(selected_filter, [None])
+        pending_matches = get_matches(filter_id, status="pending", limit=RESULTS_PAGE_SIZE + 1, after=page_cursors[-1])
+        has_next_page = len(pending_matches) > RESULTS_PAGE_SIZE
+        pending_matches = pending_matches[:RESULTS_PAGE_SIZE]
+    
+        if not pending_matches and len(page_cursors) > 1:
+            # Everything on this page has been scored; step back
+            page_cursors.pop()
+            st.rerun()
+    
+        if not pending_matches and not get_matches(filter_id, limit=1):
+            st.info("📭 No matches scheduled yet.")
+        else:
+            col1, col2 = st.columns([2, 1])
         
-        with col1:
-            if not pending_matches:
-                st.info("✅ All matches have been completed!")
-            else:
-                match_options = {f"🆚 {m['team1_name']} vs {m['team2_name']} ({m['tournament_name']})": m['match_id'] for m in pending_matches}
-                selected_match = st.selectbox("⚽ Select Match", list(match_options.keys()))
+            with col1:
+                if not pending_matches:
+                    st.info("✅ All matches have been completed!")
+                else:
+                    match_options = {f"🆚 {m['team1_name']} vs {m['team2_name']} ({m['tournament_name']})": m['match_id'] for m in pending_matches}
+                    selected_match = st.selectbox(
+                        f"⚽ Select Match (page {len(page_cursors)})",
+                        list(match_options.keys())
+                    )
                 
-                if selected_match:
-                    selected_match_data = next(m for m in pending_matches if m['match_id'] == match_options[selected_match])
+                    col_prev, col_next = st.columns(2)
+                    with col_prev:
+                        if len(page_cursors) > 1 and st.button("⬅️ Previous", use_container_width=True):
+                            page_cursors.pop()
+                            st.rerun(scope="fragment")
+                    with col_next:
+                        if has_next_page and st.button("Next ➡️", use_container_width=True):
+                            last = pending_matches[-1]
+                            page_cursors.append((last['match_date'], last['match_id']))
+                            st.rerun(scope="fragment")
+                
+                    if selected_match:
+                        selected_match_data = next(m for m in pending_matches if m['match_id'] == match_options[selected_match])
                     
-                    st.markdown(f"### 🏟️ Match Details")
-                    st.info(f"""
-                    **🔴 Team 1:** {selected_match_data['team1_name']}  
-                    **🔵 Team 2:** {selected_match_data['team2_name']}  
-                    **📅 Date:** {selected_match_data['match_date']}  
-                    **🏆 Tournament:** {selected_match_data['tournament_name']}
-                    """)
+                        st.markdown(f"### 🏟️ Match Details")
+                        st.info(f"""
+                        **🔴 Team 1:** {selected_match_data['team1_name']}  
+                        **🔵 Team 2:** {selected_match_data['team2_name']}  
+                        **📅 Date:** {selected_match_data['match_date']}  
+                        **🏆 Tournament:** {selected_match_data['tournament_name']}
+                        """)
+                        if selected_match_data['match_id'] in queued_ids:
+                            st.caption("⏳ A score for this match is queued; entering another replaces it.")
         
-        with col2:
-            if pending_matches and selected_match:
-                st.markdown("### 📊 Enter Scores")
-                
-                team1_score = st.number_input(
-                    f"🔴 {selected_match_data['team1_name']} Score", 
-                    min_value=0, 
-                    step=1,
-                    help="Enter the final score"
-                )
-                
-                team2_score = st.number_input(
-                    f"🔵 {selected_match_data['team2_name']} Score", 
-                    min_value=0, 
-                    step=1,
-                    help="Enter the final score"
-                )
-                
-                # Show match result preview
-                if team1_score > team2_score:
-                    st.success(f"🏆 Winner: {selected_match_data['team1_name']}")
-                elif team2_score > team1_score:
-                    st.success(f"🏆 Winner: {selected_match_data['team2_name']}")
-                else:
-                    st.info("🤝 Match Result: Draw")
-                
-                if st.button("✅ Update Result", use_container_width=True):
-                    update_match_result(match_options[selected_match], team1_score, team2_score)
-                    st.success("🎉 Result updated and points table refreshed!")
-                    st.rerun()
+            with col2:
+                if pending_matches and selected_match:
+                    score_entry(selected_match_data)
 
 # Upload CSV
-elif menu == "📁 Upload CSV":
+@st.fragment
+@metrics.rerun("upload_csv_page")
+def upload_csv_page():
+    import pandas as pd
+    from sports_data import csv_import
+
     st.markdown('<h2 class="sub-header">📁 Upload CSV Data</h2>', unsafe_allow_html=True)
     
     col1, col2 = st.columns([2, 1])
@@ -650,9 +761,45 @@ elif menu == "📁 Upload CSV":
         )
         
         if uploaded_file is not None:
-            df = pd.read_csv(uploaded_file)
+            # Preview only the head; the import itself streams the file in chunks
+            df = pd.read_csv(uploaded_file, nrows=20)
+            uploaded_file.seek(0)
+            csv_kind = csv_import.detect_kind(df.columns)
             st.markdown("### 📊 Preview Data")
             st.dataframe(df, use_container_width=True)
+            
+            if csv_kind is None:
+                st.error("❌ Unrecognised columns. See the CSV Format Guide.")
+            elif st.button(f"📥 Import {csv_kind.title()}", use_container_width=True):
+                progress_bar = st.progress(0.0, text="Importing...")
+                
+                def show_progress(report):
+                    progress_bar.progress(
+                        report.fraction_done,
+                        text=f"{report.rows_read:,} rows read · {report.rows_per_second:,.0f} rows/s"
+                    )
+                
+                try:
+                    report = csv_import.import_csv(uploaded_file, kind=csv_kind, progress=show_progress)
+                except ValueError as e:
+                    st.error(f"❌ {e}")
+                else:
+                    progress_bar.progress(1.0, text="Import finished")
+                    m1, m2, m3 = st.columns(3)
+                    m1.metric("✅ Imported", f"{report.inserted:,}")
+                    m2.metric("❌ Rejected", f"{report.rejected:,}")
+                    m3.metric("⚡ Rows/s", f"{report.rows_per_second:,.0f}")
+                    
+                    if report.rejected:
+                        st.markdown("### ❌ Rejected Rows")
+                        st.write(", ".join(f"{reason}: {count:,}" for reason, count in report.reasons.most_common()))
+                        st.dataframe(
+                            pd.DataFrame(
+                                [{"line": line, "reason": reason, **row} for line, reason, row in report.rejected_samples]
+                            ),
+                            use_container_width=True,
+                            hide_index=True
+                        )
     
     with col2:
         st.markdown("### 📋 CSV Format Guide")
@@ -668,12 +815,64 @@ elif menu == "📁 Upload CSV":
         - match_date
         """)
         
-        if uploaded_file is not None:
-            st.warning("⚠️ Implement CSV processing logic based on your requirements!")
+        st.caption("Tournaments must already exist. Teams in a Matches CSV must already belong to the named tournament.")
+
+# Export
+@st.fragment
+@metrics.rerun("export_page")
+def export_page():
+    from sports_data import export
+
+    st.markdown('<h2 class="sub-header">📤 Export Data</h2>', unsafe_allow_html=True)
+    st.caption(
+        "Full season data for broadcasters and stats partners. The file is built from the database in chunks, "
+        "but the download is served from memory: for very large exports use `python -m sports_data.export`."
+    )
+
+    export_kinds = {"⚽ Matches": "matches", "🏅 Standings (points table)": "standings"}
+    export_formats = {"CSV": "csv", "Parquet": "parquet"}
+    col1, col2 = st.columns(2)
+    with col1:
+        kind = export_kinds[st.radio("📋 Data", list(export_kinds), horizontal=True)]
+        tournament_filter = {"🌐 All Tournaments": None}
+        tournament_filter.update({t['name']: t['tournament_id'] for t in active_tournaments()})
+        selected_filter = st.selectbox("🏆 Tournament", list(tournament_filter))
+    with col2:
+        fmt = export_formats[st.radio("🗂️ Format", list(export_formats), horizontal=True)]
+        by_date = st.checkbox(
+            "📅 Limit to a date range",
+            help="Matches by match date; standings by tournaments running in the range"
+        )
+        date_range = st.date_input("Dates", value=(), disabled=not by_date)
+
+    filters = {"tournament_id": tournament_filter[selected_filter]}
+    if by_date and len(date_range) == 2:
+        filters["date_from"], filters["date_to"] = date_range
+
+    if st.button("📦 Prepare Export", use_container_width=True):
+        path, rows = export.export_file(kind, fmt, **filters)
+        try:
+            with open(path, "rb") as exported:
+                st.download_button(
+                    f"⬇️ Download {rows:,} rows",
+                    exported,
+                    file_name=export.file_name(kind, fmt, tournament_filter[selected_filter] and selected_filter),
+                    mime=export.MIME_TYPES[fmt],
+                    on_click="ignore",
+                    use_container_width=True
+                )
+        finally:
+            os.remove(path)
 
 # Standings
-elif menu == "🏅 Standings":
+@st.fragment
+@metrics.rerun("standings_page")
+def standings_page():
+    import pandas as pd
+    import plotly.express as px
+
     st.markdown('<h2 class="sub-header">🏅 Tournament Standings</h2>', unsafe_allow_html=True)
+    tournaments = active_tournaments()
     
     if not tournaments:
         st.info("📭 No tournaments available.")
@@ -684,27 +883,16 @@ elif menu == "🏅 Standings":
             list(tournament_names.keys())
         )
         
-        conn = get_connection()
-        try:
-            df = pd.read_sql(
-                """SELECT t.name AS team_name, pt.matches_played, pt.wins, pt.losses, 
-                          pt.draws, pt.points 
-                   FROM Points_Table pt 
-                   JOIN Teams t ON pt.team_id = t.team_id 
-                   WHERE pt.tournament_id = %s 
-                   ORDER BY pt.points DESC, pt.wins DESC""",
-                conn,
-                params=(tournament_names[selected_tournament_name],)
-            )
-        finally:
-            conn.close()
+        selected_tournament_id = tournament_names[selected_tournament_name]
+        live_refresh(selected_tournament_id, live.version(selected_tournament_id))
+        
+        # Copy: the cached frame is shared between sessions
+        df = get_standings(selected_tournament_id).copy()
+        tie_breakers = get_tie_breakers(selected_tournament_id)
         
         if df.empty:
             st.info("📊 No standings data available. Complete some matches first!")
         else:
-            # Add position column
-            df.insert(0, 'Position', range(1, len(df) + 1))
-            
             # Style the dataframe
             st.markdown("### 📊 Current Standings")
             
@@ -739,21 +927,33 @@ elif menu == "🏅 Standings":
                     </div>
                     """, unsafe_allow_html=True)
             
-            # Display full standings table
+            # Display full standings table; teams level on every rule share a position
             st.dataframe(
                 df,
                 use_container_width=True,
                 hide_index=True,
+                column_order=[
+                    "position", "team_name", "matches_played", "wins", "draws", "losses",
+                    "goals_for", "goals_against", "goal_difference", "points",
+                ] + (["fair_play_points"] if "fair_play" in tie_breakers else []),
                 column_config={
-                    "Position": st.column_config.NumberColumn("🏆 Pos", width="small"),
+                    "position": st.column_config.NumberColumn("🏆 Pos", width="small"),
                     "team_name": st.column_config.TextColumn("👥 Team Name", width="medium"),
                     "matches_played": st.column_config.NumberColumn("⚽ MP", width="small"),
                     "wins": st.column_config.NumberColumn("✅ W", width="small"),
                     "losses": st.column_config.NumberColumn("❌ L", width="small"),
                     "draws": st.column_config.NumberColumn("🤝 D", width="small"),
+                    "goals_for": st.column_config.NumberColumn("GF", width="small"),
+                    "goals_against": st.column_config.NumberColumn("GA", width="small"),
+                    "goal_difference": st.column_config.NumberColumn("GD", width="small"),
                     "points": st.column_config.NumberColumn("📊 Pts", width="small"),
+                    "fair_play_points": st.column_config.NumberColumn("🟨 FP", width="small"),
                 }
             )
+            st.caption(
+                "Ranked by points, then "
+                + ", ".join(standings.TIE_BREAKERS[name].lower() for name in tie_breakers)
+            )
             
             # Points chart
             if len(df) > 1:
@@ -773,6 +973,275 @@ elif menu == "🏅 Standings":
                 )
                 st.plotly_chart(fig, use_container_width=True)
 
+            st.markdown("### 📋 Results")
+            results = get_match_frame(selected_tournament_id, status="completed")
+            st.dataframe(
+                results,
+                use_container_width=True,
+                hide_index=True,
+                column_order=["match_date", "team1_name", "team1_score", "team2_score", "team2_name"],
+                column_config={
+                    "match_date": st.column_config.DateColumn("📅 Date"),
+                    "team1_name": st.column_config.TextColumn("🔴 Team 1"),
+                    "team1_score": st.column_config.NumberColumn("🔴 Score", width="small"),
+                    "team2_score": st.column_config.NumberColumn("🔵 Score", width="small"),
+                    "team2_name": st.column_config.TextColumn("🔵 Team 2"),
+                }
+            )
+
+            # Form and home/away splits
+            st.markdown("### 📋 Form & Home/Away Record")
+            team_stats = get_team_analytics(selected_tournament_id)
+            st.dataframe(
+                pd.DataFrame([
+                    {
+                        "Team": row['team_name'],
+                        "Form": row['form'],
+                        "GF": row['home_goals_for'] + row['away_goals_for'],
+                        "GA": row['home_goals_against'] + row['away_goals_against'],
+                        "GD": row['home_goals_for'] + row['away_goals_for']
+                              - row['home_goals_against'] - row['away_goals_against'],
+                        "Home W-D-L": analytics.record(row, "home_"),
+                        "Away W-D-L": analytics.record(row, "away_"),
+                    }
+                    for row in team_stats
+                ]),
+                use_container_width=True,
+                hide_index=True
+            )
+
+            st.markdown("### 🆚 Head to Head")
+            col1, col2 = st.columns(2)
+            with col1:
+                h2h_team, h2h_team_id = team_picker("Team", selected_tournament_id)
+            with col2:
+                h2h_opponent, h2h_opponent_id = team_picker("Opponent", selected_tournament_id, exclude=h2h_team_id)
+            if h2h_team_id is not None and h2h_opponent_id is not None:
+                meeting = get_head_to_head(selected_tournament_id, h2h_team_id, h2h_opponent_id)
+                if meeting:
+                    col1, col2, col3 = st.columns(3)
+                    col1.metric("Played", meeting['played'])
+                    col2.metric(f"{h2h_team} W-D-L", analytics.record(meeting))
+                    col3.metric("Goals", f"{meeting['goals_for']}-{meeting['goals_against']}")
+                else:
+                    st.info("These teams haven't played each other yet.")
+        
+        with st.expander("⚖️ Tie-breakers"):
+            st.caption("Teams level on points are separated by these rules, in the order picked.")
+            chain = st.multiselect(
+                "Order",
+                list(standings.TIE_BREAKERS),
+                default=list(tie_breakers),
+                format_func=standings.TIE_BREAKERS.get,
+                key=f"tie_breakers_{selected_tournament_id}",
+            )
+            # Only the teams with points are listed; any other is found by
+            # name and added, so the editor stays small in large tournaments
+            st.caption("Fair play: teams with disciplinary points. Find a team to add it.")
+            penalised = get_fair_play_teams(selected_tournament_id)
+            fair_play = {t['team_id']: t['points'] for t in penalised}
+            added_name, added_id = team_picker("Team to penalise", selected_tournament_id)
+            teams = penalised + (
+                [{'team_id': added_id, 'name': added_name, 'points': 0}]
+                if added_id is not None and added_id not in fair_play else []
+            )
+            penalties = st.data_editor(
+                pd.DataFrame({
+                    "team_id": [t['team_id'] for t in teams],
+                    "Team": [t['name'] for t in teams],
+                    "Fair play points": [t['points'] for t in teams],
+                }),
+                column_config={
+                    "team_id": None,
+                    "Fair play points": st.column_config.NumberColumn(
+                        help="Disciplinary points: fewer ranks higher", min_value=0, step=1
+                    ),
+                },
+                disabled=["Team"],
+                hide_index=True,
+                use_container_width=True,
+                key=f"fair_play_{selected_tournament_id}_{added_id}",
+            )
+            if st.button("💾 Save Rules", use_container_width=True):
+                try:
+                    set_tie_breakers(selected_tournament_id, chain)
+                    set_fair_play(selected_tournament_id, {
+                        row['team_id']: row['Fair play points']
+                        for row in penalties.to_dict('records')
+                        if row['Fair play points'] != fair_play.get(row['team_id'], 0)
+                    })
+                except ValueError as e:
+                    st.error(f"❌ {e}")
+                else:
+                    st.success("✅ Rules saved")
+                    st.rerun()
+
+        with st.expander("🛠️ Points Table Maintenance"):
+            st.caption(
+                "Recompute standings and the form/head-to-head rollups from completed matches, "
+                "e.g. after manual fixes or a bulk import."
+            )
+            col_verify, col_rebuild = st.columns(2)
+            with col_verify:
+                if st.button("🔍 Verify", use_container_width=True):
+                    drift = standings.verify_points_table(selected_tournament_id)
+                    analytics_drift = analytics.verify_analytics(selected_tournament_id)
+                    if drift:
+                        st.warning(f"⚠️ {len(drift)} teams differ from their match results")
+                        st.dataframe(pd.DataFrame(drift), use_container_width=True, hide_index=True)
+                    if analytics_drift:
+                        st.warning(f"⚠️ {len(analytics_drift)} analytics rows differ from their match results")
+                        st.dataframe(pd.DataFrame(analytics_drift), use_container_width=True, hide_index=True)
+                    if not drift and not analytics_drift:
+                        st.success("✅ Points table and analytics match the results")
+            with col_rebuild:
+                if st.button("♻️ Rebuild", use_container_width=True):
+                    written = standings.rebuild_points_table(selected_tournament_id)
+                    written += analytics.rebuild_analytics(selected_tournament_id)
+                    st.success(f"✅ Rebuilt {written} rows")
+                    st.rerun()
+
+# Diagnostics (hidden: open the app with ?diagnostics in the URL)
+# A label called this often in one rerun is most likely a query in a loop
+N_PLUS_ONE_CALLS = 5
+
+@st.fragment
+def diagnostics_page():
+    import pandas as pd
+
+    st.markdown('<h2 class="sub-header">🩺 Diagnostics</h2>', unsafe_allow_html=True)
+    snapshot = metrics.registry.snapshot()
+
+    col1, col2, col3 = st.columns([1, 1, 1])
+    with col1:
+        threshold = st.number_input("🐢 Slow query threshold (ms)", min_value=1, value=int(metrics.slow_query_ms), step=50)
+        if threshold != metrics.slow_query_ms:
+            metrics.set_slow_query_ms(threshold)
+    with col2:
+        if st.button("🔄 Refresh", use_container_width=True):
+            st.rerun(scope="fragment")
+    with col3:
+        if st.button("🧹 Reset counters", use_container_width=True):
+            metrics.registry.reset()
+            st.rerun(scope="fragment")
+
+    st.markdown("### ⏱️ Recent Reruns")
+    reruns = snapshot["recent_reruns"]
+    if reruns:
+        suspects = [
+            (run["label"], label, count)
+            for run in reruns for label, count in run["calls"].items()
+            if count >= N_PLUS_ONE_CALLS
+        ]
+        for run_label, label, count in dict.fromkeys(suspects):
+            st.warning(f"⚠️ {run_label}: {label} called {count} times in one rerun")
+        st.dataframe(pd.DataFrame([
+            {
+                "Run": run["label"],
+                "At": datetime.fromtimestamp(run["started"]).strftime("%H:%M:%S"),
+                "Total (ms)": round(run["seconds"] * 1000, 1),
+                "DB (ms)": round(run["db_seconds"] * 1000, 1),
+                "Render (ms)": round(run["render_seconds"] * 1000, 1),
+                "Queries": run["queries"],
+                "Statements": run["statements"],
+                "Calls": ", ".join(f"{label}×{count}" for label, count in run["calls"].items()),
+            }
+            for run in reruns
+        ]), use_container_width=True, hide_index=True)
+    else:
+        st.info("📭 No reruns recorded yet.")
+
+    st.markdown("### 🔎 Queries by Label")
+    if snapshot["labels"]:
+        st.dataframe(pd.DataFrame(snapshot["labels"]).round(1), use_container_width=True, hide_index=True)
+    else:
+        st.info("📭 No database calls recorded yet.")
+
+    st.markdown(f"### 🐢 Slow Queries (≥ {metrics.slow_query_ms:.0f} ms)")
+    if snapshot["slow_log"]:
+        st.dataframe(pd.DataFrame([
+            {**entry, "at": datetime.fromtimestamp(entry["at"]).strftime("%H:%M:%S")}
+            for entry in snapshot["slow_log"]
+        ]).round(1), use_container_width=True, hide_index=True)
+    else:
+        st.success("✅ No slow queries.")
+
+    st.markdown("### 📦 Read Cache")
+    st.json(cache.stats())
+
+    replicas = db.replica_status()
+    if replicas:
+        st.markdown("### 🔀 Read Replicas")
+        st.caption(
+            f"{db.primary_read_count()} reads went to the primary because no replica was "
+            "caught up with the latest write or within the lag limit."
+        )
+        st.dataframe(pd.DataFrame(replicas), use_container_width=True, hide_index=True)
+
+    st.markdown("### 📈 Prometheus")
+    exporter = metrics.serve()
+    if exporter is not None:
+        host, port = exporter.server_address[:2]
+        st.caption(f"Scrape http://{host}:{port}/metrics (SPORTS_METRICS_HOST picks the interface)")
+    else:
+        st.caption("Set SPORTS_METRICS_PORT to serve /metrics for scraping.")
+    text = metrics.prometheus_text()
+    st.download_button("⬇️ Download metrics", text, file_name="metrics.prom", mime="text/plain")
+    with st.expander("Show metrics"):
+        st.code(text, language="text")
+
+PAGES = {
+    "🏠 Dashboard": dashboard_page,
+    "🏆 Add Tournament": add_tournament_page,
+    "🗑️ Delete Tournament": delete_tournament_page,
+    "👥 Add Teams": add_teams_page,
+    "📅 Schedule Match": schedule_match_page,
+    "📊 Update Results": update_results_page,
+    "📁 Upload CSV": upload_csv_page,
+    "📤 Export Data": export_page,
+    "🏅 Standings": standings_page,
+}
+if "diagnostics" in st.query_params:
+    PAGES["🩺 Diagnostics"] = diagnostics_page
+
+@st.fragment
+@metrics.rerun("quick_stats")
+def quick_stats():
+    tournaments = active_tournaments()
+    st.metric("Total Tournaments", len(tournaments), delta=None)
+    
+    if tournaments:
+        latest_tournament = tournaments[-1]['name']
+        st.info(f"🆕 Latest: {latest_tournament}")
+
+# Header
+st.markdown('<h1 class="main-header">🏆 Sports Event Manager</h1>', unsafe_allow_html=True)
+
+# Sidebar and page are timed as one rerun for the Diagnostics page
+with metrics.rerun("app") as current_run:
+    # Sidebar with enhanced styling
+    with st.sidebar:
+        st.markdown("## 📋 Navigation")
+    
+        # Switching pages is the only full-app rerun a plain widget causes
+        menu = st.radio(
+            "",
+            list(PAGES),
+            label_visibility="collapsed"
+        )
+        current_run.label = menu
+    
+        st.markdown("---")
+        st.markdown("### 📈 Quick Stats")
+    
+        # Quick stats in sidebar
+        resume_pending_work()
+        listen_for_changes()
+        metrics.serve()  # only when SPORTS_METRICS_PORT is set
+        quick_stats()
+
+    PAGES[menu]()
+
 # Footer
 st.markdown("---")
 st.markdown(
@@ -0,0 +1,8 @@
+"""Synthetic data generator and benchmark suite for the data helpers.
+
+    python -m benchmarks.run --size small --save      # record a baseline
+    python -m benchmarks.run --size small --compare   # fail on regressions
+
+Runs against its own database (SPORTS_BENCH_DB_NAME, default
+Sports_Event_Tracker_bench) on the configured server, never the app's.
+"""
@@ -0,0 +1,96 @@
+"""Seeded synthetic tournaments, teams and matches.
+
+Scores are Poisson goals with a small home advantage, so roughly a
+quarter of completed matches are draws, like real league football.
+Everything is bulk-loaded with COPY, so even the large preset loads in
+seconds.
+"""
+import io
+from datetime import date, timedelta
+
+import numpy as np
+
+from sports_data import db, standings, summary
+from sports_data.names import name_key
+
+# (tournaments, teams per tournament, matches per tournament)
+SIZES = {
+    "small": (10, 20, 200),
+    "medium": (50, 40, 1_000),
+    "large": (200, 60, 3_000),
+}
+
+HOME_GOALS, AWAY_GOALS = 1.5, 1.1
+
+
+def _copy(cursor, table, columns, rows):
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write("\t".join("\\N" if v is None else str(v) for v in row))
+        buffer.write("\n")
+    buffer.seek(0)
+    cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", buffer)
+
+
+def reset(cursor):
+    cursor.execute("TRUNCATE Points_Table, Matches, Teams, Tournaments RESTART IDENTITY CASCADE")
+
+
+def generate(tournaments, teams_per_tournament, matches_per_tournament, completed_ratio=0.7, seed=42):
+    """Replace the database contents with a synthetic data set.
+
+    Returns the number of (tournaments, teams, matches) written.
+    """
+    rng = np.random.default_rng(seed)
+    season_start = date(2020, 1, 1)
+
+    with db.cursor() as cursor:
+        reset(cursor)
+        _copy(cursor, "Tournaments", ("name", "start_date", "end_date"), (
+            (f"Tournament {t + 1}", season_start + timedelta(days=30 * t),
+             season_start + timedelta(days=30 * t + 180))
+            for t in range(tournaments)
+        ))
+        _copy(cursor, "Teams", ("tournament_id", "name", "name_key"), (
+            (t + 1, name, name_key(name))
+            for t in range(tournaments) for i in range(teams_per_tournament)
+            for name in [f"Team {t + 1}-{i + 1}"]
+        ))
+
+        # Team ids are dense (RESTART IDENTITY): tournament t owns
+        # t * teams_per_tournament + 1 .. (t + 1) * teams_per_tournament
+        n = tournaments * matches_per_tournament
+        tournament_ids = np.repeat(np.arange(tournaments), matches_per_tournament)
+        home = rng.integers(0, teams_per_tournament, n)
+        away = (home + rng.integers(1, teams_per_tournament, n)) % teams_per_tournament
+        first_team = tournament_ids * teams_per_tournament + 1
+        match_dates = [
+            season_start + timedelta(days=int(30 * t + d))
+            for t, d in zip(tournament_ids, rng.integers(0, 181, n))
+        ]
+        completed = rng.random(n) < completed_ratio
+        home_goals = rng.poisson(HOME_GOALS, n)
+        away_goals = rng.poisson(AWAY_GOALS, n)
+        team1 = first_team + home
+        team2 = first_team + away
+        winners = np.where(home_goals > away_goals, team1, np.where(away_goals > home_goals, team2, 0))
+
+        _copy(cursor, "Matches",
+              ("tournament_id", "team1_id", "team2_id", "match_date", "team1_score", "team2_score", "winner_id"), (
+            (int(t) + 1, int(t1), int(t2), d,
+             int(g1) if done else None, int(g2) if done else None,
+             int(w) if done and w else None)
+            for t, t1, t2, d, g1, g2, w, done in zip(
+                tournament_ids, team1, team2, match_dates, home_goals, away_goals, winners, completed
+            )
+        ))
+        cursor.execute("ANALYZE Tournaments, Teams, Matches")
+
+    standings.rebuild_points_table()
+    if summary.enabled():
+        summary.rebuild()
+    return tournaments, tournaments * teams_per_tournament, n
+
+
+def generate_size(size, seed=42):
+    return generate(*SIZES[size], seed=seed)
@@ -0,0 +1,181 @@
+"""Time every data helper at a given data size.
+
+Each case runs ``--repeat`` times after a warm-up call, bypassing the
+read cache, and records latency percentiles and statements per call.
+``--save`` writes the results as the baseline for that size;
+``--compare`` exits non-zero if p95 latency grew by more than
+``--tolerance`` (ignoring sub-millisecond noise) or any case issues more
+statements than its baseline.
+"""
+import argparse
+import functools
+import io
+import json
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from sports_data import async_queries, csv_import, db, migrate, queries, standings
+from benchmarks import generate
+
+BASELINE_DIR = Path(__file__).resolve().parent / "baselines"
+BENCH_DB = os.environ.get("SPORTS_BENCH_DB_NAME", "Sports_Event_Tracker_bench")
+NOISE_FLOOR_MS = 1.0
+CSV_ROWS = 5_000
+
+
+def use_bench_database():
+    """Point the pool at the benchmark database, creating it if needed."""
+    db.create_database(BENCH_DB)
+    db.configure({"database": BENCH_DB, "dsn": None})
+    migrate.migrate()
+
+
+def _matches_csv(rng, tournament_ids, teams_per_tournament):
+    buffer = io.StringIO()
+    buffer.write("tournament_name,team1_name,team2_name,match_date\n")
+    for _ in range(CSV_ROWS):
+        t = rng.choice(tournament_ids)
+        a, b = rng.sample(range(1, teams_per_tournament + 1), 2)
+        buffer.write(f"Tournament {t},Team {t}-{a},Team {t}-{b},2024-06-01\n")
+    return io.BytesIO(buffer.getvalue().encode("utf-8"))
+
+
+def dashboard_reads(sequential):
+    """The Dashboard's independent reads, one after another or together."""
+    calls = {
+        "summaries": queries.get_tournament_summaries.uncached,
+        "recent_matches": functools.partial(queries.get_matches.uncached, limit=5),
+    }
+    if sequential:
+        return {name: func() for name, func in calls.items()}
+    return async_queries.fetch(**calls)
+
+
+def cases(rng, size):
+    """(name, callable) pairs; each callable picks fresh random inputs."""
+    tournaments = queries.get_tournaments.uncached()
+    tournament_ids = [t["tournament_id"] for t in tournaments]
+    with db.cursor() as cursor:
+        cursor.execute("SELECT match_id FROM Matches ORDER BY random() LIMIT 1000")
+        match_ids = [row[0] for row in cursor.fetchall()]
+    first_page = queries.get_matches.uncached(limit=50)
+    cursor_after = (first_page[-1]["match_date"], first_page[-1]["match_id"])
+
+    return [
+        ("get_tournaments", lambda: queries.get_tournaments.uncached()),
+        ("get_teams", lambda: queries.get_teams.uncached(rng.choice(tournament_ids))),
+        ("get_matches recent", lambda: queries.get_matches.uncached(limit=5)),
+        ("get_matches keyset page", lambda: queries.get_matches.uncached(limit=50, after=cursor_after)),
+        ("get_matches pending by tournament",
+         lambda: queries.get_matches.uncached(rng.choice(tournament_ids), status="pending", limit=50)),
+        ("get_tournament_stats", lambda: queries.get_tournament_stats.uncached(rng.choice(tournament_ids))),
+        ("get_tournament_summaries", lambda: queries.get_tournament_summaries.uncached()),
+        ("get_standings", lambda: queries.get_standings.uncached(rng.choice(tournament_ids))),
+        # The same match list as dict rows versus decoded into Arrow columns
+        ("match list dict rows", lambda: queries.get_matches.uncached(rng.choice(tournament_ids))),
+        ("match list columnar", lambda: queries.get_match_frame.uncached(rng.choice(tournament_ids))),
+        ("dashboard reads sequential", lambda: dashboard_reads(sequential=True)),
+        ("dashboard reads async", lambda: dashboard_reads(sequential=False)),
+        ("update_match_result",
+         lambda: queries.update_match_result(rng.choice(match_ids), rng.randint(0, 4), rng.randint(0, 4))),
+        ("update_match_results x20",
+         lambda: queries.update_match_results(
+             [(m, rng.randint(0, 4), rng.randint(0, 4)) for m in rng.sample(match_ids, 20)])),
+        (f"csv import {CSV_ROWS} matches",
+         lambda: csv_import.import_csv(
+             _matches_csv(rng, tournament_ids, generate.SIZES[size][1]), kind="matches")),
+        ("verify_points_table", lambda: standings.verify_points_table()),
+    ]
+
+
+def measure(func, repeat):
+    func()  # warm-up
+    timings = []
+    start_statements = db.statement_count()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    statements = (db.statement_count() - start_statements) / repeat
+    p50, p95, p99 = np.percentile(timings, [50, 95, 99])
+    return {
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "mean_ms": round(float(np.mean(timings)), 3),
+        "statements": round(statements, 2),
+        "repeat": repeat,
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Return a list of human-readable regressions."""
+    regressions = []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        limit = max(base["p95_ms"] * (1 + tolerance), base["p95_ms"] + NOISE_FLOOR_MS)
+        if current["p95_ms"] > limit:
+            regressions.append(f"{name}: p95 {current['p95_ms']}ms > {limit:.3f}ms (baseline {base['p95_ms']}ms)")
+        if current["statements"] > base["statements"]:
+            regressions.append(f"{name}: {current['statements']} statements/call > baseline {base['statements']}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the data helpers against a synthetic database")
+    parser.add_argument("--size", choices=sorted(generate.SIZES), default="small")
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--only", help="run only cases whose name contains this text")
+    parser.add_argument("--skip-generate", action="store_true", help="reuse the data already loaded")
+    parser.add_argument("--save", action="store_true", help="write results as the baseline for this size")
+    parser.add_argument("--compare", action="store_true", help="fail if results regress against the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed p95 growth (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    use_bench_database()
+    if not args.skip_generate:
+        start = time.perf_counter()
+        counts = generate.generate_size(args.size, seed=args.seed)
+        print(f"generated {counts[0]} tournaments, {counts[1]} teams, {counts[2]} matches "
+              f"in {time.perf_counter() - start:.1f}s")
+
+    rng = random.Random(args.seed)
+    results = {}
+    for name, func in cases(rng, args.size):
+        if args.only and args.only not in name:
+            continue
+        # CSV import inserts data; keep it to a few runs
+        repeat = min(args.repeat, 3) if name.startswith("csv import") else args.repeat
+        results[name] = measure(func, repeat)
+        r = results[name]
+        print(f"{name:<36} p50 {r['p50_ms']:>9.2f}ms  p95 {r['p95_ms']:>9.2f}ms  "
+              f"p99 {r['p99_ms']:>9.2f}ms  {r['statements']:>6} stmts")
+
+    baseline_path = BASELINE_DIR / f"{args.size}.json"
+    status = 0
+    if args.compare:
+        if not baseline_path.exists():
+            print(f"no baseline at {baseline_path}; run with --save first")
+            status = 2
+        else:
+            regressions = compare(results, json.loads(baseline_path.read_text()), args.tolerance)
+            for line in regressions:
+                print(f"REGRESSION {line}")
+            status = 1 if regressions else 0
+    if args.save:
+        BASELINE_DIR.mkdir(exist_ok=True)
+        baseline_path.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+        print(f"saved baseline {baseline_path}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
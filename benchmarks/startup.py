@@ -0,0 +1,76 @@
+"""Cold-start time for command-line jobs and the app's first render.
+
+Every case runs in a fresh interpreter, ``--repeat`` times, and reports
+the median wall time plus which heavy libraries it ended up importing.
+The data-layer cases must not import Streamlit; if one does the run
+exits non-zero.
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --app    # also time the Dashboard's first run (needs the database)
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+HEAVY_MODULES = ("streamlit", "pandas", "numpy", "plotly", "psycopg2")
+
+# (name, code, may import Streamlit)
+CASES = [
+    ("import sports_data.queries", "import sports_data.queries", False),
+    ("import sports_data.standings", "import sports_data.standings", False),
+    ("import sports_data.migrate", "import sports_data.migrate", False),
+    ("import sports_data.csv_import", "import sports_data.csv_import", False),
+]
+APP_CASE = (
+    "app first run (Dashboard)",
+    "from streamlit.testing.v1 import AppTest\n"
+    "AppTest.from_file('app.py', default_timeout=60).run()",
+    True,
+)
+
+REPORT = (
+    "\nimport json, sys\n"
+    f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+)
+
+
+def run_case(code, repeat):
+    """Return (median seconds, heavy modules loaded) over ``repeat`` fresh interpreters."""
+    timings = []
+    loaded = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-c", code + REPORT], cwd=ROOT,
+            capture_output=True, text=True, check=True
+        )
+        timings.append(time.perf_counter() - start)
+        loaded = json.loads(result.stdout.strip().splitlines()[-1])
+    return statistics.median(timings), loaded
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure cold-start time in fresh interpreters")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--app", action="store_true", help="also time the app's first render")
+    args = parser.parse_args(argv)
+
+    baseline, _ = run_case("pass", args.repeat)
+    print(f"{'bare interpreter':<34} {baseline * 1000:>8.0f}ms")
+    failures = 0
+    for name, code, may_import_streamlit in CASES + ([APP_CASE] if args.app else []):
+        elapsed, loaded = run_case(code, args.repeat)
+        headless_ok = may_import_streamlit or "streamlit" not in loaded
+        failures += not headless_ok
+        print(f"{name:<34} {elapsed * 1000:>8.0f}ms  (+{(elapsed - baseline) * 1000:.0f}ms)  "
+              f"loads {', '.join(loaded) or 'nothing heavy'}{'' if headless_ok else '  FAIL: imports streamlit'}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
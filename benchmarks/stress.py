@@ -0,0 +1,149 @@
+"""Concurrent scoring stress test: many sessions, one set of standings.
+
+``--sessions`` threads, each on its own database connection, score
+matches of one tournament as fast as they can for ``--seconds``. With
+few teams every result contends for the same Points_Table, Team_Stats
+and Head_To_Head rows, and a ``--hot`` share of submissions re-scores a
+handful of matches, so the same match is often applied by two sessions
+at once. Afterwards the rollups are checked against a recompute from
+Matches (standings.verify_points_table, analytics.verify_analytics).
+The run fails on any drift or failed submission.
+
+Pass several session counts to see how throughput scales; it should
+grow with sessions (up to the server's cores), not flatten as it would
+behind a table lock.
+
+    python -m benchmarks.stress                          # PostgreSQL: SPORTS_STRESS_DB_NAME
+    python -m benchmarks.stress --sessions 1,4,16 --seconds 20
+    python -m benchmarks.stress --engine sqlite --sessions 4
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import date
+
+import numpy as np
+
+from sports_data import analytics, fixtures, queries, standings, storage
+
+STRESS_DB = os.environ.get("SPORTS_STRESS_DB_NAME", "Sports_Event_Tracker_stress")
+HOT_MATCHES = 5
+
+
+def _open(engine, directory, sessions):
+    if engine == "sqlite":
+        return storage.create_backend("sqlite", path=os.path.join(directory, "stress.db"))
+    from sports_data import db, migrate
+    db.create_database(STRESS_DB)
+    # One connection per session, plus the verifier
+    db.configure({"database": STRESS_DB, "dsn": None, "pool_max": sessions + 2})
+    migrate.migrate()
+    return storage.create_backend("postgres")
+
+
+def seed(backend, teams, legs):
+    """A fresh tournament of ``teams`` teams meeting ``legs`` times; returns (tournament_id, match ids)."""
+    with backend.cursor(write=True) as cursor:
+        cursor.execute("DELETE FROM Tournaments")
+    backend.add_tournament("Stress", date(2024, 1, 1), date(2024, 12, 31))
+    tournament_id = backend.get_tournaments()[0]["tournament_id"]
+    with backend.cursor(write=True) as cursor:
+        backend.insert_teams(cursor, [(tournament_id, f"Team {n}") for n in range(1, teams + 1)])
+    team_ids = [team["team_id"] for team in backend.get_teams(tournament_id)]
+    with backend.cursor(write=True) as cursor:
+        backend.insert_matches(cursor, [
+            (tournament_id, home, away, date.fromordinal(date(2024, 1, 1).toordinal() + day))
+            for day, matchday in enumerate(fixtures.round_robin(team_ids, legs)) for home, away in matchday
+        ])
+    return tournament_id, [match["match_id"] for match in backend.get_matches(tournament_id)]
+
+
+def _session(match_ids, batch, hot_share, deadline, rng, latencies, errors):
+    hot = match_ids[:HOT_MATCHES]
+    while time.perf_counter() < deadline:
+        results = [
+            (rng.choice(hot if rng.random() < hot_share else match_ids), rng.randint(0, 4), rng.randint(0, 4))
+            for _ in range(batch)
+        ]
+        start = time.perf_counter()
+        try:
+            queries.update_match_results(results)
+        except Exception as e:
+            errors[type(e).__name__] += 1
+        else:
+            latencies.append(time.perf_counter() - start)
+
+
+def run(backend, sessions, seconds, teams, legs, batch, hot_share, seed_value=42):
+    """One stress round; returns a result dict (``ok`` is False on errors or drift)."""
+    tournament_id, match_ids = seed(backend, teams, legs)
+    latencies = [[] for _ in range(sessions)]
+    errors = Counter()
+    deadline = time.perf_counter() + seconds
+    threads = [
+        threading.Thread(
+            target=_session,
+            args=(match_ids, batch, hot_share, deadline, random.Random(seed_value + n), latencies[n], errors),
+        )
+        for n in range(sessions)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    timings = np.array([t for per_session in latencies for t in per_session]) * 1000
+    drift = standings.verify_points_table(tournament_id)
+    analytics_drift = analytics.verify_analytics(tournament_id)
+    return {
+        "sessions": sessions,
+        "submissions": len(timings),
+        "results_per_s": len(timings) * batch / elapsed,
+        "p50_ms": float(np.percentile(timings, 50)) if len(timings) else 0.0,
+        "p95_ms": float(np.percentile(timings, 95)) if len(timings) else 0.0,
+        "max_ms": float(timings.max()) if len(timings) else 0.0,
+        "errors": dict(errors),
+        "drift": len(drift) + len(analytics_drift),
+        "ok": not errors and not drift and not analytics_drift and len(timings) > 0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score matches from many sessions at once and verify the standings")
+    parser.add_argument("--engine", choices=sorted(storage.BACKENDS), default="postgres")
+    parser.add_argument("--sessions", default="8", help="concurrent sessions; comma-separated to compare levels")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--teams", type=int, default=10, help="fewer teams means more contention")
+    parser.add_argument("--legs", type=int, default=2, help="times every pair of teams meets")
+    parser.add_argument("--batch", type=int, default=1, help="results per submission (1 = Update Result)")
+    parser.add_argument("--hot", type=float, default=0.2, help=f"share of submissions re-scoring {HOT_MATCHES} hot matches")
+    args = parser.parse_args(argv)
+    levels = [int(level) for level in args.sessions.split(",")]
+
+    print(f"{'sessions':>8} {'submits':>8} {'results/s':>10} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} {'drift':>6}  errors")
+    failed = False
+    with tempfile.TemporaryDirectory() as directory:
+        backend = _open(args.engine, directory, max(levels))
+        storage.set_backend(backend)
+        try:
+            for sessions in levels:
+                result = run(backend, sessions, args.seconds, args.teams, args.legs, args.batch, args.hot)
+                failed |= not result["ok"]
+                print(
+                    f"{result['sessions']:>8} {result['submissions']:>8} {result['results_per_s']:>10.0f} "
+                    f"{result['p50_ms']:>8.1f} {result['p95_ms']:>8.1f} {result['max_ms']:>8.1f} {result['drift']:>6}  {result['errors'] or '-'}"
+                )
+        finally:
+            backend.close()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,25 @@
+"""Headless data layer for the Sports Event Manager.
+
+Everything the app reads and writes, importable without Streamlit, so
+scripts, background workers and benchmarks reuse the same code:
+
+- queries: cached reads and the writes the pages make
+- result_queue: write-behind journal of submitted scores and its applier
+- async_queries: run a page's independent reads concurrently
+- csv_import: streaming Teams / Matches CSV import
+- fixtures: round-robin and knockout fixture generation
+- export: streaming CSV / Parquet export of matches and standings
+- standings: tie-breaker rules, Points_Table rebuild and verification
+- analytics: team form, home/away and head-to-head rollups
+- migrate: versioned schema migrations
+- storage: the PostgreSQL and SQLite engines behind queries
+- columnar: query results decoded straight into Arrow-backed DataFrames
+- names: the case folding team search and its cache share
+- metrics: query and rerun timings, slow-query log, Prometheus export
+- db, cache, deletion, summary, live: connection pools and read-replica
+  routing, read and team-search caches, background deletes, optional
+  summary counters and change notifications
+
+Importing the package or ``queries`` loads neither pandas nor a database
+driver; each is imported on first use, so command-line jobs start fast.
+"""
@@ -0,0 +1,93 @@
+"""Team and head-to-head analytics rollups.
+
+Team_Stats holds each team's home and away record (played, W/D/L, goals
+for and against) plus its form: the last FORM_LENGTH results, newest
+first, e.g. "WWDLW". Head_To_Head holds one row per team and opponent,
+so the record between two teams is a primary-key lookup. team1 is the
+home side.
+
+update_match_result keeps both current in the same transaction as the
+score (see the storage engines' record_results). This module rebuilds
+them from Matches after manual fixes, deletes or bulk imports, and
+verifies them against a fresh recompute:
+
+    python -m sports_data.analytics rebuild [--tournament ID]
+    python -m sports_data.analytics verify [--tournament ID]
+"""
+import argparse
+
+from sports_data import cache, metrics, storage
+
+# Migration 0007 backfills form with a literal ``rn <= 5`` (migrations are
+# plain SQL and checksummed, so they can't read this). Changing it means a
+# new migration that rebuilds form; tests/test_migrations.py checks they agree.
+FORM_LENGTH = 5
+
+# Columns kept per split (home_*, away_*) and per head-to-head pairing
+RECORD_COLUMNS = ("played", "wins", "draws", "losses", "goals_for", "goals_against")
+TEAM_STATS_COLUMNS = tuple(f"{side}_{c}" for side in ("home", "away") for c in RECORD_COLUMNS) + ("form",)
+HEAD_TO_HEAD_COLUMNS = RECORD_COLUMNS
+TABLE_KEYS = {
+    "Team_Stats": ("tournament_id", "team_id"),
+    "Head_To_Head": ("tournament_id", "team_id", "opponent_id"),
+}
+TABLE_COLUMNS = {"Team_Stats": TEAM_STATS_COLUMNS, "Head_To_Head": HEAD_TO_HEAD_COLUMNS}
+
+
+@metrics.timed()
+def rebuild_analytics(tournament_id=None):
+    """Replace Team_Stats and Head_To_Head rows for one tournament (or all).
+
+    Runs in one transaction with writers blocked, like the Points_Table
+    rebuild. Returns the number of rows written.
+    """
+    written = storage.get_backend().rebuild_analytics(tournament_id)
+    if tournament_id is None:
+        cache.clear()
+    else:
+        cache.invalidate(tournament_id)
+    return written
+
+
+@metrics.timed()
+def verify_analytics(tournament_id=None):
+    """Diff stored rollups against a fresh recompute.
+
+    Returns one dict per differing row with ``table``, its key
+    (tournament_id, team_id and, for Head_To_Head, opponent_id) and
+    ``stored_<col>`` / ``expected_<col>`` for every column of that table.
+    An empty list means no drift.
+    """
+    return storage.get_backend().verify_analytics(tournament_id)
+
+
+def record(row, prefix=""):
+    """"W-D-L" for a Team_Stats split (prefix "home_"/"away_") or a Head_To_Head row."""
+    return f"{row[f'{prefix}wins']}-{row[f'{prefix}draws']}-{row[f'{prefix}losses']}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild or verify the Team_Stats and Head_To_Head rollups")
+    parser.add_argument("action", choices=["rebuild", "verify"])
+    parser.add_argument("--tournament", type=int, help="only this tournament_id")
+    args = parser.parse_args(argv)
+
+    if args.action == "rebuild":
+        written = rebuild_analytics(args.tournament)
+        print(f"Rebuilt Team_Stats and Head_To_Head: {written} rows")
+        return 0
+
+    drift = verify_analytics(args.tournament)
+    for row in drift:
+        changes = ", ".join(
+            f"{c} {row[f'stored_{c}']} -> {row[f'expected_{c}']}" for c in TABLE_COLUMNS[row["table"]]
+            if row[f"stored_{c}"] != row[f"expected_{c}"]
+        )
+        opponent = f" vs {row['opponent_id']}" if row.get("opponent_id") is not None else ""
+        print(f"{row['table']} tournament {row['tournament_id']} team {row['team_id']}{opponent}: {changes}")
+    print(f"{len(drift)} rows differ")
+    return 1 if drift else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,82 @@
+"""Async read path: run a page's independent queries at the same time.
+
+A page such as the Dashboard needs several reads that don't depend on
+each other. Awaiting them together makes its latency the slowest query's
+rather than the sum of all of them. psycopg2 and sqlite3 block, so each
+query runs on a worker thread driven from asyncio, with as many workers
+as the storage engine can serve at once (the PostgreSQL pool size).
+The workers call the cached helpers from queries.py unchanged, so cache
+hits return at once and both paths share one cache.
+
+    data = async_queries.fetch(
+        summaries=queries.get_tournament_summaries,
+        recent=functools.partial(queries.get_matches, limit=5),
+    )
+    data["summaries"], data["recent"]
+
+Inside a coroutine use ``await gather(...)`` (or ``await run(...)``).
+"""
+import asyncio
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sports_data import metrics, storage
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=storage.get_backend().read_concurrency(),
+                thread_name_prefix="async-read"
+            )
+        return _executor
+
+
+def shutdown():
+    """Stop the workers (the next call starts a fresh pool)."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
+
+
+async def run(func, *args, **kwargs):
+    """Await one blocking read on a worker; returns (result, collected metrics)."""
+    loop = asyncio.get_running_loop()
+    call = functools.partial(metrics.run_collected, func, *args, **kwargs)
+    return await loop.run_in_executor(_get_executor(), call)
+
+
+async def gather(**calls):
+    """Run every ``name=callable`` at once and return {name: result}.
+
+    The first failure is raised once all calls have finished.
+    """
+    names = list(calls)
+    start = time.perf_counter()
+    outcomes = await asyncio.gather(*(run(calls[name]) for name in names), return_exceptions=True)
+    metrics.merge_concurrent(
+        [outcome[1] for outcome in outcomes if not isinstance(outcome, BaseException)],
+        time.perf_counter() - start
+    )
+    for outcome in outcomes:
+        if isinstance(outcome, BaseException):
+            raise outcome
+    return {name: outcome[0] for name, outcome in zip(names, outcomes)}
+
+
+def fetch(**calls):
+    """Blocking entry point for Streamlit pages: ``gather`` on a private event loop."""
+    if len(calls) == 1:
+        # Nothing to overlap with; skip the loop and the thread hop
+        (name, func), = calls.items()
+        return {name: func()}
+    return asyncio.run(gather(**calls))
@@ -0,0 +1,230 @@
+"""Process-wide read cache for the data helpers.
+
+Entries are keyed by the helper's arguments plus the current version of
+the data they depend on: one counter per tournament, one for the
+tournament list and one that moves on every write (``ALL``). Writers call
+``invalidate`` after committing, so the next read misses and reloads
+fresh rows while idle reruns are served without touching the database.
+A TTL and an LRU size bound keep memory in check and pick up writes made
+by other processes.
+
+Team searches have their own per-tournament prefix cache (PrefixCache),
+tied to the same versions, so typeahead keystrokes don't flood the LRU.
+"""
+import functools
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from sports_data.names import name_key
+
+# Version scopes besides the per-tournament ids
+ALL = "*"
+TOURNAMENTS = "tournaments"
+
+
+class VersionedCache:
+    def __init__(self, maxsize=256, ttl=300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def version(self, scope):
+        return self._versions.get(scope, 0)
+
+    def invalidate(self, *scopes):
+        """Bump the given scopes (and ALL) so dependent entries stop matching."""
+        with self._lock:
+            for scope in set(scopes) | {ALL}:
+                self._versions[scope] = self._versions.get(scope, 0) + 1
+
+    def get_or_load(self, key, loader):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        # Load outside the lock so slow queries don't serialize other readers
+        value = loader()
+        with self._lock:
+            self._entries[key] = (now + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+            }
+
+
+read_cache = VersionedCache(
+    maxsize=int(os.environ.get("SPORTS_CACHE_SIZE", 256)),
+    ttl=float(os.environ.get("SPORTS_CACHE_TTL", 300)),
+)
+
+
+def cached(scope):
+    """Cache a read helper under ``scope(*args, **kwargs)``'s version.
+
+    The version is read before the query runs, so a write that commits
+    while the query is in flight leaves the result under an old key.
+    Cached rows are shared between sessions and must not be mutated.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            dep = scope(*args, **kwargs)
+            key = (func.__qualname__, args, tuple(sorted(kwargs.items())), dep, read_cache.version(dep))
+            return read_cache.get_or_load(key, lambda: func(*args, **kwargs))
+        wrapper.uncached = func
+        return wrapper
+    return decorator
+
+
+class PrefixCache:
+    """Per-tournament results of name-prefix searches (the team typeahead).
+
+    Each keystroke extends the last prefix, and a longer prefix only
+    narrows the result. So a cached result that holds every match
+    (``complete``: the query returned fewer rows than it asked for)
+    answers all longer prefixes by filtering, without a query. A
+    tournament's entries belong to its read_cache version and go as soon
+    as it moves on; the TTL covers writes nobody announced.
+    """
+
+    def __init__(self, max_prefixes=512, max_tournaments=64, ttl=300.0):
+        self.max_prefixes = max_prefixes
+        self.max_tournaments = max_tournaments
+        self.ttl = ttl
+        self.hits = 0
+        self.narrowed = 0
+        self.misses = 0
+        # tournament_id -> (version, {prefix: (expires, rows, complete)})
+        self._tournaments = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _prefixes(self, tournament_id, version):
+        entry = self._tournaments.get(tournament_id)
+        if entry is None or entry[0] != version:
+            entry = self._tournaments[tournament_id] = (version, OrderedDict())
+            while len(self._tournaments) > self.max_tournaments:
+                self._tournaments.popitem(last=False)
+        self._tournaments.move_to_end(tournament_id)
+        return entry[1]
+
+    def lookup(self, tournament_id, prefix, limit, version):
+        """Up to ``limit`` rows for the folded (names.name_key) ``prefix`` from memory, or None."""
+        now = time.monotonic()
+        with self._lock:
+            prefixes = self._prefixes(tournament_id, version)
+            for length in range(len(prefix), -1, -1):
+                entry = prefixes.get(prefix[:length])
+                if entry is None or entry[0] <= now:
+                    continue
+                _, rows, complete = entry
+                if length == len(prefix) and (complete or len(rows) >= limit):
+                    prefixes.move_to_end(prefix)
+                    self.hits += 1
+                    return rows[:limit]
+                if not complete:
+                    # Shorter prefixes match at least as many teams
+                    break
+                self.narrowed += 1
+                matches = (row for row in rows if name_key(row["name"]).startswith(prefix))
+                return [row for row, _ in zip(matches, range(limit))]
+            self.misses += 1
+            return None
+
+    def store(self, tournament_id, prefix, rows, complete, version):
+        with self._lock:
+            prefixes = self._prefixes(tournament_id, version)
+            prefixes[prefix] = (time.monotonic() + self.ttl, rows, complete)
+            prefixes.move_to_end(prefix)
+            while len(prefixes) > self.max_prefixes:
+                prefixes.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._tournaments.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.narrowed + self.misses
+            return {
+                "hits": self.hits,
+                "narrowed": self.narrowed,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.narrowed) / lookups if lookups else 0.0,
+                "tournaments": len(self._tournaments),
+                "prefixes": sum(len(prefixes) for _, prefixes in self._tournaments.values()),
+            }
+
+
+team_prefixes = PrefixCache(
+    max_prefixes=int(os.environ.get("SPORTS_TEAM_SEARCH_PREFIXES", 512)),
+    ttl=read_cache.ttl,
+)
+
+
+def prefix_cached(fetch_rows, limit=20):
+    """Cache a ``(tournament_id, prefix, limit)`` search in ``team_prefixes``.
+
+    A miss asks the helper for at least ``fetch_rows`` rows, so most
+    prefixes a few letters long come back complete and the keystrokes
+    after them never reach the database. The prefix is folded with
+    names.name_key first; the helper must match it against names folded
+    the same way (Teams.name_key), or narrowing and the query disagree.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(tournament_id, prefix="", limit=limit):
+            prefix = name_key(prefix)
+            version = read_cache.version(tournament_id)
+            rows = team_prefixes.lookup(tournament_id, prefix, limit, version)
+            if rows is None:
+                fetch = max(limit, fetch_rows)
+                rows = func(tournament_id, prefix, fetch)
+                team_prefixes.store(tournament_id, prefix, rows, len(rows) < fetch, version)
+                rows = rows[:limit]
+            return rows
+        wrapper.uncached = func
+        return wrapper
+    return decorator
+
+
+def invalidate(*scopes):
+    read_cache.invalidate(*scopes)
+
+
+def clear():
+    """Drop every cached read, e.g. after missing other processes' writes."""
+    read_cache.clear()
+    team_prefixes.clear()
+
+
+def stats():
+    return {**read_cache.stats(), "team_search": team_prefixes.stats()}
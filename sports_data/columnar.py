@@ -0,0 +1,74 @@
+"""Columnar query results: rows decoded straight into Arrow-backed DataFrames.
+
+Table pages used to receive one dict per row, which pandas and then
+Streamlit converted again. Here a result is decoded column by column
+into Arrow arrays, using the column kinds declared next to the query,
+and wrapped in a DataFrame of ``pd.ArrowDtype`` columns. Scores stay
+nullable ints instead of floats with NaN, and dates stay dates.
+st.dataframe and Plotly read the Arrow buffers without creating Python
+objects per row.
+
+PostgreSQL streams the result as CSV with COPY and pyarrow parses it in
+C (from_csv). SQLite returns tuples, which are transposed once into
+columns (from_rows).
+
+pyarrow and pandas are imported on first use, like everywhere else in
+the package.
+"""
+
+# Column kinds a query can declare: (("team_name", "str"), ("points", "int"), ...)
+KINDS = ("int", "float", "str", "date", "bool")
+
+
+def arrow_schema(columns):
+    """pyarrow schema for declared (name, kind) columns."""
+    import pyarrow as pa
+    types = {"int": pa.int64(), "float": pa.float64(), "str": pa.string(), "date": pa.date32(), "bool": pa.bool_()}
+    return pa.schema([(name, types[kind]) for name, kind in columns])
+
+
+def _to_frame(table):
+    import pandas as pd
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+
+def from_csv(data, columns):
+    """DataFrame from headerless CSV bytes as written by ``COPY ... TO STDOUT (FORMAT csv)``.
+
+    ``data`` is any bytes-like object (a BytesIO's getbuffer() avoids a
+    copy). COPY writes NULL unquoted and empty strings as ``""``, so the
+    two stay distinct.
+    """
+    import pyarrow as pa
+    import pyarrow.csv as csv
+    schema = arrow_schema(columns)
+    if not len(data):
+        return _to_frame(schema.empty_table())
+    table = csv.read_csv(
+        pa.BufferReader(data),
+        read_options=csv.ReadOptions(column_names=schema.names),
+        convert_options=csv.ConvertOptions(
+            column_types=schema, null_values=[""], strings_can_be_null=True, quoted_strings_can_be_null=False
+        ),
+    )
+    return _to_frame(table)
+
+
+def record_batch(rows, schema):
+    """Arrow record batch from a list of row tuples in ``schema`` order."""
+    import pyarrow as pa
+    values = list(zip(*rows)) if rows else [()] * len(schema)
+    arrays = []
+    for field, column in zip(schema, values):
+        if field.type == pa.date32():
+            # SQLite may hand back ISO strings instead of dates
+            arrays.append(pa.array(column).cast(field.type))
+        else:
+            arrays.append(pa.array(column, type=field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def from_rows(rows, columns):
+    """DataFrame from a list of row tuples in ``columns`` order."""
+    import pyarrow as pa
+    return _to_frame(pa.Table.from_batches([record_batch(rows, arrow_schema(columns))]))
@@ -0,0 +1,217 @@
+"""Streaming bulk import for the Teams and Matches CSV formats.
+
+The file is parsed in chunks, names are resolved to ids with one
+set-based lookup per chunk (remembered across chunks), and each chunk is
+written with the storage engine's bulk insert in its own transaction.
+Only the current chunk and the name -> id maps are held in memory.
+
+Teams CSV:   tournament_name, team_name
+Matches CSV: tournament_name, team1_name, team2_name, match_date
+"""
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+from sports_data import cache, metrics, storage
+
+TEAM_COLUMNS = ("tournament_name", "team_name")
+MATCH_COLUMNS = ("tournament_name", "team1_name", "team2_name", "match_date")
+
+DEFAULT_CHUNK_SIZE = 20_000
+MAX_REJECTED_SAMPLES = 1_000
+
+
+@dataclass
+class ImportReport:
+    kind: str
+    rows_read: int = 0
+    inserted: int = 0
+    rejected: int = 0
+    reasons: Counter = field(default_factory=Counter)
+    # (line number, reason, row) for the first MAX_REJECTED_SAMPLES rejects
+    rejected_samples: list = field(default_factory=list)
+    started: float = field(default_factory=time.perf_counter)
+    elapsed: float = 0.0
+    fraction_done: float = 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.rows_read / self.elapsed if self.elapsed else 0.0
+
+    def reject(self, line, reason, row):
+        self.rejected += 1
+        self.reasons[reason] += 1
+        if len(self.rejected_samples) < MAX_REJECTED_SAMPLES:
+            self.rejected_samples.append((line, reason, row))
+
+
+def _normalize(columns):
+    return [str(c).strip().lower() for c in columns]
+
+
+def detect_kind(columns):
+    """Return "teams" or "matches" for a header, or None if it matches neither."""
+    columns = set(_normalize(columns))
+    if set(MATCH_COLUMNS) <= columns:
+        return "matches"
+    if set(TEAM_COLUMNS) <= columns:
+        return "teams"
+    return None
+
+
+def _file_size(file):
+    try:
+        position = file.tell()
+        file.seek(0, 2)
+        size = file.tell()
+        file.seek(position)
+        return size
+    except (AttributeError, OSError):
+        return None
+
+
+def _clean_names(series):
+    return series.fillna("").astype(str).str.strip()
+
+
+def _lookup_tournaments(backend, cursor, names, known):
+    missing = [n for n in names if n not in known]
+    if missing:
+        known.update(backend.find_tournaments(cursor, missing))
+        # Remember misses too so we don't ask again on every chunk
+        for name in missing:
+            known.setdefault(name, None)
+
+
+def _lookup_teams(backend, cursor, pairs, known):
+    missing = [p for p in pairs if p not in known]
+    if missing:
+        known.update(backend.find_teams(cursor, missing))
+        for pair in missing:
+            known.setdefault(pair, None)
+
+
+def _import_teams_chunk(backend, cursor, chunk, first_line, report, tournaments, teams):
+    tournament_names = _clean_names(chunk["tournament_name"])
+    team_names = _clean_names(chunk["team_name"])
+    _lookup_tournaments(backend, cursor, set(tournament_names), tournaments)
+    pairs = {
+        (tournaments[t], n) for t, n in zip(tournament_names, team_names)
+        if tournaments.get(t) is not None and n
+    }
+    _lookup_teams(backend, cursor, pairs, teams)
+
+    rows = []
+    added = set()
+    for offset, (t_name, team_name) in enumerate(zip(tournament_names, team_names)):
+        line = first_line + offset
+        tournament_id = tournaments.get(t_name)
+        if tournament_id is None:
+            report.reject(line, "unknown tournament", {"tournament_name": t_name, "team_name": team_name})
+        elif not team_name:
+            report.reject(line, "missing team name", {"tournament_name": t_name, "team_name": team_name})
+        elif teams.get((tournament_id, team_name)) is not None:
+            report.reject(line, "team already exists", {"tournament_name": t_name, "team_name": team_name})
+        else:
+            # Placeholder id: later duplicates in the same file are rejected
+            teams[(tournament_id, team_name)] = -1
+            rows.append((tournament_id, team_name))
+            added.add(tournament_id)
+
+    if rows:
+        for tournament_id, name, team_id in backend.insert_teams(cursor, rows):
+            teams[(tournament_id, name)] = team_id
+    report.inserted += len(rows)
+    return added
+
+
+def _import_matches_chunk(backend, cursor, chunk, first_line, report, tournaments, teams):
+    tournament_names = _clean_names(chunk["tournament_name"])
+    team1_names = _clean_names(chunk["team1_name"])
+    team2_names = _clean_names(chunk["team2_name"])
+    match_dates = pd.to_datetime(chunk["match_date"], errors="coerce")
+    _lookup_tournaments(backend, cursor, set(tournament_names), tournaments)
+    pairs = set()
+    for t_name, name1, name2 in zip(tournament_names, team1_names, team2_names):
+        tournament_id = tournaments.get(t_name)
+        if tournament_id is not None:
+            pairs.add((tournament_id, name1))
+            pairs.add((tournament_id, name2))
+    _lookup_teams(backend, cursor, pairs, teams)
+
+    rows = []
+    added = set()
+    for offset, (t_name, name1, name2, match_date) in enumerate(
+        zip(tournament_names, team1_names, team2_names, match_dates)
+    ):
+        line = first_line + offset
+        raw = {"tournament_name": t_name, "team1_name": name1, "team2_name": name2,
+               "match_date": chunk["match_date"].iat[offset]}
+        tournament_id = tournaments.get(t_name)
+        if tournament_id is None:
+            report.reject(line, "unknown tournament", raw)
+            continue
+        team1_id = teams.get((tournament_id, name1))
+        team2_id = teams.get((tournament_id, name2))
+        if team1_id is None or team2_id is None or team1_id < 0 or team2_id < 0:
+            report.reject(line, "unknown team", raw)
+        elif team1_id == team2_id:
+            report.reject(line, "team plays itself", raw)
+        elif pd.isna(match_date):
+            report.reject(line, "invalid match date", raw)
+        else:
+            rows.append((tournament_id, team1_id, team2_id, match_date.date()))
+            added.add(tournament_id)
+
+    if rows:
+        backend.insert_matches(cursor, rows)
+    report.inserted += len(rows)
+    return added
+
+
+@metrics.timed()
+def import_csv(file, kind=None, chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+    """Import a Teams or Matches CSV and return an ImportReport.
+
+    ``kind`` is detected from the header when omitted. ``progress`` is
+    called with the report after every committed chunk. A failed chunk
+    rolls back on its own; earlier chunks stay committed.
+    """
+    size = _file_size(file)
+    reader = pd.read_csv(file, chunksize=chunk_size, dtype=str, skipinitialspace=True)
+    report = None
+    tournaments = {}
+    teams = {}
+    line = 2  # first data line, after the header
+    backend = storage.get_backend()
+
+    for chunk in reader:
+        chunk.columns = _normalize(chunk.columns)
+        if report is None:
+            kind = kind or detect_kind(chunk.columns)
+            if kind not in ("teams", "matches"):
+                raise ValueError(
+                    f"CSV header must contain {', '.join(TEAM_COLUMNS)} or {', '.join(MATCH_COLUMNS)}"
+                )
+            report = ImportReport(kind=kind)
+        import_chunk = _import_teams_chunk if kind == "teams" else _import_matches_chunk
+
+        with backend.cursor(write=True) as cursor:
+            touched = import_chunk(backend, cursor, chunk, line, report, tournaments, teams)
+        cache.invalidate(*touched)
+
+        line += len(chunk)
+        report.rows_read += len(chunk)
+        report.elapsed = time.perf_counter() - report.started
+        if size:
+            report.fraction_done = min(1.0, file.tell() / size)
+        if progress is not None:
+            progress(report)
+
+    if report is None:
+        report = ImportReport(kind=kind or "unknown")
+    report.fraction_done = 1.0
+    report.elapsed = time.perf_counter() - report.started
+    return report
@@ -0,0 +1,574 @@
+"""PostgreSQL connection management for the Sports Event Manager.
+
+Every helper borrows a connection from one pool that lives for the whole
+server process, instead of opening a fresh connection per call.
+Connection settings come from the environment (or Streamlit secrets, via
+``configure``) rather than being hardcoded.
+
+Read-only transactions (``connection(replica=True)``) can be served by
+streaming read replicas listed in SPORTS_DB_REPLICAS; everything else
+goes to the primary. See "Read replicas" below for lag handling and
+read-your-writes.
+"""
+import atexit
+import itertools
+import logging
+import os
+import select
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+import psycopg2
+from psycopg2 import pool as pg_pool
+from psycopg2 import sql
+from psycopg2.extensions import cursor as PlainCursor
+from psycopg2.extensions import parse_dsn
+from psycopg2.extras import RealDictCursor
+
+from sports_data import metrics
+
+# -------------------------
+# Settings
+# -------------------------
+DEFAULT_SETTINGS = {
+    "dsn": None,
+    "host": "localhost",
+    "port": 5432,
+    "user": None,
+    "password": None,
+    "database": "Sports_Event_Tracker",
+    "pool_min": 1,
+    "pool_max": 10,
+    "checkout_timeout": 10.0,
+    "health_check_interval": 30.0,
+    "connect_timeout": 5,
+    # Comma-separated read replicas: host[:port] (sharing the primary's
+    # user, password and database) or full DSNs / URLs
+    "replicas": None,
+    "replica_max_lag": 5.0,
+    "replica_check_interval": 1.0,
+}
+
+# Environment variable -> settings key
+ENV_VARS = {
+    "DATABASE_URL": "dsn",
+    "SPORTS_DB_HOST": "host",
+    "SPORTS_DB_PORT": "port",
+    "SPORTS_DB_USER": "user",
+    "SPORTS_DB_PASSWORD": "password",
+    "SPORTS_DB_NAME": "database",
+    "SPORTS_DB_POOL_MIN": "pool_min",
+    "SPORTS_DB_POOL_MAX": "pool_max",
+    "SPORTS_DB_CHECKOUT_TIMEOUT": "checkout_timeout",
+    "SPORTS_DB_HEALTH_CHECK_INTERVAL": "health_check_interval",
+    "SPORTS_DB_CONNECT_TIMEOUT": "connect_timeout",
+    "SPORTS_DB_REPLICAS": "replicas",
+    "SPORTS_DB_REPLICA_MAX_LAG": "replica_max_lag",
+    "SPORTS_DB_REPLICA_CHECK_INTERVAL": "replica_check_interval",
+}
+
+_INT_KEYS = {"port", "pool_min", "pool_max", "connect_timeout"}
+_FLOAT_KEYS = {"checkout_timeout", "health_check_interval", "replica_max_lag", "replica_check_interval"}
+
+# Sent as application_name on every connection: identifies this process
+# in pg_stat_activity and lets live.py skip its own change notifications
+ORIGIN = f"sports_event_tracker/{uuid.uuid4().hex[:12]}"
+
+# Errors that mean the backend connection itself is unusable
+DISCONNECT_ERRORS = (psycopg2.OperationalError, psycopg2.InterfaceError)
+
+log = logging.getLogger(__name__)
+
+
+def _coerce(key, value):
+    if value is None or value == "":
+        return None
+    if key in _INT_KEYS:
+        return int(value)
+    if key in _FLOAT_KEYS:
+        return float(value)
+    return value
+
+
+def load_settings(overrides=None):
+    """Defaults, then environment variables, then explicit overrides."""
+    settings = dict(DEFAULT_SETTINGS)
+    for env_name, key in ENV_VARS.items():
+        if os.environ.get(env_name):
+            settings[key] = _coerce(key, os.environ[env_name])
+    for key, value in (overrides or {}).items():
+        if key not in DEFAULT_SETTINGS:
+            raise ValueError(f"Unknown database setting: {key}")
+        settings[key] = _coerce(key, value)
+    if settings["pool_min"] < 0 or settings["pool_max"] < max(1, settings["pool_min"]):
+        raise ValueError("pool_max must be >= max(1, pool_min)")
+    return settings
+
+
+def connect_kwargs(settings):
+    if settings["dsn"]:
+        return {
+            "dsn": settings["dsn"],
+            "connect_timeout": settings["connect_timeout"],
+            "application_name": ORIGIN,
+            "cursor_factory": CountingCursor,
+        }
+    kwargs = {
+        "host": settings["host"],
+        "port": settings["port"],
+        "user": settings["user"],
+        "password": settings["password"],
+        "dbname": settings["database"],
+        "connect_timeout": settings["connect_timeout"],
+        "application_name": ORIGIN,
+        "cursor_factory": CountingCursor,
+    }
+    # Let libpq fall back to PGUSER / ~/.pgpass etc. for anything unset
+    return {k: v for k, v in kwargs.items() if v is not None}
+
+
+# -------------------------
+# Statement counting
+# -------------------------
+_statements = 0
+_statements_lock = threading.Lock()
+
+
+def statement_count():
+    """Statements executed by this process so far (for benchmarks)."""
+    return _statements
+
+
+class _CountingMixin:
+    # Also times each statement for the diagnostics (see metrics.py)
+    def execute(self, query, vars=None):
+        global _statements
+        with _statements_lock:
+            _statements += 1
+        start = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            metrics.statement(time.perf_counter() - start, self.rowcount, query)
+
+    def executemany(self, query, vars_list):
+        global _statements
+        with _statements_lock:
+            _statements += 1
+        start = time.perf_counter()
+        try:
+            return super().executemany(query, vars_list)
+        finally:
+            metrics.statement(time.perf_counter() - start, self.rowcount, query)
+
+    def copy_expert(self, sql, file, size=8192):
+        global _statements
+        with _statements_lock:
+            _statements += 1
+        start = time.perf_counter()
+        try:
+            return super().copy_expert(sql, file, size)
+        finally:
+            metrics.statement(time.perf_counter() - start, self.rowcount, sql)
+
+
+class CountingCursor(_CountingMixin, PlainCursor):
+    pass
+
+
+class CountingDictCursor(_CountingMixin, RealDictCursor):
+    pass
+
+
+# -------------------------
+# Pool
+# -------------------------
+class ConnectionPool:
+    """Thread-safe pool with blocking checkout and health checks.
+
+    ``getconn`` waits up to ``checkout_timeout`` seconds for a free slot
+    instead of failing immediately when all ``pool_max`` connections are busy.
+    Connections idle for longer than ``health_check_interval`` are pinged
+    before being handed out, and dead ones are replaced transparently.
+    One the server has already hung up on is noticed without a ping.
+    """
+
+    def __init__(self, settings):
+        self.settings = settings
+        self._pool = pg_pool.ThreadedConnectionPool(
+            settings["pool_min"], settings["pool_max"], **connect_kwargs(settings)
+        )
+        self._slots = threading.BoundedSemaphore(settings["pool_max"])
+        self._last_used = {}
+        self._lock = threading.Lock()
+
+    def _is_healthy(self, conn):
+        if conn.closed:
+            return False
+        if select.select([conn], [], [], 0)[0]:
+            # The server spoke while the connection sat idle: usually to
+            # say it is terminating the session (shutdown, failover)
+            return False
+        last_used = self._last_used.get(id(conn))
+        if last_used is None:
+            # Freshly opened by the pool
+            return True
+        if time.monotonic() - last_used < self.settings["health_check_interval"]:
+            return True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except DISCONNECT_ERRORS:
+            return False
+
+    def getconn(self):
+        if not self._slots.acquire(timeout=self.settings["checkout_timeout"]):
+            raise pg_pool.PoolError(
+                f"No database connection available after {self.settings['checkout_timeout']}s"
+            )
+        try:
+            # Stale connections are discarded until a live (or new) one turns up
+            for _ in range(self.settings["pool_max"] + 1):
+                conn = self._pool.getconn()
+                if self._is_healthy(conn):
+                    return conn
+                self._discard(conn)
+            raise psycopg2.OperationalError("Could not obtain a live database connection")
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def _discard(self, conn):
+        with self._lock:
+            self._last_used.pop(id(conn), None)
+        self._pool.putconn(conn, close=True)
+
+    def putconn(self, conn, broken=False):
+        try:
+            if broken or conn.closed:
+                self._discard(conn)
+            else:
+                with self._lock:
+                    self._last_used[id(conn)] = time.monotonic()
+                self._pool.putconn(conn)
+        finally:
+            self._slots.release()
+
+    def closeall(self):
+        self._pool.closeall()
+
+
+# -------------------------
+# Read replicas
+# -------------------------
+# A replica serves a read only while it is streaming, at most
+# replica_max_lag seconds behind, and has replayed every write this
+# process has committed (or heard about through live.py). After a write,
+# reads therefore stick to the primary until a replica catches up, then
+# move back by themselves. The floor is process-wide rather than per
+# Streamlit session because the read cache is shared: a lagging read by
+# one session would otherwise be cached and served to the writer.
+# Lag is measured by a monitor thread every replica_check_interval
+# seconds, so reads never wait on it.
+REPLICA_CHECK_SQL = """
+    SELECT pg_is_in_recovery(),
+           pg_last_wal_replay_lsn()::text,
+           CASE WHEN (SELECT status FROM pg_stat_wal_receiver) = 'streaming'
+                     AND pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+                ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+           END
+"""
+
+
+def _lsn(text):
+    """pg_lsn text ("16/B374D848") as an integer."""
+    high, _, low = text.partition("/")
+    return (int(high, 16) << 32) + int(low, 16)
+
+
+def _replica_settings(settings, entry):
+    # Ping idle connections as often as lag is checked, so a replica that
+    # went away is noticed at checkout and the read goes to the primary
+    settings = {**settings, "health_check_interval": min(settings["health_check_interval"], settings["replica_check_interval"])}
+    if "=" in entry or "://" in entry:
+        return {**settings, "dsn": entry}
+    host, _, port = entry.partition(":")
+    return {**settings, "dsn": None, "host": host, "port": int(port) if port else settings["port"]}
+
+
+class Replica:
+    """One read replica: its pool plus the lag and replay position last measured."""
+
+    def __init__(self, settings):
+        self.settings = settings
+        if settings["dsn"]:
+            params = parse_dsn(settings["dsn"])
+            self.name = f"{params.get('host', 'localhost')}:{params.get('port', 5432)}"
+        else:
+            self.name = f"{settings['host']}:{settings['port']}"
+        self.pool = None
+        # Seconds behind the primary; None while unreachable or not a standby
+        self.lag = None
+        self.replay_lsn = 0
+        self.error = None
+        self.reads = 0
+
+    def check(self):
+        try:
+            if self.pool is None:
+                self.pool = ConnectionPool(self.settings)
+            conn = self.pool.getconn()
+            broken = False
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute(REPLICA_CHECK_SQL)
+                    in_recovery, replay_lsn, lag = cursor.fetchone()
+                conn.rollback()
+            except DISCONNECT_ERRORS:
+                broken = True
+                raise
+            finally:
+                self.pool.putconn(conn, broken=broken)
+        except psycopg2.Error as e:
+            if self.error is None:
+                log.warning("read replica %s unavailable: %s", self.name, str(e).strip())
+            self.lag, self.error = None, str(e).strip()
+            return
+        if not in_recovery:
+            # Promoted or misconfigured: its WAL positions say nothing about ours
+            self.lag, self.error = None, "not a standby"
+        elif lag is None:
+            # Nothing replayed since it started
+            self.lag, self.error = None, "no WAL replayed yet"
+        else:
+            self.lag, self.replay_lsn, self.error = float(lag), _lsn(replay_lsn), None
+
+    def usable(self, floor):
+        return self.lag is not None and self.lag <= self.settings["replica_max_lag"] and self.replay_lsn >= floor
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.closeall()
+
+
+_written_lsn = 0
+_written_lock = threading.Lock()
+_round_robin = itertools.count()
+_primary_reads = 0
+
+
+def note_write(cursor):
+    """Raise the read-your-writes floor to the primary's current WAL position.
+
+    ``cursor`` must be on the primary, outside any open write (the
+    position is read after commit). No-op without replicas.
+    """
+    global _written_lsn
+    if not get_replicas():
+        return
+    cursor.execute("SELECT pg_current_wal_lsn()::text")
+    lsn = _lsn(cursor.fetchone()[0])
+    with _written_lock:
+        _written_lsn = max(_written_lsn, lsn)
+
+
+def _monitor(replicas, interval, stopped):
+    while not stopped.is_set():
+        for replica in replicas:
+            replica.check()
+        stopped.wait(interval)
+
+
+def _route():
+    """A replica able to serve a read now, or None for the primary."""
+    usable = [replica for replica in get_replicas() if replica.usable(_written_lsn)]
+    return usable[next(_round_robin) % len(usable)] if usable else None
+
+
+def replica_status():
+    """One dict per configured replica (name, lag, caught_up, reads, error), for diagnostics."""
+    return [
+        {
+            "replica": replica.name,
+            "lag_seconds": replica.lag,
+            "caught_up": replica.lag is not None and replica.replay_lsn >= _written_lsn,
+            "reads": replica.reads,
+            "error": replica.error,
+        }
+        for replica in get_replicas()
+    ]
+
+
+def primary_read_count():
+    """Reads sent to the primary because no replica was usable."""
+    return _primary_reads
+
+
+_pool = None
+_replicas = None
+_monitor_stop = None
+_overrides = {}
+_pool_lock = threading.Lock()
+
+
+def configure(overrides=None):
+    """Apply settings on top of the environment (e.g. from st.secrets).
+
+    Safe to call on every rerun: the pool is only rebuilt when the
+    effective settings change.
+    """
+    global _overrides
+    overrides = dict(overrides or {})
+    with _pool_lock:
+        if overrides == _overrides:
+            return
+        _overrides = overrides
+        _close_pool_locked()
+
+
+def current_settings():
+    """The effective settings: environment plus the last ``configure`` call."""
+    return load_settings(_overrides)
+
+
+def get_pool():
+    """Return the process-wide pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(current_settings())
+    return _pool
+
+
+def get_replicas():
+    """The configured read replicas, with their lag monitor started (empty without any)."""
+    global _replicas, _monitor_stop
+    if _replicas is None:
+        with _pool_lock:
+            if _replicas is None:
+                settings = current_settings()
+                entries = [entry.strip() for entry in (settings["replicas"] or "").split(",") if entry.strip()]
+                replicas = [Replica(_replica_settings(settings, entry)) for entry in entries]
+                if replicas:
+                    _monitor_stop = threading.Event()
+                    threading.Thread(
+                        target=_monitor, args=(replicas, settings["replica_check_interval"], _monitor_stop),
+                        name="replica-monitor", daemon=True,
+                    ).start()
+                _replicas = replicas
+    return _replicas
+
+
+def _close_pool_locked():
+    global _pool, _replicas, _monitor_stop
+    if _pool is not None:
+        _pool.closeall()
+        _pool = None
+    if _monitor_stop is not None:
+        _monitor_stop.set()
+        _monitor_stop = None
+    for replica in _replicas or ():
+        replica.close()
+    _replicas = None
+
+
+def close_pool():
+    with _pool_lock:
+        _close_pool_locked()
+
+
+atexit.register(close_pool)
+
+
+def create_database(name):
+    """Create database ``name`` on the configured server unless it exists.
+
+    Connects to the ``postgres`` maintenance database to do it; used by
+    the benchmarks and the test suite for their scratch databases. They
+    are UTF-8 whatever the server's default, so team names outside ASCII
+    can be stored.
+    """
+    settings = {**current_settings(), "database": name, "dsn": None}
+    admin = psycopg2.connect(**connect_kwargs({**settings, "database": "postgres"}))
+    admin.autocommit = True
+    try:
+        with admin.cursor() as cur:
+            cur.execute("SELECT 1 FROM pg_database WHERE datname = %s", (name,))
+            if cur.fetchone() is None:
+                cur.execute(
+                    sql.SQL("CREATE DATABASE {} ENCODING 'UTF8' TEMPLATE template0").format(sql.Identifier(name))
+                )
+    finally:
+        admin.close()
+
+
+# -------------------------
+# Context-manager API
+# -------------------------
+@contextmanager
+def connection(replica=False):
+    """Borrow a pooled connection for one transaction.
+
+    Commits when the block exits normally and rolls back on error. If the
+    backend went away mid-transaction the connection is dropped from the
+    pool so the next checkout reconnects.
+
+    ``replica=True`` promises the transaction only reads, so it may run
+    on a read replica. Primary transactions are taken to write and move
+    the read-your-writes floor once committed.
+    """
+    global _primary_reads
+    pool, conn = None, None
+    target = _route() if replica else None
+    if target is not None:
+        try:
+            pool, conn = target.pool, target.pool.getconn()
+            target.reads += 1
+        except psycopg2.Error as e:
+            # Went away since the last check: serve this read from the primary
+            target.lag, target.error = None, str(e).strip()
+    if conn is None:
+        if replica and get_replicas():
+            _primary_reads += 1
+        pool = get_pool()
+        conn = pool.getconn()
+    broken = False
+    try:
+        yield conn
+        conn.commit()
+        if not replica and get_replicas():
+            try:
+                with conn.cursor() as cursor:
+                    note_write(cursor)
+                conn.rollback()
+            except psycopg2.Error as e:
+                # The write itself is committed; reads may just lag behind it
+                log.warning("could not read the primary WAL position: %s", e)
+                broken = bool(conn.closed)
+    except DISCONNECT_ERRORS as e:
+        broken = True
+        if target is not None and pool is target.pool:
+            target.lag, target.error = None, str(e).strip()
+        raise
+    except BaseException:
+        if not conn.closed:
+            conn.rollback()
+        raise
+    finally:
+        pool.putconn(conn, broken=broken or bool(conn.closed))
+
+
+@contextmanager
+def cursor(dict_rows=False, replica=False):
+    """Shortcut for ``connection()`` plus a cursor on it."""
+    with connection(replica) as conn:
+        cur = conn.cursor(cursor_factory=CountingDictCursor) if dict_rows else conn.cursor()
+        try:
+            yield cur
+        finally:
+            cur.close()
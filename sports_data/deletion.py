@@ -0,0 +1,138 @@
+"""Background, batched tournament deletion.
+
+delete_tournament() used to run four unbounded DELETEs in one transaction
+on the request thread, locking every row of a large tournament until it
+finished. Now the tournament is flagged ``deleting`` straight away and a
+single background worker removes its rows in small batches, each in its
+own short transaction, before dropping the tournament row itself (the
+ON DELETE CASCADE foreign keys sweep up anything added meanwhile).
+Progress is kept per tournament for the UI.
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sports_data import cache, db
+
+BATCH_SIZE = int(os.environ.get("SPORTS_DELETE_BATCH_SIZE", 5000))
+# Short pause between batches so scorers' transactions get a turn
+BATCH_PAUSE = 0.05
+
+# Child tables in dependency order, with their key column
+BATCHED_TABLES = (
+    ("Matches", "match_id"),
+    ("Points_Table", "team_id"),
+    ("Team_Stats", "team_id"),
+    # Several rows per team; the physical row id keeps batches exact
+    ("Head_To_Head", "ctid"),
+    ("Fair_Play", "team_id"),
+    ("Teams", "team_id"),
+)
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tournament-delete")
+_jobs = {}
+_jobs_lock = threading.Lock()
+_resumed = False
+_resume_lock = threading.Lock()
+
+
+class DeleteJob:
+    def __init__(self, tournament_id):
+        self.tournament_id = tournament_id
+        self.state = "queued"
+        self.total = 0
+        self.deleted = 0
+        self.error = None
+
+    @property
+    def fraction_done(self):
+        if self.state == "done":
+            return 1.0
+        return self.deleted / self.total if self.total else 0.0
+
+
+def _delete_batch(table, key, tournament_id):
+    # ANY(ARRAY(...)) keeps the plan to key lookups even when the planner
+    # has no statistics for a freshly bulk-loaded tournament
+    with db.cursor() as cursor:
+        cursor.execute(f"""
+            DELETE FROM {table}
+            WHERE tournament_id = %s
+              AND {key} = ANY(ARRAY(SELECT {key} FROM {table} WHERE tournament_id = %s LIMIT %s))
+        """, (tournament_id, tournament_id, BATCH_SIZE))
+        return cursor.rowcount
+
+
+def _run(job):
+    job.state = "running"
+    try:
+        with db.cursor() as cursor:
+            cursor.execute("""
+                SELECT (SELECT COUNT(*) FROM Matches WHERE tournament_id = %(t)s)
+                     + (SELECT COUNT(*) FROM Points_Table WHERE tournament_id = %(t)s)
+                     + (SELECT COUNT(*) FROM Team_Stats WHERE tournament_id = %(t)s)
+                     + (SELECT COUNT(*) FROM Head_To_Head WHERE tournament_id = %(t)s)
+                     + (SELECT COUNT(*) FROM Fair_Play WHERE tournament_id = %(t)s)
+                     + (SELECT COUNT(*) FROM Teams WHERE tournament_id = %(t)s)
+            """, {"t": job.tournament_id})
+            job.total = cursor.fetchone()[0] + 1
+
+        for table, key in BATCHED_TABLES:
+            while True:
+                deleted = _delete_batch(table, key, job.tournament_id)
+                job.deleted += deleted
+                if deleted < BATCH_SIZE:
+                    break
+                time.sleep(BATCH_PAUSE)
+
+        with db.cursor() as cursor:
+            cursor.execute("DELETE FROM Tournaments WHERE tournament_id = %s", (job.tournament_id,))
+        job.deleted = job.total
+        job.state = "done"
+    except Exception as e:
+        # Leave the flag set: the job is retried by resume_pending() on restart
+        job.state = "failed"
+        job.error = str(e)
+    finally:
+        cache.invalidate(cache.TOURNAMENTS, job.tournament_id)
+
+
+def _submit(tournament_id):
+    with _jobs_lock:
+        job = _jobs.get(tournament_id)
+        if job is not None and job.state in ("queued", "running"):
+            return job
+        job = _jobs[tournament_id] = DeleteJob(tournament_id)
+    _executor.submit(_run, job)
+    return job
+
+
+def delete_tournament(tournament_id):
+    """Flag the tournament as deleting and queue its removal; returns the job."""
+    with db.cursor() as cursor:
+        cursor.execute("UPDATE Tournaments SET deleting = true WHERE tournament_id = %s", (tournament_id,))
+    cache.invalidate(cache.TOURNAMENTS, tournament_id)
+    return _submit(tournament_id)
+
+
+def resume_pending():
+    """Requeue deletions interrupted by a restart (once per process).
+
+    Only marked done once the lookup succeeds, so a database that is down
+    at startup is asked again on the next call.
+    """
+    global _resumed
+    with _resume_lock:
+        if _resumed:
+            return
+        with db.cursor() as cursor:
+            cursor.execute("SELECT tournament_id FROM Tournaments WHERE deleting")
+            pending = [row[0] for row in cursor.fetchall()]
+        _resumed = True
+    for tournament_id in pending:
+        _submit(tournament_id)
+
+
+def get_job(tournament_id):
+    return _jobs.get(tournament_id)
@@ -0,0 +1,105 @@
+"""Streaming export of matches and standings to CSV or Parquet.
+
+Broadcasters and stats partners get whole seasons, so export() never
+holds its result in memory. Rows are read CHUNK_ROWS at a time, through
+a server-side cursor on PostgreSQL or sqlite3's lazy cursor, and each
+chunk is written out before the next is fetched. Memory stays flat
+however many rows match. CSV from PostgreSQL comes straight from COPY
+TO and is never decoded in Python.
+
+That holds for the CLI, which writes to a file or stdout. The app's
+Export Data page builds the same file, but st.download_button reads the
+finished file into memory to serve it. Use the CLI for exports too large
+to hold once.
+
+    python -m sports_data.export matches --format parquet -o season.parquet
+    python -m sports_data.export standings --tournament 3 > table.csv
+
+Matches carry team and tournament names as in get_matches; standings
+are the Points_Table with the same names.
+"""
+import argparse
+import os
+import sys
+import tempfile
+from datetime import date
+
+from sports_data import columnar, metrics, storage
+
+KINDS = ("matches", "standings")
+FORMATS = ("csv", "parquet")
+MIME_TYPES = {"csv": "text/csv", "parquet": "application/vnd.apache.parquet"}
+CHUNK_ROWS = int(os.environ.get("SPORTS_EXPORT_CHUNK_ROWS", 20_000))
+
+
+@metrics.timed()
+def export(kind, fmt, out, tournament_id=None, date_from=None, date_to=None):
+    """Write every ``kind`` row matching the filters to the binary file ``out``.
+
+    Returns the number of rows written.
+    """
+    if kind not in KINDS:
+        raise ValueError(f"kind must be one of {KINDS}")
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of {FORMATS}")
+    backend = storage.get_backend()
+    sql, params, columns = backend.export_query(kind, tournament_id, date_from, date_to)
+    if fmt == "csv":
+        return backend.copy_csv(sql, params, columns, out, CHUNK_ROWS)
+
+    import pyarrow.parquet as pq
+    schema = columnar.arrow_schema(columns)
+    written = 0
+    with pq.ParquetWriter(out, schema) as writer:
+        # One row group per chunk
+        for rows in backend.iter_rows(sql, params, CHUNK_ROWS):
+            writer.write_batch(columnar.record_batch(rows, schema))
+            written += len(rows)
+    return written
+
+
+def export_file(kind, fmt, **filters):
+    """Export into a new temporary file; returns (path, rows). The caller deletes it.
+
+    Writing the file streams as export() does. Whatever serves it decides
+    how much of it is held in memory.
+    """
+    fd, path = tempfile.mkstemp(prefix=f"{kind}-", suffix=f".{fmt}")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            written = export(kind, fmt, out, **filters)
+    except BaseException:
+        os.unlink(path)
+        raise
+    return path, written
+
+
+def file_name(kind, fmt, tournament_name=None):
+    """Download name such as ``matches-summer-cup.parquet``."""
+    scope = "-".join(tournament_name.lower().split()) if tournament_name else "all"
+    return f"{kind}-{scope}.{fmt}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export matches or standings to CSV or Parquet")
+    parser.add_argument("kind", choices=KINDS)
+    parser.add_argument("--format", choices=FORMATS, default="csv")
+    parser.add_argument("--tournament", type=int, help="only this tournament_id")
+    parser.add_argument("--from", dest="date_from", type=date.fromisoformat, help="first date (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="date_to", type=date.fromisoformat, help="last date (YYYY-MM-DD)")
+    parser.add_argument("-o", "--output", help="file to write (default: stdout)")
+    args = parser.parse_args(argv)
+
+    filters = {"tournament_id": args.tournament, "date_from": args.date_from, "date_to": args.date_to}
+    if args.output:
+        with open(args.output, "wb") as out:
+            written = export(args.kind, args.format, out, **filters)
+    else:
+        written = export(args.kind, args.format, sys.stdout.buffer, **filters)
+        sys.stdout.buffer.flush()
+    print(f"Exported {written} {args.kind} rows", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,190 @@
+"""Round-robin and knockout fixture generation with bulk scheduling.
+
+Pairings come from Berger tables (round-robin) or a seeded bracket
+(knockout), then every match is given the earliest date that respects
+both teams' rest days and the per-date capacity, round by round. Rows
+are produced lazily and inserted in chunks inside one transaction, so a
+league of thousands of teams is scheduled without holding millions of
+fixtures in memory, and a window that turns out too short inserts
+nothing.
+
+Only the first knockout round can be scheduled up front: later rounds
+depend on results.
+"""
+from datetime import timedelta
+
+from sports_data import cache, metrics, storage
+
+FORMATS = ("round_robin", "double_round_robin", "knockout")
+INSERT_CHUNK = 10_000
+
+
+def round_robin(team_ids, legs=1):
+    """Yield rounds (lists of (home, away)) in which every pair meets ``legs`` times.
+
+    Berger tables. With an even number of teams the last one is held
+    out, leaving m (odd) teams: in round r the team at index r + d meets
+    the one at r - d (mod m), and the team at r meets the held-out one,
+    or has a bye for an odd number of teams. The side whose offset from
+    r is odd plays at home, so every team alternates home and away
+    except around its game against the held-out team, which alternates
+    by round. Home and away counts differ by at most one; the second leg
+    swaps them.
+    """
+    teams = list(team_ids)
+    fixed = teams.pop() if teams and len(teams) % 2 == 0 else None
+    m = len(teams)
+    for leg in range(legs):
+        for round_no in range(m):
+            pairs = []
+            if fixed is not None:
+                opponent = teams[round_no]
+                pairs.append((fixed, opponent) if round_no % 2 == 0 else (opponent, fixed))
+            for offset in range(1, (m + 1) // 2):
+                # Offsets d and m - d have opposite parity, m being odd
+                a, b = teams[(round_no + offset) % m], teams[(round_no - offset) % m]
+                pairs.append((a, b) if offset % 2 else (b, a))
+            if leg % 2:
+                pairs = [(away, home) for home, away in pairs]
+            yield pairs
+
+
+def _bracket_order(size):
+    """Seeds in bracket order, e.g. 8 -> [1, 8, 4, 5, 2, 7, 3, 6]."""
+    order = [1]
+    while len(order) < size:
+        total = 2 * len(order) + 1
+        order = [seed for s in order for seed in (s, total - s)]
+    return order
+
+
+def knockout(team_ids):
+    """Yield the first knockout round, seeded in the given order.
+
+    Brackets are padded to a power of two; the top seeds get the byes.
+    """
+    teams = list(team_ids)
+    size = 1
+    while size < len(teams):
+        size *= 2
+    order = _bracket_order(size)
+    pairs = []
+    for i in range(0, size, 2):
+        a, b = order[i], order[i + 1]
+        if a <= len(teams) and b <= len(teams):
+            pairs.append((teams[a - 1], teams[b - 1]))
+    yield pairs
+
+
+class _Calendar:
+    """Finds the first day from a given one with a free slot.
+
+    Full days are linked to the next day (path-compressed), so skipping
+    past a long run of full dates stays cheap.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.used = {}
+        self.next_day = {}
+
+    def first_free(self, day):
+        path = []
+        while day in self.next_day:
+            path.append(day)
+            day = self.next_day[day]
+        for full in path:
+            self.next_day[full] = day
+        return day
+
+    def book(self, day):
+        self.used[day] = self.used.get(day, 0) + 1
+        if self.capacity is not None and self.used[day] >= self.capacity:
+            self.next_day[day] = day + 1
+
+
+def schedule(rounds, start_date, end_date, rest_days=0, per_date=None):
+    """Yield (home, away, match_date) for every pairing in ``rounds``.
+
+    A team plays at most once a day and then rests ``rest_days`` full
+    days; no more than ``per_date`` matches share a date. Rounds are
+    played in order: no match starts before the previous round's first
+    day. Raises ValueError if a match would fall after ``end_date``.
+    """
+    if rest_days < 0:
+        raise ValueError("rest_days must be >= 0")
+    if per_date is not None and per_date < 1:
+        raise ValueError("per_date must be at least 1")
+    last_day = (end_date - start_date).days
+    calendar = _Calendar(per_date)
+    available = {}  # team -> first day it may play again
+    round_start = 0
+    for pairs in rounds:
+        first_in_round = None
+        for home, away in pairs:
+            day = calendar.first_free(max(round_start, available.get(home, 0), available.get(away, 0)))
+            if day > last_day:
+                raise ValueError(
+                    f"Not enough dates between {start_date} and {end_date}: "
+                    "allow fewer rest days, more matches per date or a longer tournament"
+                )
+            calendar.book(day)
+            available[home] = available[away] = day + rest_days + 1
+            first_in_round = day if first_in_round is None else min(first_in_round, day)
+            yield home, away, start_date + timedelta(days=day)
+        if first_in_round is not None:
+            round_start = first_in_round
+
+
+def fixture_count(team_count, fmt):
+    """Matches ``fmt`` creates for ``team_count`` teams (for previews)."""
+    if fmt == "knockout":
+        if team_count < 2:
+            return 0
+        size = 1
+        while size < team_count:
+            size *= 2
+        return team_count - size // 2
+    legs = 2 if fmt == "double_round_robin" else 1
+    return legs * team_count * (team_count - 1) // 2
+
+
+@metrics.timed()
+def create_fixtures(tournament_id, fmt="round_robin", rest_days=0, per_date=None):
+    """Generate and insert a tournament's fixtures in one transaction.
+
+    Uses the tournament's teams (in team_id order, which is also the
+    knockout seeding) and its start_date..end_date window. Returns
+    (matches inserted, first date, last date).
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of {FORMATS}")
+    backend = storage.get_backend()
+    tournament = next((t for t in backend.get_tournaments() if t["tournament_id"] == tournament_id), None)
+    if tournament is None:
+        raise ValueError(f"Tournament {tournament_id} does not exist")
+    team_ids = [t["team_id"] for t in backend.get_teams(tournament_id)]
+    if len(team_ids) < 2:
+        raise ValueError("At least 2 teams are required")
+
+    if fmt == "knockout":
+        rounds = knockout(team_ids)
+    else:
+        rounds = round_robin(team_ids, legs=2 if fmt == "double_round_robin" else 1)
+    fixtures = schedule(rounds, tournament["start_date"], tournament["end_date"], rest_days, per_date)
+
+    inserted = 0
+    first_date = last_date = None
+    with backend.cursor(write=True) as cursor:
+        chunk = []
+        for home, away, match_date in fixtures:
+            chunk.append((tournament_id, home, away, match_date))
+            first_date = match_date if first_date is None else min(first_date, match_date)
+            last_date = match_date if last_date is None else max(last_date, match_date)
+            if len(chunk) == INSERT_CHUNK:
+                inserted += backend.insert_matches(cursor, chunk)
+                chunk = []
+        if chunk:
+            inserted += backend.insert_matches(cursor, chunk)
+    cache.invalidate(tournament_id)
+    return inserted, first_date, last_date
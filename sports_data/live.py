@@ -0,0 +1,100 @@
+"""Push-based refresh: PostgreSQL change notifications fanned out in-process.
+
+Migration 0006 makes every committed write NOTIFY ``sports_changes`` with
+the tournaments it touched. One listener thread per server process holds
+a dedicated connection LISTENing on that channel and turns each
+notification into a read-cache invalidation. That drops stale entries
+and moves the version that open sessions watch (``version``), so a page
+refreshes only when its own tournament changed. Hundreds of viewers cost
+one idle connection instead of hundreds of pollers.
+
+Notifications this process sent itself are skipped: its writers have
+already invalidated the cache. The listener is always on the primary
+(standbys do not relay NOTIFY).
+"""
+import logging
+import select
+import threading
+import time
+
+import psycopg2
+
+from sports_data import cache, db
+
+CHANNEL = "sports_changes"
+# Ping the listening connection when idle this long, to notice a dead server
+IDLE_PING_SECONDS = 30
+RECONNECT_DELAY = 5
+
+log = logging.getLogger(__name__)
+
+_thread = None
+_thread_lock = threading.Lock()
+
+
+def version(scope):
+    """Current change counter for a tournament id, cache.TOURNAMENTS or cache.ALL."""
+    return cache.read_cache.version(scope)
+
+
+def _scopes(notifies):
+    scopes = set()
+    for notify in notifies:
+        origin, _, scope = notify.payload.rpartition(" ")
+        if origin == db.ORIGIN:
+            continue
+        scopes.add(int(scope) if scope.isdigit() else scope)
+    return scopes
+
+
+def _listen(conn):
+    conn.autocommit = True
+    with conn.cursor() as cursor:
+        cursor.execute(f"LISTEN {CHANNEL}")
+    while True:
+        readable, _, _ = select.select([conn], [], [], IDLE_PING_SECONDS)
+        if not readable:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            continue
+        conn.poll()
+        notifies, conn.notifies[:] = list(conn.notifies), []
+        scopes = _scopes(notifies)
+        if scopes:
+            # Keep the refreshed reads off replicas that have not replayed the change yet
+            with conn.cursor() as cursor:
+                db.note_write(cursor)
+            cache.invalidate(*scopes)
+
+
+def _run():
+    reconnecting = False
+    while True:
+        try:
+            conn = psycopg2.connect(**db.connect_kwargs(db.current_settings()))
+        except psycopg2.Error as e:
+            log.warning("change listener could not connect: %s", e)
+            time.sleep(RECONNECT_DELAY)
+            continue
+        try:
+            if reconnecting:
+                # Notifications sent while we were away are lost
+                cache.clear()
+                cache.invalidate(cache.TOURNAMENTS)
+            _listen(conn)
+        except psycopg2.Error as e:
+            log.warning("change listener lost its connection: %s", e)
+        finally:
+            conn.close()
+        reconnecting = True
+        time.sleep(RECONNECT_DELAY)
+
+
+def start():
+    """Start the process's listener thread unless it is already running."""
+    global _thread
+    with _thread_lock:
+        if _thread is None or not _thread.is_alive():
+            _thread = threading.Thread(target=_run, name="change-listener", daemon=True)
+            _thread.start()
+    return _thread
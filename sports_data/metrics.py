@@ -0,0 +1,430 @@
+"""Query and rerun instrumentation.
+
+Every data-layer call the app makes is wrapped with ``timed``: it records
+wall time, database time, statements and rows under a label (the helper's
+name). Cursors of both storage engines report each statement through
+``statement``, so database time and statement counts are attributed to
+the call that issued them. Cache hits never reach the database and are
+not recorded.
+
+``rerun`` brackets one Streamlit run (the whole script or a single
+fragment) and collects its totals: calls, statements, database time and
+the remaining render time, plus how often each label was called, which
+is how an N+1 loop shows up. Calls slower than ``slow_query_ms`` are
+logged and kept in a short slow-query log.
+
+Everything is in-process; ``prometheus_text`` renders it in the
+Prometheus text format and ``serve`` exposes it over HTTP.
+"""
+import functools
+import logging
+import os
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+
+# Calls at least this slow (milliseconds) go to the slow-query log
+slow_query_ms = float(os.environ.get("SPORTS_SLOW_QUERY_MS", 250))
+SLOW_LOG_SIZE = 100
+RECENT_RERUNS = 50
+# Histogram buckets (seconds) for call and rerun durations
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+log = logging.getLogger(__name__)
+
+_local = threading.local()
+
+
+class _Call:
+    __slots__ = ("label", "statements", "db_seconds", "rows", "slowest")
+
+    def __init__(self, label):
+        self.label = label
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.rows = 0
+        self.slowest = (0.0, None)
+
+
+class _Rerun:
+    __slots__ = ("label", "started", "seconds", "db_seconds", "queries", "statements", "calls")
+
+    def __init__(self, label):
+        self.label = label
+        self.started = time.time()
+        self.seconds = 0.0
+        self.db_seconds = 0.0
+        self.queries = 0
+        self.statements = 0
+        self.calls = Counter()
+
+    def as_dict(self):
+        return {
+            "label": self.label,
+            "started": self.started,
+            "seconds": self.seconds,
+            "db_seconds": self.db_seconds,
+            "render_seconds": max(self.seconds - self.db_seconds, 0.0),
+            "queries": self.queries,
+            "statements": self.statements,
+            "calls": dict(self.calls),
+        }
+
+
+class _Histogram:
+    __slots__ = ("counts", "count", "sum")
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds):
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.counts[i] += 1
+        self.count += 1
+        self.sum += seconds
+
+
+class _LabelStats:
+    __slots__ = ("calls", "errors", "slow", "statements", "rows", "db_seconds", "durations")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.slow = 0
+        self.statements = 0
+        self.rows = 0
+        self.db_seconds = 0.0
+        self.durations = _Histogram()
+
+
+class Registry:
+    """Process-wide totals shared by every session and background thread."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.labels = {}
+            self.slow_log = deque(maxlen=SLOW_LOG_SIZE)
+            self.recent_reruns = deque(maxlen=RECENT_RERUNS)
+            self.rerun_durations = _Histogram()
+            self.rerun_db_seconds = 0.0
+            self.rerun_queries = 0
+            self.rerun_statements = 0
+
+    def record_call(self, call, seconds, failed):
+        slow = seconds * 1000 >= slow_query_ms
+        with self._lock:
+            stats = self.labels.get(call.label)
+            if stats is None:
+                stats = self.labels[call.label] = _LabelStats()
+            stats.calls += 1
+            stats.errors += failed
+            stats.slow += slow
+            stats.statements += call.statements
+            stats.rows += call.rows
+            stats.db_seconds += call.db_seconds
+            stats.durations.observe(seconds)
+            if slow:
+                self.slow_log.append({
+                    "at": time.time(),
+                    "label": call.label,
+                    "ms": seconds * 1000,
+                    "db_ms": call.db_seconds * 1000,
+                    "statements": call.statements,
+                    "rows": call.rows,
+                    "sql": call.slowest[1],
+                })
+        if slow:
+            log.warning(
+                "slow query %s: %.0fms (%.0fms in %d statements, %d rows)",
+                call.label, seconds * 1000, call.db_seconds * 1000, call.statements, call.rows
+            )
+
+    def record_rerun(self, rerun):
+        with self._lock:
+            self.recent_reruns.append(rerun.as_dict())
+            self.rerun_durations.observe(rerun.seconds)
+            self.rerun_db_seconds += rerun.db_seconds
+            self.rerun_queries += rerun.queries
+            self.rerun_statements += rerun.statements
+
+    def snapshot(self):
+        """Plain-data copy for the Diagnostics page."""
+        with self._lock:
+            labels = [
+                {
+                    "label": label,
+                    "calls": s.calls,
+                    "errors": s.errors,
+                    "slow": s.slow,
+                    "statements": s.statements,
+                    "rows": s.rows,
+                    "total_ms": s.durations.sum * 1000,
+                    "db_ms": s.db_seconds * 1000,
+                    "avg_ms": s.durations.sum * 1000 / s.calls if s.calls else 0.0,
+                }
+                for label, s in self.labels.items()
+            ]
+            return {
+                "labels": sorted(labels, key=lambda row: row["total_ms"], reverse=True),
+                "slow_log": list(reversed(self.slow_log)),
+                "recent_reruns": list(reversed(self.recent_reruns)),
+                "reruns": self.rerun_durations.count,
+            }
+
+
+registry = Registry()
+
+
+def set_slow_query_ms(ms):
+    global slow_query_ms
+    slow_query_ms = float(ms)
+
+
+# -------------------------
+# Recording
+# -------------------------
+def statement(seconds, rows=-1, sql=None):
+    """Report one executed statement; called by the storage engines' cursors."""
+    calls = getattr(_local, "calls", None)
+    if calls:
+        call = calls[-1]
+        call.statements += 1
+        call.db_seconds += seconds
+        if rows > 0:
+            call.rows += rows
+        if seconds > call.slowest[0]:
+            call.slowest = (seconds, sql if isinstance(sql, str) else None)
+    rerun = getattr(_local, "rerun", None)
+    if rerun is not None:
+        rerun.statements += 1
+        rerun.db_seconds += seconds
+
+
+@contextmanager
+def track(label):
+    """Record the enclosed block as one call to ``label``."""
+    calls = getattr(_local, "calls", None)
+    if calls is None:
+        calls = _local.calls = []
+    call = _Call(label)
+    calls.append(call)
+    failed = False
+    start = time.perf_counter()
+    try:
+        yield call
+    except BaseException:
+        failed = True
+        raise
+    finally:
+        seconds = time.perf_counter() - start
+        calls.pop()
+        if calls:
+            # Nested helpers: the outer call includes the inner one's work
+            parent = calls[-1]
+            parent.statements += call.statements
+            parent.db_seconds += call.db_seconds
+            parent.rows += call.rows
+        else:
+            rerun = getattr(_local, "rerun", None)
+            if rerun is not None:
+                rerun.queries += 1
+                rerun.calls[label] += 1
+        registry.record_call(call, seconds, failed)
+
+
+def _row_count(result):
+    if isinstance(result, bool) or result is None:
+        return None
+    if isinstance(result, int):
+        return result
+    try:
+        return len(result)
+    except TypeError:
+        return None
+
+
+def timed(label=None):
+    """Decorator form of ``track``; rows come from the result when it is sized."""
+    def decorator(func):
+        name = label or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with track(name) as call:
+                result = func(*args, **kwargs)
+                rows = _row_count(result)
+                if rows is not None:
+                    call.rows = rows
+                return result
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def rerun(label):
+    """Collect one run's totals; nested uses (a page inside the script) are folded in.
+
+    Also usable as a decorator, so a fragment's own reruns are measured
+    while a full run records just once.
+    """
+    if getattr(_local, "rerun", None) is not None:
+        yield _local.rerun
+        return
+    current = _local.rerun = _Rerun(label)
+    start = time.perf_counter()
+    try:
+        yield current
+    finally:
+        current.seconds = time.perf_counter() - start
+        _local.rerun = None
+        registry.record_rerun(current)
+
+
+def run_collected(func, *args, **kwargs):
+    """Call ``func`` on a worker thread, collecting its calls for another thread's rerun.
+
+    Returns (result, collected); pass the collected runs to
+    ``merge_concurrent`` on the thread that owns the rerun.
+    """
+    collected = _local.rerun = _Rerun(None)
+    try:
+        return func(*args, **kwargs), collected
+    finally:
+        _local.rerun = None
+
+
+def merge_concurrent(collected, waited):
+    """Fold worker threads' calls into this thread's rerun.
+
+    The calls overlapped, so the rerun's DB time grows by the ``waited``
+    seconds the page actually blocked, not by the sum of their parts.
+    """
+    rerun = getattr(_local, "rerun", None)
+    if rerun is None:
+        return
+    for run in collected:
+        rerun.queries += run.queries
+        rerun.statements += run.statements
+        rerun.calls.update(run.calls)
+    rerun.db_seconds += waited
+
+
+# -------------------------
+# Prometheus export
+# -------------------------
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _histogram_lines(name, histogram, labels=""):
+    sep = "," if labels else ""
+    lines = [
+        f'{name}_bucket{{{labels}{sep}le="{bound}"}} {count}'
+        for bound, count in zip(BUCKETS, histogram.counts)
+    ]
+    lines.append(f'{name}_bucket{{{labels}{sep}le="+Inf"}} {histogram.count}')
+    suffix = f"{{{labels}}}" if labels else ""
+    lines.append(f"{name}_sum{suffix} {histogram.sum}")
+    lines.append(f"{name}_count{suffix} {histogram.count}")
+    return lines
+
+
+def prometheus_text():
+    """Current metrics in the Prometheus text exposition format."""
+    from sports_data import cache
+
+    lines = []
+
+    def metric(name, kind, help_text, samples):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        lines.extend(samples)
+
+    with registry._lock:
+        labels = sorted(registry.labels.items())
+
+        def per_label(attr):
+            return [f'{{label="{_escape(label)}"}} {getattr(s, attr)}' for label, s in labels]
+
+        metric("sports_db_calls_total", "counter", "Data-layer calls that reached the database.",
+               [f"sports_db_calls_total{s}" for s in per_label("calls")])
+        metric("sports_db_call_errors_total", "counter", "Data-layer calls that raised.",
+               [f"sports_db_call_errors_total{s}" for s in per_label("errors")])
+        metric("sports_db_slow_calls_total", "counter", "Calls slower than the slow-query threshold.",
+               [f"sports_db_slow_calls_total{s}" for s in per_label("slow")])
+        metric("sports_db_statements_total", "counter", "SQL statements executed per call label.",
+               [f"sports_db_statements_total{s}" for s in per_label("statements")])
+        metric("sports_db_rows_total", "counter", "Rows returned or written per call label.",
+               [f"sports_db_rows_total{s}" for s in per_label("rows")])
+        metric("sports_db_time_seconds_total", "counter", "Time spent executing SQL per call label.",
+               [f"sports_db_time_seconds_total{s}" for s in per_label("db_seconds")])
+        call_samples = []
+        for label, s in labels:
+            call_samples.extend(_histogram_lines("sports_db_call_seconds", s.durations, f'label="{_escape(label)}"'))
+        metric("sports_db_call_seconds", "histogram", "Wall time of data-layer calls.", call_samples)
+        metric("sports_rerun_seconds", "histogram", "Wall time of app and fragment reruns.",
+               _histogram_lines("sports_rerun_seconds", registry.rerun_durations))
+        metric("sports_rerun_db_seconds_total", "counter", "Database time spent inside reruns.",
+               [f"sports_rerun_db_seconds_total {registry.rerun_db_seconds}"])
+        metric("sports_rerun_queries_total", "counter", "Data-layer calls made by reruns.",
+               [f"sports_rerun_queries_total {registry.rerun_queries}"])
+        metric("sports_rerun_statements_total", "counter", "SQL statements executed by reruns.",
+               [f"sports_rerun_statements_total {registry.rerun_statements}"])
+
+    cache_stats = cache.stats()
+    for key, kind in (("hits", "counter"), ("misses", "counter"), ("evictions", "counter"), ("size", "gauge")):
+        name = f"sports_cache_{key}" + ("_total" if kind == "counter" else "")
+        metric(name, kind, f"Read cache {key}.", [f"{name} {cache_stats[key]}"])
+    return "\n".join(lines) + "\n"
+
+
+# Loopback only unless SPORTS_METRICS_HOST says otherwise
+DEFAULT_METRICS_HOST = "127.0.0.1"
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def serve(port=None, host=None):
+    """Serve /metrics on ``port`` (default SPORTS_METRICS_PORT) once per process.
+
+    Listens on ``host`` (default SPORTS_METRICS_HOST, else 127.0.0.1), so
+    query labels and timings stay on this machine unless a scraper
+    elsewhere is opted in, e.g. with ``0.0.0.0``. Returns the server, or
+    None when no port is configured.
+    """
+    global _server
+    port = port or os.environ.get("SPORTS_METRICS_PORT")
+    if not port:
+        return None
+    host = host or os.environ.get("SPORTS_METRICS_HOST") or DEFAULT_METRICS_HOST
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = prometheus_text().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    with _server_lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((host, int(port)), MetricsHandler)
+            threading.Thread(target=_server.serve_forever, name="metrics-exporter", daemon=True).start()
+    return _server
@@ -0,0 +1,257 @@
+"""Versioned schema migrations.
+
+Migrations are the numbered ``migrations/NNNN_name.sql`` files, applied in
+order, each in its own transaction, and recorded in schema_migrations
+with a checksum so an edited migration is caught instead of silently
+skipped.
+
+    python -m sports_data.migrate          # apply pending migrations
+    python -m sports_data.migrate status   # list applied / pending
+    python -m sports_data.migrate check    # EXPLAIN the hot queries, fail if an index isn't used
+"""
+import argparse
+import hashlib
+import json
+import re
+from datetime import date
+from pathlib import Path
+
+from sports_data import db, standings
+from sports_data.names import name_key
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent / "migrations"
+MIGRATION_FILE = re.compile(r"^(\d+)_(\w+)\.sql$")
+
+# Arbitrary key for pg_advisory_xact_lock so concurrent runners queue up
+LOCK_KEY = 727_001
+
+CREATE_MIGRATIONS_TABLE = """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        checksum TEXT NOT NULL,
+        applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+    )
+"""
+
+# Checksums of earlier texts of migrations that were since rewritten in a
+# re-runnable way (0006-0008 now share one trigger helper instead of
+# repeating the DO block). A database that applied an old text gets the
+# current one re-run and its checksum updated instead of an error.
+SUPERSEDED_CHECKSUMS = {
+    6: {"b4fc1b44abe5e953bf784df32de7b4656429b43e45e8c2e654e5a7e66f99602d"},
+    7: {"5ecc6a33ddc1caaa29a5fd052c27023b55cdd00000676dbb94473f2b22ac0460"},
+    8: {"08cbe3ea0c9f5fc842e5074612bb12a48a452225c92f580ea774d5ffeee1687e"},
+}
+
+
+
+def _fold_team_names(cursor):
+    # lower() in 0011 already matches name_key() for ASCII names
+    cursor.execute("SELECT team_id, name FROM Teams WHERE name ~ '[^\\x01-\\x7f]'")
+    cursor.executemany(
+        "UPDATE Teams SET name_key = %s WHERE team_id = %s",
+        [(name_key(name), team_id) for team_id, name in cursor.fetchall()]
+    )
+
+
+# What a migration needs computed in Python, run after its SQL in the same
+# transaction
+PYTHON_STEPS = {11: _fold_team_names}
+
+
+class Migration:
+    def __init__(self, path):
+        match = MIGRATION_FILE.match(path.name)
+        self.path = path
+        self.version = int(match.group(1))
+        self.name = match.group(2)
+        self.sql = path.read_text(encoding="utf-8")
+        self.checksum = hashlib.sha256(self.sql.encode("utf-8")).hexdigest()
+
+    def __repr__(self):
+        return f"Migration({self.version:04d}_{self.name})"
+
+
+def discover(directory=MIGRATIONS_DIR):
+    migrations = [Migration(p) for p in sorted(directory.glob("*.sql")) if MIGRATION_FILE.match(p.name)]
+    versions = [m.version for m in migrations]
+    if len(versions) != len(set(versions)):
+        raise RuntimeError(f"Duplicate migration versions in {directory}")
+    return sorted(migrations, key=lambda m: m.version)
+
+
+def _applied(cursor):
+    cursor.execute(CREATE_MIGRATIONS_TABLE)
+    cursor.execute("SELECT version, checksum FROM schema_migrations")
+    return dict(cursor.fetchall())
+
+
+def status():
+    """Return [(migration, applied)] for every migration on disk."""
+    with db.cursor() as cursor:
+        applied = _applied(cursor)
+    return [(m, m.version in applied) for m in discover()]
+
+
+def migrate(target=None):
+    """Apply pending migrations up to ``target`` (inclusive); return those applied."""
+    done = []
+    for migration in discover():
+        if target is not None and migration.version > target:
+            break
+        with db.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_xact_lock(%s)", (LOCK_KEY,))
+            applied = _applied(cursor)
+            if migration.version in applied:
+                recorded = applied[migration.version]
+                if recorded == migration.checksum:
+                    continue
+                if recorded not in SUPERSEDED_CHECKSUMS.get(migration.version, ()):
+                    raise RuntimeError(
+                        f"{migration.path.name} was edited after being applied; "
+                        "add a new migration instead"
+                    )
+                cursor.execute(migration.sql)
+                cursor.execute(
+                    "UPDATE schema_migrations SET checksum = %s WHERE version = %s",
+                    (migration.checksum, migration.version)
+                )
+                done.append(migration)
+                continue
+            cursor.execute(migration.sql)
+            if migration.version in PYTHON_STEPS:
+                PYTHON_STEPS[migration.version](cursor)
+            cursor.execute(
+                "INSERT INTO schema_migrations (version, name, checksum) VALUES (%s, %s, %s)",
+                (migration.version, migration.name, migration.checksum)
+            )
+        done.append(migration)
+    return done
+
+
+# -------------------------
+# Index usage checks
+# -------------------------
+# (label, statement, indexes any one of which the plan must use). Each
+# statement comes from the PostgreSQL backend's own *_query accessor, so
+# what is checked is exactly what the helper runs.
+HOT_QUERIES = [
+    (
+        "teams page by tournament",
+        lambda backend: backend.teams_query(1, limit=50, after=0),
+        ("teams_tournament_idx",),
+    ),
+    (
+        "team search by prefix",
+        lambda backend: backend.search_teams_query(1, "man", limit=200),
+        ("teams_name_key_idx",),
+    ),
+    (
+        "matches by tournament",
+        lambda backend: backend.matches_query(1, limit=50),
+        ("matches_tournament_date_idx",),
+    ),
+    (
+        "pending matches",
+        lambda backend: backend.matches_query(status="pending", limit=50),
+        # Either partial index keeps completed matches out of the scan
+        ("matches_pending_date_idx", "matches_pending_tournament_idx"),
+    ),
+    (
+        "pending matches by tournament",
+        lambda backend: backend.matches_query(1, status="pending", limit=50),
+        ("matches_pending_tournament_idx",),
+    ),
+    (
+        "recent matches keyset page",
+        lambda backend: backend.matches_query(limit=50, after=(date(2030, 1, 1), 1_000_000)),
+        ("matches_date_idx",),
+    ),
+    (
+        "record results",
+        lambda backend: backend.record_results_query([(1, 2, 1), (2, 0, 0)]),
+        ("matches_pkey",),
+    ),
+    (
+        "standings",
+        lambda backend: backend.standings_query(1, standings.DEFAULT_TIE_BREAKERS),
+        ("points_table_standings_idx", "points_table_tournament_team_key"),
+    ),
+    (
+        "team stats by tournament",
+        lambda backend: backend.team_stats_query(1),
+        ("teams_tournament_idx",),
+    ),
+    (
+        "team stats for one team",
+        lambda backend: backend.team_stats_query(1, 1),
+        ("teams_pkey", "teams_tournament_idx"),
+    ),
+    (
+        "head to head pair",
+        lambda backend: backend.head_to_head_query(1, 1, 2),
+        ("head_to_head_pkey",),
+    ),
+]
+
+
+def _index_names(plan):
+    names = set()
+    if "Index Name" in plan:
+        names.add(plan["Index Name"])
+    for child in plan.get("Plans", []):
+        names |= _index_names(child)
+    return names
+
+
+def check_indexes(queries=HOT_QUERIES):
+    """EXPLAIN every hot query; return [(label, expected, used, ok)].
+
+    Sequential scans are disabled for the check so the answer doesn't
+    depend on how much data the database holds: the question is whether
+    the planner *can* serve the query from the index.
+    """
+    from sports_data.storage.postgres import PostgresBackend
+    backend = PostgresBackend()
+    results = []
+    with db.cursor() as cursor:
+        cursor.execute("SET LOCAL enable_seqscan = off")
+        for label, statement, expected in queries:
+            query, params = statement(backend)
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {query}", params)
+            plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            used = _index_names(plan[0]["Plan"])
+            results.append((label, expected, sorted(used), bool(used & set(expected))))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Apply or inspect schema migrations")
+    parser.add_argument("command", nargs="?", default="up", choices=["up", "status", "check"])
+    parser.add_argument("--target", type=int, help="stop after this version (up only)")
+    args = parser.parse_args(argv)
+
+    if args.command == "up":
+        applied = migrate(args.target)
+        for migration in applied:
+            print(f"applied {migration.path.name}")
+        print(f"{len(applied)} migrations applied")
+        return 0
+
+    if args.command == "status":
+        for migration, applied in status():
+            print(f"[{'x' if applied else ' '}] {migration.path.name}")
+        return 0
+
+    failures = 0
+    for label, expected, used, ok in check_indexes():
+        failures += not ok
+        print(f"{'ok  ' if ok else 'FAIL'} {label}: expected {' or '.join(expected)}, plan uses {used or 'no index'}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,38 @@
+-- Base schema. IF NOT EXISTS so databases created by hand before
+-- migrations existed are adopted as-is.
+
+CREATE TABLE IF NOT EXISTS Tournaments (
+    tournament_id SERIAL PRIMARY KEY,
+    name VARCHAR(100) NOT NULL,
+    start_date DATE NOT NULL,
+    end_date DATE NOT NULL,
+    CONSTRAINT tournaments_dates_check CHECK (end_date >= start_date)
+);
+
+CREATE TABLE IF NOT EXISTS Teams (
+    team_id SERIAL PRIMARY KEY,
+    tournament_id INTEGER NOT NULL REFERENCES Tournaments (tournament_id),
+    name VARCHAR(100) NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS Matches (
+    match_id SERIAL PRIMARY KEY,
+    tournament_id INTEGER NOT NULL REFERENCES Tournaments (tournament_id),
+    team1_id INTEGER NOT NULL REFERENCES Teams (team_id),
+    team2_id INTEGER NOT NULL REFERENCES Teams (team_id),
+    match_date DATE NOT NULL,
+    team1_score INTEGER,
+    team2_score INTEGER,
+    winner_id INTEGER REFERENCES Teams (team_id),
+    CONSTRAINT matches_distinct_teams_check CHECK (team1_id <> team2_id)
+);
+
+CREATE TABLE IF NOT EXISTS Points_Table (
+    tournament_id INTEGER NOT NULL REFERENCES Tournaments (tournament_id),
+    team_id INTEGER NOT NULL REFERENCES Teams (team_id),
+    matches_played INTEGER NOT NULL DEFAULT 0,
+    wins INTEGER NOT NULL DEFAULT 0,
+    losses INTEGER NOT NULL DEFAULT 0,
+    draws INTEGER NOT NULL DEFAULT 0,
+    points INTEGER NOT NULL DEFAULT 0
+);
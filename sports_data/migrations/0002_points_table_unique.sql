@@ -0,0 +1,33 @@
+-- One Points_Table row per team and tournament, required by the
+-- INSERT ... ON CONFLICT upsert in update_match_results().
+
+-- Older databases may already hold duplicate rows from the previous
+-- SELECT-then-INSERT code path: fold them together first.
+CREATE TEMP TABLE points_merged ON COMMIT DROP AS
+SELECT tournament_id, team_id,
+       SUM(matches_played) AS matches_played,
+       SUM(wins) AS wins,
+       SUM(losses) AS losses,
+       SUM(draws) AS draws,
+       SUM(points) AS points
+FROM Points_Table
+GROUP BY tournament_id, team_id
+HAVING COUNT(*) > 1;
+
+DELETE FROM Points_Table pt
+USING points_merged m
+WHERE pt.tournament_id = m.tournament_id AND pt.team_id = m.team_id;
+
+INSERT INTO Points_Table (tournament_id, team_id, matches_played, wins, losses, draws, points)
+SELECT tournament_id, team_id, matches_played, wins, losses, draws, points
+FROM points_merged;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_constraint WHERE conname = 'points_table_tournament_team_key'
+    ) THEN
+        ALTER TABLE Points_Table
+            ADD CONSTRAINT points_table_tournament_team_key UNIQUE (tournament_id, team_id);
+    END IF;
+END $$;
@@ -0,0 +1,30 @@
+-- Indexes for the filters and orderings the helpers actually run.
+
+-- get_teams(), team counts
+CREATE INDEX IF NOT EXISTS teams_tournament_idx
+    ON Teams (tournament_id, team_id);
+
+-- get_matches(): recent matches across tournaments, keyset on (match_date, match_id)
+CREATE INDEX IF NOT EXISTS matches_date_idx
+    ON Matches (match_date DESC, match_id DESC);
+
+-- get_matches(tournament_id=...), match counts
+CREATE INDEX IF NOT EXISTS matches_tournament_date_idx
+    ON Matches (tournament_id, match_date DESC, match_id DESC);
+
+-- Update Results: pending matches only, overall and per tournament
+CREATE INDEX IF NOT EXISTS matches_pending_date_idx
+    ON Matches (match_date DESC, match_id DESC)
+    WHERE team1_score IS NULL;
+
+CREATE INDEX IF NOT EXISTS matches_pending_tournament_idx
+    ON Matches (tournament_id, match_date DESC, match_id DESC)
+    WHERE team1_score IS NULL;
+
+-- Foreign keys into Teams, so deleting teams doesn't scan Matches
+CREATE INDEX IF NOT EXISTS matches_team1_idx ON Matches (team1_id);
+CREATE INDEX IF NOT EXISTS matches_team2_idx ON Matches (team2_id);
+
+-- Standings: one tournament ordered by points
+CREATE INDEX IF NOT EXISTS points_table_standings_idx
+    ON Points_Table (tournament_id, points DESC, wins DESC);
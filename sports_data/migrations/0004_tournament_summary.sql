@@ -0,0 +1,9 @@
+-- Counters read by get_tournament_summaries() when SPORTS_SUMMARY_TABLE=1
+-- (see summary.py, which also creates the table lazily).
+
+CREATE TABLE IF NOT EXISTS Tournament_Summary (
+    tournament_id INTEGER PRIMARY KEY REFERENCES Tournaments (tournament_id) ON DELETE CASCADE,
+    team_count INTEGER NOT NULL DEFAULT 0,
+    match_count INTEGER NOT NULL DEFAULT 0,
+    completed INTEGER NOT NULL DEFAULT 0
+);
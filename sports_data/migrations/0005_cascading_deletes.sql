@@ -0,0 +1,45 @@
+-- Let the database remove a tournament's dependents: Teams, Matches and
+-- Points_Table rows cascade from their tournament (and team), and a
+-- deleted team simply clears Matches.winner_id.
+-- Existing foreign keys on these columns are replaced whatever their name.
+
+DO $$
+DECLARE
+    fk RECORD;
+    existing RECORD;
+BEGIN
+    FOR fk IN
+        SELECT * FROM (VALUES
+            ('teams', 'tournament_id', 'tournaments', 'tournament_id', 'CASCADE'),
+            ('matches', 'tournament_id', 'tournaments', 'tournament_id', 'CASCADE'),
+            ('matches', 'team1_id', 'teams', 'team_id', 'CASCADE'),
+            ('matches', 'team2_id', 'teams', 'team_id', 'CASCADE'),
+            ('matches', 'winner_id', 'teams', 'team_id', 'SET NULL'),
+            ('points_table', 'tournament_id', 'tournaments', 'tournament_id', 'CASCADE'),
+            ('points_table', 'team_id', 'teams', 'team_id', 'CASCADE')
+        ) AS f (tbl, col, ref_tbl, ref_col, on_delete)
+    LOOP
+        FOR existing IN
+            SELECT c.conname
+            FROM pg_constraint c
+            JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = ANY (c.conkey)
+            WHERE c.contype = 'f'
+              AND c.conrelid = fk.tbl::regclass
+              AND array_length(c.conkey, 1) = 1
+              AND a.attname = fk.col
+        LOOP
+            EXECUTE format('ALTER TABLE %I DROP CONSTRAINT %I', fk.tbl, existing.conname);
+        END LOOP;
+        EXECUTE format(
+            'ALTER TABLE %I ADD CONSTRAINT %I FOREIGN KEY (%I) REFERENCES %I (%I) ON DELETE %s',
+            fk.tbl, fk.tbl || '_' || fk.col || '_fkey', fk.col, fk.ref_tbl, fk.ref_col, fk.on_delete
+        );
+    END LOOP;
+END $$;
+
+-- Set while a background job removes the tournament in batches
+ALTER TABLE Tournaments ADD COLUMN IF NOT EXISTS deleting BOOLEAN NOT NULL DEFAULT false;
+
+-- Every deleted team looks up the rows that reference it
+CREATE INDEX IF NOT EXISTS matches_winner_idx ON Matches (winner_id) WHERE winner_id IS NOT NULL;
+CREATE INDEX IF NOT EXISTS points_table_team_idx ON Points_Table (team_id);
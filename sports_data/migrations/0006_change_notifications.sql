@@ -0,0 +1,55 @@
+-- Announce committed changes on the sports_changes channel so servers can
+-- refresh open views without polling (see sports_data/live.py).
+-- Statement-level triggers cover every writer, including CSV imports,
+-- background deletes and manual fixes. The payload is
+-- "<application_name> <tournament_id>", plus "<application_name> tournaments"
+-- when the tournament list itself changes. PostgreSQL delivers a NOTIFY
+-- only on commit and folds duplicates within a transaction.
+
+CREATE OR REPLACE FUNCTION notify_sports_change() RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+    origin TEXT := current_setting('application_name');
+BEGIN
+    IF TG_OP <> 'DELETE' THEN
+        PERFORM pg_notify('sports_changes', origin || ' ' || changed.tournament_id)
+        FROM (SELECT DISTINCT tournament_id FROM new_rows) changed;
+    END IF;
+    IF TG_OP <> 'INSERT' THEN
+        PERFORM pg_notify('sports_changes', origin || ' ' || changed.tournament_id)
+        FROM (SELECT DISTINCT tournament_id FROM old_rows) changed;
+    END IF;
+    IF TG_TABLE_NAME = 'tournaments' THEN
+        PERFORM pg_notify('sports_changes', origin || ' tournaments');
+    END IF;
+    RETURN NULL;
+END $$;
+
+-- Attaches the three statement-level triggers to one table; later
+-- migrations call it for the tables they add. Transition tables allow one
+-- event per trigger, hence three per table.
+CREATE OR REPLACE FUNCTION add_sports_change_triggers(tbl TEXT) RETURNS void
+LANGUAGE plpgsql AS $$
+BEGIN
+    EXECUTE format('DROP TRIGGER IF EXISTS %I ON %I', tbl || '_notify_insert', tbl);
+    EXECUTE format('DROP TRIGGER IF EXISTS %I ON %I', tbl || '_notify_update', tbl);
+    EXECUTE format('DROP TRIGGER IF EXISTS %I ON %I', tbl || '_notify_delete', tbl);
+    EXECUTE format(
+        'CREATE TRIGGER %I AFTER INSERT ON %I REFERENCING NEW TABLE AS new_rows '
+        'FOR EACH STATEMENT EXECUTE FUNCTION notify_sports_change()',
+        tbl || '_notify_insert', tbl
+    );
+    EXECUTE format(
+        'CREATE TRIGGER %I AFTER UPDATE ON %I REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows '
+        'FOR EACH STATEMENT EXECUTE FUNCTION notify_sports_change()',
+        tbl || '_notify_update', tbl
+    );
+    EXECUTE format(
+        'CREATE TRIGGER %I AFTER DELETE ON %I REFERENCING OLD TABLE AS old_rows '
+        'FOR EACH STATEMENT EXECUTE FUNCTION notify_sports_change()',
+        tbl || '_notify_delete', tbl
+    );
+END $$;
+
+SELECT add_sports_change_triggers(tbl)
+FROM unnest(ARRAY['tournaments', 'teams', 'matches', 'points_table']) AS tbl;
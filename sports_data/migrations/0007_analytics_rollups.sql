@@ -0,0 +1,104 @@
+-- Rollups behind the team analytics (see sports_data/analytics.py): each
+-- team's home and away record plus its form, and every head-to-head
+-- pairing (stored from both sides, so a pair is one key lookup).
+-- record_results keeps them current from now on; existing results are
+-- backfilled here. team1 is the home side.
+
+CREATE TABLE IF NOT EXISTS Team_Stats (
+    tournament_id INTEGER NOT NULL REFERENCES Tournaments (tournament_id) ON DELETE CASCADE,
+    team_id INTEGER NOT NULL REFERENCES Teams (team_id) ON DELETE CASCADE,
+    home_played INTEGER NOT NULL DEFAULT 0,
+    home_wins INTEGER NOT NULL DEFAULT 0,
+    home_draws INTEGER NOT NULL DEFAULT 0,
+    home_losses INTEGER NOT NULL DEFAULT 0,
+    home_goals_for INTEGER NOT NULL DEFAULT 0,
+    home_goals_against INTEGER NOT NULL DEFAULT 0,
+    away_played INTEGER NOT NULL DEFAULT 0,
+    away_wins INTEGER NOT NULL DEFAULT 0,
+    away_draws INTEGER NOT NULL DEFAULT 0,
+    away_losses INTEGER NOT NULL DEFAULT 0,
+    away_goals_for INTEGER NOT NULL DEFAULT 0,
+    away_goals_against INTEGER NOT NULL DEFAULT 0,
+    -- Last results, newest first ("WWDLW")
+    form VARCHAR(10) NOT NULL DEFAULT '',
+    PRIMARY KEY (tournament_id, team_id)
+);
+
+CREATE TABLE IF NOT EXISTS Head_To_Head (
+    tournament_id INTEGER NOT NULL REFERENCES Tournaments (tournament_id) ON DELETE CASCADE,
+    team_id INTEGER NOT NULL REFERENCES Teams (team_id) ON DELETE CASCADE,
+    opponent_id INTEGER NOT NULL REFERENCES Teams (team_id) ON DELETE CASCADE,
+    played INTEGER NOT NULL DEFAULT 0,
+    wins INTEGER NOT NULL DEFAULT 0,
+    draws INTEGER NOT NULL DEFAULT 0,
+    losses INTEGER NOT NULL DEFAULT 0,
+    goals_for INTEGER NOT NULL DEFAULT 0,
+    goals_against INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (tournament_id, team_id, opponent_id)
+);
+
+-- Deleted teams cascade through these
+CREATE INDEX IF NOT EXISTS team_stats_team_idx ON Team_Stats (team_id);
+CREATE INDEX IF NOT EXISTS head_to_head_team_idx ON Head_To_Head (team_id);
+CREATE INDEX IF NOT EXISTS head_to_head_opponent_idx ON Head_To_Head (opponent_id);
+
+-- Same change notifications as the other tables (0006)
+SELECT add_sports_change_triggers(tbl) FROM unnest(ARRAY['team_stats', 'head_to_head']) AS tbl;
+
+-- Backfill from the results recorded so far
+CREATE TEMP TABLE result_sides ON COMMIT DROP AS
+SELECT tournament_id, team1_id AS team_id, team2_id AS opponent_id, 1 AS home,
+       team1_score AS gf, team2_score AS ga, match_date, match_id
+FROM Matches
+WHERE team1_score IS NOT NULL AND team2_score IS NOT NULL
+UNION ALL
+SELECT tournament_id, team2_id, team1_id, 0, team2_score, team1_score, match_date, match_id
+FROM Matches
+WHERE team1_score IS NOT NULL AND team2_score IS NOT NULL;
+
+INSERT INTO Team_Stats (
+    tournament_id, team_id,
+    home_played, home_wins, home_draws, home_losses, home_goals_for, home_goals_against,
+    away_played, away_wins, away_draws, away_losses, away_goals_for, away_goals_against,
+    form
+)
+SELECT s.tournament_id, s.team_id,
+       COUNT(*) FILTER (WHERE home = 1),
+       COUNT(*) FILTER (WHERE home = 1 AND gf > ga),
+       COUNT(*) FILTER (WHERE home = 1 AND gf = ga),
+       COUNT(*) FILTER (WHERE home = 1 AND gf < ga),
+       COALESCE(SUM(gf) FILTER (WHERE home = 1), 0),
+       COALESCE(SUM(ga) FILTER (WHERE home = 1), 0),
+       COUNT(*) FILTER (WHERE home = 0),
+       COUNT(*) FILTER (WHERE home = 0 AND gf > ga),
+       COUNT(*) FILTER (WHERE home = 0 AND gf = ga),
+       COUNT(*) FILTER (WHERE home = 0 AND gf < ga),
+       COALESCE(SUM(gf) FILTER (WHERE home = 0), 0),
+       COALESCE(SUM(ga) FILTER (WHERE home = 0), 0),
+       MAX(f.form)
+FROM result_sides s
+JOIN (
+    SELECT team_id,
+           string_agg(CASE WHEN gf > ga THEN 'W' WHEN gf < ga THEN 'L' ELSE 'D' END, ''
+                      ORDER BY match_date DESC, match_id DESC) AS form
+    FROM (
+        SELECT *, ROW_NUMBER() OVER (PARTITION BY team_id ORDER BY match_date DESC, match_id DESC) AS rn
+        FROM result_sides
+    ) ranked
+    WHERE rn <= 5
+    GROUP BY team_id
+) f ON f.team_id = s.team_id
+GROUP BY s.tournament_id, s.team_id
+ON CONFLICT DO NOTHING;
+
+INSERT INTO Head_To_Head (tournament_id, team_id, opponent_id, played, wins, draws, losses, goals_for, goals_against)
+SELECT tournament_id, team_id, opponent_id,
+       COUNT(*),
+       COUNT(*) FILTER (WHERE gf > ga),
+       COUNT(*) FILTER (WHERE gf = ga),
+       COUNT(*) FILTER (WHERE gf < ga),
+       SUM(gf),
+       SUM(ga)
+FROM result_sides
+GROUP BY tournament_id, team_id, opponent_id
+ON CONFLICT DO NOTHING;
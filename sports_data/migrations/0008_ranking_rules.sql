@@ -0,0 +1,24 @@
+-- Per-tournament standings rules (see sports_data/standings.py). A
+-- tournament without a Tournament_Rules row ranks with the default
+-- tie-breaker chain. Fair_Play holds each team's disciplinary points
+-- (lower is better), entered by the organisers; a team without a row
+-- has none.
+
+CREATE TABLE IF NOT EXISTS Tournament_Rules (
+    tournament_id INTEGER PRIMARY KEY REFERENCES Tournaments (tournament_id) ON DELETE CASCADE,
+    -- Comma-separated tie-breaker names, applied in order after points
+    tie_breakers VARCHAR(200) NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS Fair_Play (
+    tournament_id INTEGER NOT NULL REFERENCES Tournaments (tournament_id) ON DELETE CASCADE,
+    team_id INTEGER NOT NULL REFERENCES Teams (team_id) ON DELETE CASCADE,
+    points INTEGER NOT NULL DEFAULT 0 CHECK (points >= 0),
+    PRIMARY KEY (tournament_id, team_id)
+);
+
+-- Deleted teams cascade through this
+CREATE INDEX IF NOT EXISTS fair_play_team_idx ON Fair_Play (team_id);
+
+-- Same change notifications as the other tables (0006)
+SELECT add_sports_change_triggers(tbl) FROM unnest(ARRAY['tournament_rules', 'fair_play']) AS tbl;
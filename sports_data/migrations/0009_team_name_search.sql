@@ -0,0 +1,7 @@
+-- Team search (search_teams): a typed prefix becomes a range on the
+-- lowercased name within one tournament, read in name order, so a
+-- typeahead touches only the rows it returns however many teams there
+-- are. COLLATE "C" makes the order byte-wise in any database locale, the
+-- only order in which "starts with" is a contiguous range.
+CREATE INDEX IF NOT EXISTS teams_name_prefix_idx
+    ON Teams (tournament_id, (lower(name) COLLATE "C"), team_id);
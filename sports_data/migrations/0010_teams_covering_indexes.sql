@@ -0,0 +1,15 @@
+-- Both Teams indexes lead with tournament_id, so a query that only filters
+-- on it could be served by either. Carrying name in each lets the one whose
+-- order matches answer from the index alone: teams_tournament_idx in
+-- team_id order (get_teams, team_stats), teams_name_prefix_idx in name
+-- order (search_teams). Each is rebuilt under a temporary name, then
+-- swapped in.
+CREATE INDEX IF NOT EXISTS teams_tournament_covering_idx
+    ON Teams (tournament_id, team_id) INCLUDE (name);
+DROP INDEX IF EXISTS teams_tournament_idx;
+ALTER INDEX teams_tournament_covering_idx RENAME TO teams_tournament_idx;
+
+CREATE INDEX IF NOT EXISTS teams_name_prefix_covering_idx
+    ON Teams (tournament_id, (lower(name) COLLATE "C"), team_id) INCLUDE (name);
+DROP INDEX IF EXISTS teams_name_prefix_idx;
+ALTER INDEX teams_name_prefix_covering_idx RENAME TO teams_name_prefix_idx;
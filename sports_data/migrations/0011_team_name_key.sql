@@ -0,0 +1,13 @@
+-- Team search ranges over a stored, case-folded name (names.name_key)
+-- instead of lower(name), whose folding depends on the engine and the
+-- database's LC_CTYPE. COLLATE "C" keeps the order byte-wise, the only
+-- order in which "starts with" is a contiguous range. lower() is right
+-- for ASCII names; migrate.py refolds the others in Python after this
+-- runs, in the same transaction.
+ALTER TABLE Teams ADD COLUMN IF NOT EXISTS name_key TEXT COLLATE "C";
+UPDATE Teams SET name_key = lower(name) WHERE name_key IS NULL;
+ALTER TABLE Teams ALTER COLUMN name_key SET NOT NULL;
+
+CREATE INDEX IF NOT EXISTS teams_name_key_idx
+    ON Teams (tournament_id, name_key, team_id) INCLUDE (name);
+DROP INDEX IF EXISTS teams_name_prefix_idx;
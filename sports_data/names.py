@@ -0,0 +1,13 @@
+"""How team names are matched ignoring case.
+
+Team search ranges over Teams.name_key, which every writer stores as
+name_key(name), with the typed prefix folded the same way; the prefix
+cache narrows its rows with the same function. SQL's lower() would not
+do: SQLite's folds ASCII only and PostgreSQL's depends on the database's
+LC_CTYPE, so "Ölympia" would match "öl" in memory but not in the query.
+"""
+
+
+def name_key(name):
+    """``name`` with Unicode case folding applied, e.g. "Straße" -> "strasse"."""
+    return name.casefold()
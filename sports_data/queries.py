@@ -0,0 +1,210 @@
+"""Data-access helpers: every query and write the app makes.
+
+Kept free of Streamlit so scripts, background jobs and the benchmark
+suite can import them without starting the UI. The SQL lives in the
+storage engine picked by SPORTS_STORAGE (see storage/); this module adds
+the read cache and its invalidation. Each helper is timed by metrics.py
+underneath the cache, so only calls that reach the database are counted.
+"""
+from sports_data import cache, metrics, result_queue, standings, storage
+from sports_data.storage.base import MATCH_STATUSES
+
+# Teams a typeahead shows, and the rows fetched per searched prefix: a
+# prefix matching fewer than that is cached whole (cache.PrefixCache)
+TEAM_SEARCH_LIMIT = 20
+TEAM_SEARCH_FETCH_ROWS = 200
+
+# -------------------------
+# Helper functions
+# -------------------------
+@cache.cached(lambda: cache.TOURNAMENTS)
+@metrics.timed()
+def get_tournaments():
+    return storage.get_backend().get_tournaments()
+
+@cache.cached(lambda tournament_id, limit=None, after=None: tournament_id)
+@metrics.timed()
+def get_teams(tournament_id, limit=None, after=None):
+    """Teams in the order they were added.
+
+    For keyset pagination pass the team_id of the last team already
+    shown as ``after``.
+    """
+    return storage.get_backend().get_teams(tournament_id, limit, after)
+
+@cache.prefix_cached(TEAM_SEARCH_FETCH_ROWS, TEAM_SEARCH_LIMIT)
+@metrics.timed()
+def search_teams(tournament_id, prefix="", limit=TEAM_SEARCH_LIMIT):
+    """Typeahead: the first ``limit`` teams whose name starts with ``prefix`` (any case), by name.
+
+    An empty prefix gives the first teams alphabetically. Answered from
+    the tournament's prefix cache when an earlier, shorter search already
+    holds every match.
+    """
+    return storage.get_backend().search_teams(tournament_id, prefix, limit)
+
+def _matches_scope(tournament_id=None, *args, **kwargs):
+    return cache.ALL if tournament_id is None else tournament_id
+
+@cache.cached(_matches_scope)
+@metrics.timed()
+def get_matches(tournament_id=None, status=None, date_from=None, date_to=None, limit=None, after=None):
+    """Matches newest first, filtered and paginated in the database.
+
+    status is "pending" (no score yet) or "completed". For keyset
+    pagination pass the (match_date, match_id) of the last row already
+    shown as ``after`` to get the rows that follow it.
+    """
+    return storage.get_backend().get_matches(tournament_id, status, date_from, date_to, limit, after)
+
+@cache.cached(_matches_scope)
+@metrics.timed()
+def get_match_frame(tournament_id=None, status=None, date_from=None, date_to=None, limit=None, after=None):
+    """get_matches as an Arrow-backed DataFrame for tables and charts.
+
+    Scores are nullable ints, match_date a date column. The frame is
+    shared through the cache: copy it before changing it.
+    """
+    return storage.get_backend().get_match_frame(tournament_id, status, date_from, date_to, limit, after)
+
+@cache.cached(lambda tournament_id: tournament_id)
+@metrics.timed()
+def get_tournament_stats(tournament_id):
+    return storage.get_backend().get_tournament_stats(tournament_id)
+
+@cache.cached(lambda limit=None, offset=0: cache.ALL)
+@metrics.timed()
+def get_tournament_summaries(limit=None, offset=0):
+    """Tournaments with team_count, match_count and completed in one query.
+
+    Pass limit/offset to fetch a single page (ordered by tournament_id).
+    """
+    return storage.get_backend().get_tournament_summaries(limit, offset)
+
+@cache.cached(lambda tournament_id: tournament_id)
+@metrics.timed()
+def get_standings(tournament_id):
+    """Ranked standings: points, then the tournament's tie-breakers, with dense positions."""
+    return storage.get_backend().get_standings(tournament_id)
+
+@cache.cached(lambda tournament_id: tournament_id)
+@metrics.timed()
+def get_tie_breakers(tournament_id):
+    """The tournament's tie-breaker chain (standings.DEFAULT_TIE_BREAKERS unless set)."""
+    return storage.get_backend().get_tie_breakers(tournament_id)
+
+@cache.cached(lambda tournament_id: tournament_id)
+@metrics.timed()
+def get_fair_play(tournament_id):
+    """{team_id: disciplinary points}; teams without an entry have none."""
+    return storage.get_backend().get_fair_play(tournament_id)
+
+@cache.cached(lambda tournament_id: tournament_id)
+@metrics.timed()
+def get_fair_play_teams(tournament_id):
+    """The teams with disciplinary points (team_id, name, points), by name."""
+    return storage.get_backend().get_fair_play_teams(tournament_id)
+
+@cache.cached(lambda tournament_id: tournament_id)
+@metrics.timed()
+def get_team_analytics(tournament_id):
+    """Every team's home/away record and form (zeros before its first result)."""
+    return storage.get_backend().get_team_analytics(tournament_id)
+
+@cache.cached(lambda tournament_id, team_id: tournament_id)
+@metrics.timed()
+def get_team_stats(tournament_id, team_id):
+    """One team's home/away record and form, or None if it isn't in the tournament."""
+    return storage.get_backend().get_team_stats(tournament_id, team_id)
+
+@cache.cached(lambda tournament_id, team_id, opponent_id: tournament_id)
+@metrics.timed()
+def get_head_to_head(tournament_id, team_id, opponent_id):
+    """team_id's record against opponent_id, or None if they haven't met."""
+    return storage.get_backend().get_head_to_head(tournament_id, team_id, opponent_id)
+
+def resume_pending_work():
+    """Restart work a previous process left unfinished (deletions, queued results)."""
+    storage.get_backend().resume_pending_work()
+    result_queue.start()
+
+def listen_for_changes():
+    """Keep the read cache (and the pages watching it) current with other servers' writes."""
+    storage.get_backend().listen_for_changes()
+
+# -------------------------
+# Insert tournament
+# -------------------------
+@metrics.timed()
+def add_tournament(name, start_date, end_date):
+    storage.get_backend().add_tournament(name, start_date, end_date)
+    cache.invalidate(cache.TOURNAMENTS)
+
+# -------------------------
+# Delete tournament
+# -------------------------
+@metrics.timed()
+def delete_tournament(tournament_id):
+    # PostgreSQL flags the tournament and removes it in batches on a
+    # background thread (returning the job); SQLite deletes it outright
+    job = storage.get_backend().delete_tournament(tournament_id)
+    cache.invalidate(cache.TOURNAMENTS, tournament_id)
+    return job
+
+# -------------------------
+# Insert team
+# -------------------------
+@metrics.timed()
+def add_team(tournament_id, name):
+    storage.get_backend().add_team(tournament_id, name)
+    cache.invalidate(tournament_id)
+
+# -------------------------
+# Insert match
+# -------------------------
+@metrics.timed()
+def add_match(tournament_id, team1_id, team2_id, match_date):
+    storage.get_backend().add_match(tournament_id, team1_id, team2_id, match_date)
+    cache.invalidate(tournament_id)
+
+# -------------------------
+# Standings rules
+# -------------------------
+@metrics.timed()
+def set_tie_breakers(tournament_id, chain):
+    """Rank the tournament by points, then ``chain`` (names from standings.TIE_BREAKERS)."""
+    storage.get_backend().set_tie_breakers(tournament_id, standings.check_tie_breakers(chain))
+    cache.invalidate(tournament_id)
+
+@metrics.timed()
+def set_fair_play(tournament_id, points_by_team):
+    """Store {team_id: disciplinary points} for the fair-play tie-breaker."""
+    points_by_team = {int(team_id): int(points) for team_id, points in points_by_team.items()}
+    if any(points < 0 for points in points_by_team.values()):
+        raise ValueError("fair-play points cannot be negative")
+    if points_by_team:
+        storage.get_backend().set_fair_play(tournament_id, points_by_team)
+        cache.invalidate(tournament_id)
+
+# -------------------------
+# Update match result + points table
+# -------------------------
+@metrics.timed()
+def update_match_results(results):
+    """Record many (match_id, team1_score, team2_score) results in one transaction.
+
+    Returns the number of matches updated. If a match_id appears more than
+    once the last score wins; unknown match_ids are ignored.
+    """
+    latest = {int(match_id): (int(s1), int(s2)) for match_id, s1, s2 in results}
+    if not latest:
+        return 0
+    rows = [(match_id, s1, s2) for match_id, (s1, s2) in latest.items()]
+    recorded = storage.get_backend().record_results(rows)
+    cache.invalidate(*{t_id for _, t_id in recorded})
+    return len(recorded)
+
+@metrics.timed()
+def update_match_result(match_id, team1_score, team2_score):
+    if not update_match_results([(match_id, team1_score, team2_score)]):
+        raise ValueError(f"Match {match_id} does not exist")
@@ -0,0 +1,263 @@
+"""Write-behind queue for match results.
+
+update_match_result runs several statements on the scorer's request
+thread, so a slow database kept the "Update Result" button spinning.
+Scores are now appended to a journal instead: a small SQLite file on
+local disk (SPORTS_RESULT_QUEUE_PATH), committed with a full fsync, so
+``submit`` returns as soon as the score cannot be lost. One applier
+thread per process drains the journal in submission order, up to
+BATCH_SIZE entries per update_match_results transaction. A batch that
+fails on the connection stays pending and is retried with backoff; an
+unreachable database only delays results. A batch the database refuses
+for its values (a score out of range) is split until the offending
+entries are found; they are rejected with the error and the rest go
+through.
+
+A newer score for a match supersedes any older one still pending, so a
+match is applied once with its latest score. Applied entries are kept
+for KEEP_APPLIED_SECONDS so the page can show what went through.
+
+    python -m sports_data.result_queue status
+    python -m sports_data.result_queue drain     # apply everything pending now
+"""
+import argparse
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing, contextmanager
+
+from sports_data import cache, metrics, storage
+
+PATH = os.environ.get("SPORTS_RESULT_QUEUE_PATH", "result_queue.db")
+BATCH_SIZE = int(os.environ.get("SPORTS_RESULT_QUEUE_BATCH", 500))
+# Backoff between attempts at a failing batch: doubles up to the maximum
+RETRY_DELAY = 1.0
+MAX_RETRY_DELAY = 60.0
+KEEP_APPLIED_SECONDS = 24 * 60 * 60
+
+# pending -> applied, or superseded by a newer score for the same match,
+# or rejected when the match no longer exists or the database refuses it
+STATUSES = ("pending", "applied", "superseded", "rejected")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS result_queue (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    match_id INTEGER NOT NULL,
+    team1_score INTEGER NOT NULL,
+    team2_score INTEGER NOT NULL,
+    label TEXT,
+    status TEXT NOT NULL DEFAULT 'pending',
+    submitted_at REAL NOT NULL,
+    applied_at REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS result_queue_status_idx ON result_queue (status, seq);
+"""
+
+log = logging.getLogger(__name__)
+
+_ready = set()
+_ready_lock = threading.Lock()
+_wake = threading.Event()
+_thread = None
+_thread_lock = threading.Lock()
+
+
+@contextmanager
+def _journal(path=None):
+    """One transaction on the journal, committed (and fsynced) on exit."""
+    path = path or PATH
+    conn = sqlite3.connect(path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    with closing(conn):
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = FULL")
+        if path not in _ready:
+            with _ready_lock:
+                conn.executescript(SCHEMA)
+                _ready.add(path)
+        with conn:
+            yield conn
+
+
+def submit(results, labels=None):
+    """Queue (match_id, team1_score, team2_score) results; returns their sequence numbers.
+
+    Returns once the entries are durable on local disk. ``labels`` maps
+    match_id to the text the page shows for it (e.g. "A vs B").
+    """
+    rows = [(int(match_id), int(s1), int(s2)) for match_id, s1, s2 in results]
+    if any(s1 < 0 or s2 < 0 for _, s1, s2 in rows):
+        raise ValueError("scores cannot be negative")
+    labels = labels or {}
+    seqs = []
+    with _journal() as conn:
+        for match_id, s1, s2 in rows:
+            conn.execute(
+                "UPDATE result_queue SET status = 'superseded' WHERE match_id = ? AND status = 'pending'",
+                (match_id,),
+            )
+            cursor = conn.execute(
+                "INSERT INTO result_queue (match_id, team1_score, team2_score, label, submitted_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (match_id, s1, s2, labels.get(match_id), time.time()),
+            )
+            seqs.append(cursor.lastrowid)
+    start()
+    _wake.set()
+    return seqs
+
+
+def entries(status="pending", limit=None):
+    """Journal rows with ``status`` as dicts: oldest first when pending, newest first otherwise."""
+    order = "seq" if status == "pending" else "seq DESC"
+    with _journal() as conn:
+        rows = conn.execute(
+            f"SELECT * FROM result_queue WHERE status = ? ORDER BY {order} LIMIT ?",
+            (status, -1 if limit is None else limit),
+        ).fetchall()
+    return [dict(row) for row in rows]
+
+
+def counts():
+    """{status: entries} for every status."""
+    with _journal() as conn:
+        found = dict(conn.execute("SELECT status, COUNT(*) FROM result_queue GROUP BY status").fetchall())
+    return {status: found.get(status, 0) for status in STATUSES}
+
+
+def _record(backend, results):
+    """record_results, bisecting around results the database refuses.
+
+    Returns (recorded, {match_id: error}). Each part that goes through
+    commits on its own; a part retried later is harmless, as re-scoring
+    is idempotent. Connection errors propagate.
+    """
+    try:
+        recorded = backend.record_results(results)
+    except backend.DATA_ERRORS as e:
+        if len(results) == 1:
+            return [], {results[0][0]: str(e).strip()}
+        half = len(results) // 2
+        recorded, refused = _record(backend, results[:half])
+        more, more_refused = _record(backend, results[half:])
+        return recorded + more, {**refused, **more_refused}
+    cache.invalidate(*{tournament_id for _, tournament_id in recorded})
+    return recorded, {}
+
+
+@metrics.timed()
+def apply_batch():
+    """Record up to BATCH_SIZE pending entries; returns how many were settled.
+
+    Entries the database refuses for their values are rejected. Any
+    other error is raised, leaving the entries pending with their attempt
+    counted.
+    """
+    with _journal() as conn:
+        batch = conn.execute(
+            "SELECT seq, match_id, team1_score, team2_score FROM result_queue"
+            " WHERE status = 'pending' ORDER BY seq LIMIT ?",
+            (BATCH_SIZE,),
+        ).fetchall()
+    if not batch:
+        return 0
+    # The newest score per match; older ones can only be here if another
+    # process shares the journal
+    latest = {row["match_id"]: row for row in batch}
+    seqs = [row["seq"] for row in batch]
+    placeholders = ", ".join("?" * len(seqs))
+    try:
+        recorded, refused = _record(
+            storage.get_backend(),
+            [(row["match_id"], row["team1_score"], row["team2_score"]) for row in latest.values()]
+        )
+    except Exception as e:
+        with _journal() as conn:
+            conn.execute(
+                f"UPDATE result_queue SET attempts = attempts + 1, error = ? WHERE seq IN ({placeholders})",
+                [str(e).strip()] + seqs,
+            )
+        raise
+
+    found = {match_id for match_id, _ in recorded}
+    applied = {row["seq"] for row in latest.values()}
+    now = time.time()
+    with _journal() as conn:
+        conn.executemany(
+            "UPDATE result_queue SET status = ?, applied_at = ?, attempts = attempts + 1, error = ? WHERE seq = ?",
+            [
+                ("superseded", now, None, row["seq"]) if row["seq"] not in applied
+                else ("applied", now, None, row["seq"]) if row["match_id"] in found
+                else ("rejected", now, refused.get(row["match_id"], "match no longer exists"), row["seq"])
+                for row in batch
+            ],
+        )
+        conn.execute(
+            "DELETE FROM result_queue WHERE status != 'pending' AND applied_at < ?",
+            (now - KEEP_APPLIED_SECONDS,),
+        )
+    return len(batch)
+
+
+def drain():
+    """Apply everything pending now, on the calling thread; returns the entries settled."""
+    settled = 0
+    while True:
+        done = apply_batch()
+        if not done:
+            return settled
+        settled += done
+
+
+def _run():
+    failures = 0
+    while True:
+        _wake.wait(timeout=MAX_RETRY_DELAY)
+        _wake.clear()
+        try:
+            drain()
+            failures = 0
+        except Exception as e:
+            failures += 1
+            delay = min(MAX_RETRY_DELAY, RETRY_DELAY * 2 ** (failures - 1))
+            log.warning("result queue: batch failed (attempt %d), retrying in %.0fs: %s", failures, delay, e)
+            time.sleep(delay)
+            _wake.set()
+
+
+def start():
+    """Start the process's applier thread unless it is already running.
+
+    Entries a previous process left pending are applied straight away.
+    """
+    global _thread
+    with _thread_lock:
+        if _thread is None or not _thread.is_alive():
+            _thread = threading.Thread(target=_run, name="result-applier", daemon=True)
+            _thread.start()
+            _wake.set()
+    return _thread
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect or drain the queued match results")
+    parser.add_argument("action", choices=["status", "drain"])
+    args = parser.parse_args(argv)
+
+    if args.action == "drain":
+        print(f"Settled {drain()} queued results")
+    for status, count in counts().items():
+        print(f"{status:>10}: {count}")
+    for row in entries("pending"):
+        error = f" ({row['error']})" if row["error"] else ""
+        print(f"  #{row['seq']} match {row['match_id']} {row['team1_score']}-{row['team2_score']}"
+              f", {row['attempts']} attempts{error}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
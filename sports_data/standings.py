@@ -0,0 +1,99 @@
+"""Points_Table rules, ranking tie-breakers, rebuild and verification.
+
+update_match_result keeps Points_Table current with deltas. After manual
+fixes, deletes or bulk imports it can drift, so this recomputes it from
+the completed matches with one grouped SQL aggregate: nothing is pulled
+into Python, which keeps millions of historical matches to a few seconds.
+
+    python -m sports_data.standings rebuild [--tournament ID]
+    python -m sports_data.standings verify [--tournament ID]
+
+Standings rank by points, then by each tournament's chain of
+TIE_BREAKERS (DEFAULT_TIE_BREAKERS unless set). The ranking is one
+window-function query over Points_Table and the analytics rollups, with
+dense positions: teams level on every step share a position.
+"""
+import argparse
+
+from sports_data import cache, metrics, storage
+
+WIN_POINTS, DRAW_POINTS, LOSS_POINTS = 2, 1, 0
+
+COLUMNS = ("matches_played", "wins", "losses", "draws", "points")
+
+# Applied in the tournament's order after points
+TIE_BREAKERS = {
+    "goal_difference": "Goal difference",
+    "goals_for": "Goals scored",
+    # Points, then goal difference, in the matches between the teams still level
+    "head_to_head": "Head-to-head",
+    "wins": "Wins",
+    # Fewest disciplinary points (Fair_Play)
+    "fair_play": "Fair play",
+}
+DEFAULT_TIE_BREAKERS = ("goal_difference", "goals_for", "head_to_head")
+
+
+def check_tie_breakers(chain):
+    """Return ``chain`` as a tuple, or raise ValueError for unknown or repeated names."""
+    chain = tuple(chain)
+    unknown = [name for name in chain if name not in TIE_BREAKERS]
+    if unknown:
+        raise ValueError(f"unknown tie-breakers {unknown}; choose from {list(TIE_BREAKERS)}")
+    if len(set(chain)) != len(chain):
+        raise ValueError("each tie-breaker can be used once")
+    return chain
+
+
+@metrics.timed()
+def rebuild_points_table(tournament_id=None):
+    """Replace Points_Table rows for one tournament (or all) in one transaction.
+
+    Scorers of the rebuilt tournament (of every tournament, without one)
+    are blocked for the duration so no result lands between the recompute
+    and the swap; readers keep seeing the old rows until commit.
+    Returns the number of rows written.
+    """
+    written = storage.get_backend().rebuild_points_table(tournament_id)
+    if tournament_id is None:
+        cache.clear()
+    else:
+        cache.invalidate(tournament_id)
+    return written
+
+
+@metrics.timed()
+def verify_points_table(tournament_id=None):
+    """Diff stored Points_Table rows against a fresh recompute.
+
+    Returns one dict per (tournament_id, team_id) that differs, with
+    ``stored_<col>`` and ``expected_<col>`` for every column (None where
+    the row is missing on that side). An empty list means no drift.
+    """
+    return storage.get_backend().verify_points_table(tournament_id)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild or verify Points_Table from Matches")
+    parser.add_argument("action", choices=["rebuild", "verify"])
+    parser.add_argument("--tournament", type=int, help="only this tournament_id")
+    args = parser.parse_args(argv)
+
+    if args.action == "rebuild":
+        written = rebuild_points_table(args.tournament)
+        print(f"Rebuilt Points_Table: {written} rows")
+        return 0
+
+    drift = verify_points_table(args.tournament)
+    for row in drift:
+        changes = ", ".join(
+            f"{c} {row[f'stored_{c}']} -> {row[f'expected_{c}']}" for c in COLUMNS
+            if row[f"stored_{c}"] != row[f"expected_{c}"]
+        )
+        print(f"tournament {row['tournament_id']} team {row['team_id']}: {changes}")
+    print(f"{len(drift)} rows differ")
+    return 1 if drift else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
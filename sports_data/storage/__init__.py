@@ -0,0 +1,49 @@
+"""Pluggable storage engines behind the data helpers in queries.py.
+
+SPORTS_STORAGE picks the engine for the process:
+
+- ``postgres`` (default): the shared PostgreSQL server, via db.py's pool
+- ``sqlite``: an embedded database file (SPORTS_SQLITE_PATH), for
+  single-node kiosks and fast CI
+
+Both implement sports_data.storage.base.StorageBackend and pass the same
+conformance tests (``python -m pytest tests/test_conformance.py``).
+"""
+import importlib
+import os
+import threading
+
+BACKENDS = {
+    "postgres": "sports_data.storage.postgres:PostgresBackend",
+    "sqlite": "sports_data.storage.sqlite:SQLiteBackend",
+}
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def create_backend(name, **options):
+    try:
+        module_name, class_name = BACKENDS[name].split(":")
+    except KeyError:
+        raise ValueError(f"Unknown storage backend {name!r}; choose from {', '.join(BACKENDS)}") from None
+    backend_class = getattr(importlib.import_module(module_name), class_name)
+    return backend_class(**options)
+
+
+def get_backend():
+    """Return the process-wide backend, created from the environment on first use."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = create_backend(os.environ.get("SPORTS_STORAGE", "postgres"))
+    return _backend
+
+
+def set_backend(backend):
+    """Swap the process-wide backend (tests, scripts); returns the old one."""
+    global _backend
+    with _backend_lock:
+        previous, _backend = _backend, backend
+    return previous
@@ -0,0 +1,896 @@
+"""The storage interface and the SQL both engines share.
+
+Queries are written once with psycopg2-style ``%s`` / ``%(name)s``
+placeholders in the subset of SQL that PostgreSQL and SQLite (3.39+)
+both understand. Engines supply ``cursor`` and ``read_frame`` and
+override only what can't be shared or has a faster native form.
+
+Rows come back as dicts (RealDictRow on PostgreSQL). Dates are
+``datetime.date`` on both engines. Table reads (get_standings,
+get_match_frame) return Arrow-backed DataFrames instead; see
+columnar.py.
+"""
+import csv
+import io
+from collections import Counter
+from contextlib import contextmanager
+
+from sports_data import analytics, standings
+from sports_data.names import name_key
+
+MATCH_STATUSES = ("pending", "completed")
+
+# Column kinds of the DataFrame reads (columnar.KINDS)
+STANDINGS_COLUMNS = (
+    ("position", "int"), ("team_id", "int"), ("team_name", "str"), ("matches_played", "int"),
+    ("wins", "int"), ("losses", "int"), ("draws", "int"), ("points", "int"),
+    ("goals_for", "int"), ("goals_against", "int"), ("goal_difference", "int"),
+    ("head_to_head_points", "int"), ("fair_play_points", "int"),
+)
+MATCH_COLUMNS = (
+    ("match_id", "int"), ("tournament_id", "int"), ("team1_name", "str"), ("team2_name", "str"),
+    ("tournament_name", "str"), ("match_date", "date"), ("team1_score", "int"), ("team2_score", "int"),
+)
+STANDINGS_EXPORT_COLUMNS = (
+    ("tournament_id", "int"), ("tournament_name", "str"), ("team_id", "int"), ("team_name", "str"),
+    ("matches_played", "int"), ("wins", "int"), ("losses", "int"), ("draws", "int"), ("points", "int"),
+)
+
+# Rows per multi-row INSERT / names per IN (...) lookup
+BATCH_ROWS = 500
+
+
+def _chunks(items, size=BATCH_ROWS):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _prefix_end(prefix):
+    """The first string after all those starting with ``prefix`` (None if unbounded).
+
+    Strings compare by code point (UTF-8 bytes, or a "C" collation), so
+    bumping the last character ends the range.
+    """
+    while prefix:
+        last = ord(prefix[-1]) + 1
+        if last == 0xD800:
+            # Surrogates can't be encoded
+            last = 0xE000
+        if last <= 0x10FFFF:
+            return prefix[:-1] + chr(last)
+        prefix = prefix[:-1]
+    return None
+
+
+def _points_for(gf, ga):
+    """(wins, losses, draws, points) one team earns for a result."""
+    if gf > ga:
+        return 1, 0, 0, standings.WIN_POINTS
+    if gf < ga:
+        return 0, 1, 0, standings.LOSS_POINTS
+    return 0, 0, 1, standings.DRAW_POINTS
+
+
+def _record_for(gf, ga):
+    """One result in analytics.RECORD_COLUMNS order."""
+    return 1, int(gf > ga), int(gf == ga), int(gf < ga), gf, ga
+
+
+def _add_excluded(table, columns):
+    """SET clause that adds an upsert's values onto the stored row."""
+    return ", ".join(f"{c} = {table}.{c} + excluded.{c}" for c in columns)
+
+
+class StorageBackend:
+    name = "base"
+    # LIMIT value meaning "no limit"
+    NO_LIMIT = "ALL"
+    # Errors caused by the values written rather than the connection:
+    # retrying the same rows can never succeed
+    DATA_ERRORS = (ValueError, OverflowError)
+
+    # -------------------------
+    # Engine hooks
+    # -------------------------
+    @contextmanager
+    def cursor(self, write=False):
+        """One transaction; yields a cursor returning dict rows.
+
+        ``write`` lets engines that lock per database take the write lock
+        up front.
+        """
+        raise NotImplementedError
+
+    def read_frame(self, sql, params, columns):
+        """Run a query and return an Arrow-backed DataFrame.
+
+        ``columns`` names the result's columns in order with their kind,
+        e.g. STANDINGS_COLUMNS.
+        """
+        raise NotImplementedError
+
+    def iter_rows(self, sql, params, size):
+        """Yield the result as lists of at most ``size`` row tuples.
+
+        Only one chunk is held in memory at a time, however large the
+        result (a server-side cursor, not fetchall).
+        """
+        raise NotImplementedError
+
+    def copy_csv(self, sql, params, columns, out, size):
+        """Write the result to the binary file ``out`` as CSV with a header row.
+
+        Returns the number of rows written. Engines with a native CSV
+        export (COPY TO) override this.
+        """
+        text = io.TextIOWrapper(out, encoding="utf-8", newline="")
+        writer = csv.writer(text, lineterminator="\n")
+        writer.writerow([name for name, _ in columns])
+        written = 0
+        for rows in self.iter_rows(sql, params, size):
+            writer.writerows(rows)
+            written += len(rows)
+        text.flush()
+        # Leave ``out`` open for the caller
+        text.detach()
+        return written
+
+    def _bump_summary(self, cursor, tournament_id, teams=0, matches=0, completed=0):
+        """Keep any denormalized per-tournament counters in step (optional)."""
+
+    def _lock_points_table(self, cursor, tournament_id=None):
+        """Block writers to Points_Table (one tournament's rows, if given) for the rest of the transaction."""
+
+    def _lock_analytics(self, cursor, tournament_id=None):
+        """Block writers to Team_Stats and Head_To_Head (one tournament's rows, if given) likewise."""
+
+    def _refresh_statistics(self, tables):
+        """Refresh planner statistics after a bulk write to ``tables`` (optional)."""
+
+    def resume_pending_work(self):
+        """Restart background work interrupted by a restart (optional)."""
+
+    def listen_for_changes(self):
+        """Start relaying other processes' writes into the read cache (optional)."""
+
+    def read_concurrency(self):
+        """How many reads may usefully run at once (sizes async_queries' workers)."""
+        return 4
+
+    def close(self):
+        pass
+
+    def _limit(self, limit, offset=0):
+        clause = f"LIMIT {self.NO_LIMIT}" if limit is None else "LIMIT %s"
+        params = [] if limit is None else [limit]
+        if offset:
+            clause += " OFFSET %s"
+            params.append(offset)
+        return clause, params
+
+    # -------------------------
+    # Reads
+    # -------------------------
+    def get_tournaments(self):
+        with self.cursor() as cursor:
+            cursor.execute("SELECT tournament_id, name, start_date, end_date, deleting FROM Tournaments ORDER BY tournament_id")
+            return cursor.fetchall()
+
+    # The *_query methods return the (sql, params) their helper runs, so
+    # ``python -m sports_data.migrate check`` can EXPLAIN the real thing
+    def teams_query(self, tournament_id, limit=None, after=None):
+        conditions = "tournament_id = %s"
+        params = [tournament_id]
+        if after is not None:
+            conditions += " AND team_id > %s"
+            params.append(after)
+        limit_clause, limit_params = self._limit(limit)
+        return f"SELECT team_id, name FROM Teams WHERE {conditions} ORDER BY team_id {limit_clause}", params + limit_params
+
+    def get_teams(self, tournament_id, limit=None, after=None):
+        """Teams in the order they were added; ``after`` is the last team_id already shown."""
+        with self.cursor() as cursor:
+            cursor.execute(*self.teams_query(tournament_id, limit, after))
+            return cursor.fetchall()
+
+    def search_teams_query(self, tournament_id, prefix, limit=None):
+        conditions = "tournament_id = %s"
+        params = [tournament_id]
+        prefix = name_key(prefix)
+        if prefix:
+            conditions += " AND name_key >= %s"
+            params.append(prefix)
+        end = _prefix_end(prefix)
+        if end is not None:
+            conditions += " AND name_key < %s"
+            params.append(end)
+        limit_clause, limit_params = self._limit(limit)
+        return (
+            f"SELECT team_id, name FROM Teams WHERE {conditions} ORDER BY name_key, team_id {limit_clause}",
+            params + limit_params
+        )
+
+    def search_teams(self, tournament_id, prefix, limit=None):
+        """Teams whose name starts with ``prefix``, ignoring case, in name order.
+
+        The folded prefix becomes a range on teams_name_key_idx, so only
+        the rows returned are read.
+        """
+        with self.cursor() as cursor:
+            cursor.execute(*self.search_teams_query(tournament_id, prefix, limit))
+            return cursor.fetchall()
+
+    def matches_query(self, tournament_id=None, status=None, date_from=None, date_to=None, limit=None, after=None):
+        conditions = []
+        params = []
+        if tournament_id is not None:
+            conditions.append("m.tournament_id = %s")
+            params.append(tournament_id)
+        if status == "pending":
+            conditions.append("m.team1_score IS NULL")
+        elif status == "completed":
+            conditions.append("m.team1_score IS NOT NULL")
+        elif status is not None:
+            raise ValueError(f"status must be one of {MATCH_STATUSES}")
+        if date_from is not None:
+            conditions.append("m.match_date >= %s")
+            params.append(date_from)
+        if date_to is not None:
+            conditions.append("m.match_date <= %s")
+            params.append(date_to)
+        if after is not None:
+            conditions.append("(m.match_date, m.match_id) < (%s, %s)")
+            params.extend(after)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        limit_clause, limit_params = self._limit(limit)
+
+        return f"""
+            SELECT m.match_id, m.tournament_id, t1.name AS team1_name, t2.name AS team2_name,
+                   t.name AS tournament_name, m.match_date, m.team1_score, m.team2_score
+            FROM Matches m
+            JOIN Teams t1 ON m.team1_id = t1.team_id
+            JOIN Teams t2 ON m.team2_id = t2.team_id
+            JOIN Tournaments t ON m.tournament_id = t.tournament_id
+            {where}
+            ORDER BY m.match_date DESC, m.match_id DESC
+            {limit_clause}
+        """, params + limit_params
+
+    def get_matches(self, tournament_id=None, status=None, date_from=None, date_to=None, limit=None, after=None):
+        sql, params = self.matches_query(tournament_id, status, date_from, date_to, limit, after)
+        with self.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+
+    def get_match_frame(self, tournament_id=None, status=None, date_from=None, date_to=None, limit=None, after=None):
+        """get_matches as an Arrow-backed DataFrame (MATCH_COLUMNS), for tables and charts."""
+        sql, params = self.matches_query(tournament_id, status, date_from, date_to, limit, after)
+        return self.read_frame(sql, params, MATCH_COLUMNS)
+
+    def get_tournament_stats(self, tournament_id):
+        with self.cursor() as cursor:
+            # Get team count
+            cursor.execute("SELECT COUNT(*) as team_count FROM Teams WHERE tournament_id=%s", (tournament_id,))
+            team_count = cursor.fetchone()['team_count']
+
+            # Get match count
+            cursor.execute("SELECT COUNT(*) as match_count FROM Matches WHERE tournament_id=%s", (tournament_id,))
+            match_count = cursor.fetchone()['match_count']
+
+            # Get completed matches
+            cursor.execute("SELECT COUNT(*) as completed FROM Matches WHERE tournament_id=%s AND team1_score IS NOT NULL", (tournament_id,))
+            completed = cursor.fetchone()['completed']
+
+            return team_count, match_count, completed
+
+    def get_tournament_summaries(self, limit=None, offset=0):
+        limit_clause, params = self._limit(limit, offset)
+        with self.cursor() as cursor:
+            cursor.execute(f"""
+                WITH page AS (
+                    SELECT tournament_id, name, start_date, end_date
+                    FROM Tournaments
+                    WHERE NOT deleting
+                    ORDER BY tournament_id
+                    {limit_clause}
+                )
+                SELECT p.tournament_id, p.name, p.start_date, p.end_date,
+                       COALESCE(tc.team_count, 0) AS team_count,
+                       COALESCE(mc.match_count, 0) AS match_count,
+                       COALESCE(mc.completed, 0) AS completed
+                FROM page p
+                LEFT JOIN (SELECT tournament_id, COUNT(*) AS team_count
+                           FROM Teams
+                           WHERE tournament_id IN (SELECT tournament_id FROM page)
+                           GROUP BY tournament_id) tc ON tc.tournament_id = p.tournament_id
+                LEFT JOIN (SELECT tournament_id, COUNT(*) AS match_count, COUNT(team1_score) AS completed
+                           FROM Matches
+                           WHERE tournament_id IN (SELECT tournament_id FROM page)
+                           GROUP BY tournament_id) mc ON mc.tournament_id = p.tournament_id
+                ORDER BY p.tournament_id
+            """, params)
+            return cursor.fetchall()
+
+    def standings_query(self, tournament_id, chain):
+        return self._ranking_sql(chain), {"tournament_id": tournament_id}
+
+    def get_standings(self, tournament_id):
+        """Ranked Points_Table (STANDINGS_COLUMNS) under the tournament's tie-breakers."""
+        sql, params = self.standings_query(tournament_id, self.get_tie_breakers(tournament_id))
+        return self.read_frame(sql, params, STANDINGS_COLUMNS)
+
+    def get_tie_breakers(self, tournament_id):
+        with self.cursor() as cursor:
+            cursor.execute("SELECT tie_breakers FROM Tournament_Rules WHERE tournament_id = %s", (tournament_id,))
+            row = cursor.fetchone()
+        if row is None:
+            return standings.DEFAULT_TIE_BREAKERS
+        return tuple(name for name in row["tie_breakers"].split(",") if name)
+
+    def get_fair_play(self, tournament_id):
+        """{team_id: disciplinary points} for the teams that have any recorded."""
+        with self.cursor() as cursor:
+            cursor.execute("SELECT team_id, points FROM Fair_Play WHERE tournament_id = %s", (tournament_id,))
+            return {row["team_id"]: row["points"] for row in cursor.fetchall()}
+
+    def get_fair_play_teams(self, tournament_id):
+        """The teams with disciplinary points recorded, with their names, by name."""
+        with self.cursor() as cursor:
+            cursor.execute("""
+                SELECT f.team_id, t.name, f.points
+                FROM Fair_Play f
+                JOIN Teams t ON t.team_id = f.team_id
+                WHERE f.tournament_id = %s
+                ORDER BY t.name, f.team_id
+            """, (tournament_id,))
+            return cursor.fetchall()
+
+    def export_query(self, kind, tournament_id=None, date_from=None, date_to=None):
+        """(sql, params, columns) for a full export of "matches" or "standings".
+
+        Matches are filtered by match_date; standings by tournaments whose
+        dates overlap the range.
+        """
+        if kind == "matches":
+            sql, params = self.matches_query(tournament_id, date_from=date_from, date_to=date_to)
+            return sql, params, MATCH_COLUMNS
+        if kind != "standings":
+            raise ValueError(f"unknown export kind: {kind}")
+        conditions = []
+        params = []
+        if tournament_id is not None:
+            conditions.append("pt.tournament_id = %s")
+            params.append(tournament_id)
+        if date_from is not None:
+            conditions.append("t.end_date >= %s")
+            params.append(date_from)
+        if date_to is not None:
+            conditions.append("t.start_date <= %s")
+            params.append(date_to)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return f"""
+            SELECT pt.tournament_id, t.name AS tournament_name, pt.team_id, tm.name AS team_name,
+                   pt.matches_played, pt.wins, pt.losses, pt.draws, pt.points
+            FROM Points_Table pt
+            JOIN Tournaments t ON pt.tournament_id = t.tournament_id
+            JOIN Teams tm ON pt.team_id = tm.team_id
+            {where}
+            ORDER BY pt.tournament_id, pt.points DESC, pt.wins DESC, pt.team_id
+        """, params, STANDINGS_EXPORT_COLUMNS
+
+    def team_stats_query(self, tournament_id, team_id=None):
+        """Every team of the tournament by team_id, or just ``team_id``."""
+        # Teams without a Team_Stats row (no result yet) read as zeros
+        columns = ", ".join(
+            f"COALESCE(s.{c}, {0 if c != 'form' else repr('')}) AS {c}" for c in analytics.TEAM_STATS_COLUMNS
+        )
+        if team_id is None:
+            condition, params = "t.tournament_id = %s ORDER BY t.team_id", (tournament_id,)
+        else:
+            condition, params = "t.team_id = %s AND t.tournament_id = %s", (team_id, tournament_id)
+        return f"""
+            SELECT t.team_id, t.name AS team_name, {columns}
+            FROM Teams t
+            LEFT JOIN Team_Stats s ON s.tournament_id = t.tournament_id AND s.team_id = t.team_id
+            WHERE {condition}
+        """, params
+
+    def get_team_analytics(self, tournament_id):
+        """Every team's Team_Stats row (zeros before its first result), by team_id."""
+        with self.cursor() as cursor:
+            cursor.execute(*self.team_stats_query(tournament_id))
+            return cursor.fetchall()
+
+    def get_team_stats(self, tournament_id, team_id):
+        """One team's Team_Stats row (zeros before its first result), or None if it isn't in the tournament.
+
+        Two primary-key lookups, however many teams the tournament has.
+        """
+        with self.cursor() as cursor:
+            cursor.execute(*self.team_stats_query(tournament_id, team_id))
+            return cursor.fetchone()
+
+    def head_to_head_query(self, tournament_id, team_id, opponent_id):
+        return f"""
+            SELECT {", ".join(analytics.HEAD_TO_HEAD_COLUMNS)}
+            FROM Head_To_Head
+            WHERE tournament_id = %s AND team_id = %s AND opponent_id = %s
+        """, (tournament_id, team_id, opponent_id)
+
+    def get_head_to_head(self, tournament_id, team_id, opponent_id):
+        """team_id's record against opponent_id, or None if they haven't met."""
+        with self.cursor() as cursor:
+            cursor.execute(*self.head_to_head_query(tournament_id, team_id, opponent_id))
+            return cursor.fetchone()
+
+    # -------------------------
+    # Writes
+    # -------------------------
+    def add_tournament(self, name, start_date, end_date):
+        with self.cursor(write=True) as cursor:
+            cursor.execute(
+                "INSERT INTO Tournaments (name, start_date, end_date) VALUES (%s, %s, %s)",
+                (name, start_date, end_date)
+            )
+
+    def add_team(self, tournament_id, name):
+        with self.cursor(write=True) as cursor:
+            cursor.execute(
+                "INSERT INTO Teams (tournament_id, name, name_key) VALUES (%s, %s, %s)",
+                (tournament_id, name, name_key(name))
+            )
+            self._bump_summary(cursor, tournament_id, teams=1)
+
+    def add_match(self, tournament_id, team1_id, team2_id, match_date):
+        with self.cursor(write=True) as cursor:
+            cursor.execute(
+                "INSERT INTO Matches (tournament_id, team1_id, team2_id, match_date, team1_score, team2_score, winner_id) VALUES (%s, %s, %s, %s, %s, %s, %s)",
+                (tournament_id, team1_id, team2_id, match_date, None, None, None)  # Ensure scores are NULL
+            )
+            self._bump_summary(cursor, tournament_id, matches=1)
+
+    def record_results(self, results):
+        """Store (match_id, team1_score, team2_score) results in one transaction.
+
+        ``results`` has at most one entry per match. Points_Table gets the
+        difference between the new and any previous result, so re-scoring
+        is idempotent. Returns [(match_id, tournament_id)] for the matches
+        found; unknown ids are skipped.
+        """
+        results = list(results)
+        with self.cursor(write=True) as cursor:
+            old = {}
+            for chunk in _chunks(results):
+                cursor.execute(f"""
+                    SELECT match_id, tournament_id, team1_id, team2_id, team1_score, team2_score
+                    FROM Matches
+                    WHERE match_id IN ({", ".join(["%s"] * len(chunk))})
+                """, [match_id for match_id, _, _ in chunk])
+                old.update((row["match_id"], row) for row in cursor.fetchall())
+
+            deltas = {}
+            team_stats = {}
+            head_to_head = {}
+            match_updates = []
+            completed = Counter()
+            for match_id, s1, s2 in results:
+                match = old.get(match_id)
+                if match is None:
+                    continue
+                t_id = match["tournament_id"]
+                team1, team2 = match["team1_id"], match["team2_id"]
+                winner = team1 if s1 > s2 else team2 if s2 > s1 else None
+                match_updates.append((s1, s2, winner, match_id))
+                # (team, opponent, home, goals for, goals against, sign)
+                sides = [(team1, team2, True, s1, s2, 1), (team2, team1, False, s2, s1, 1)]
+                if match["team1_score"] is None:
+                    completed[t_id] += 1
+                else:
+                    o1, o2 = match["team1_score"], match["team2_score"]
+                    sides += [(team1, team2, True, o1, o2, -1), (team2, team1, False, o2, o1, -1)]
+                for team_id, opponent_id, home, gf, ga, sign in sides:
+                    delta = deltas.setdefault((t_id, team_id), [0, 0, 0, 0, 0])
+                    for i, value in enumerate((1,) + _points_for(gf, ga)):
+                        delta[i] += sign * value
+                    stats = team_stats.setdefault((t_id, team_id), [0] * 12)
+                    pair = head_to_head.setdefault((t_id, team_id, opponent_id), [0] * 6)
+                    offset = 0 if home else 6
+                    for i, value in enumerate(_record_for(gf, ga)):
+                        stats[offset + i] += sign * value
+                        pair[i] += sign * value
+
+            cursor.executemany(
+                "UPDATE Matches SET team1_score=%s, team2_score=%s, winner_id=%s WHERE match_id=%s",
+                match_updates
+            )
+            cursor.executemany("""
+                INSERT INTO Points_Table (tournament_id, team_id, matches_played, wins, losses, draws, points)
+                VALUES (%s, %s, %s, %s, %s, %s, %s)
+                ON CONFLICT (tournament_id, team_id) DO UPDATE
+                SET matches_played = Points_Table.matches_played + excluded.matches_played,
+                    wins = Points_Table.wins + excluded.wins,
+                    losses = Points_Table.losses + excluded.losses,
+                    draws = Points_Table.draws + excluded.draws,
+                    points = Points_Table.points + excluded.points
+            """, [key + tuple(delta) for key, delta in deltas.items()])
+            stats_columns = analytics.TEAM_STATS_COLUMNS[:-1]  # form is refreshed below
+            cursor.executemany(f"""
+                INSERT INTO Team_Stats (tournament_id, team_id, {", ".join(stats_columns)})
+                VALUES ({", ".join(["%s"] * (2 + len(stats_columns)))})
+                ON CONFLICT (tournament_id, team_id) DO UPDATE
+                SET {_add_excluded("Team_Stats", stats_columns)}
+            """, [key + tuple(stats) for key, stats in team_stats.items()])
+            cursor.executemany(f"""
+                INSERT INTO Head_To_Head (tournament_id, team_id, opponent_id, {", ".join(analytics.HEAD_TO_HEAD_COLUMNS)})
+                VALUES ({", ".join(["%s"] * (3 + len(analytics.HEAD_TO_HEAD_COLUMNS)))})
+                ON CONFLICT (tournament_id, team_id, opponent_id) DO UPDATE
+                SET {_add_excluded("Head_To_Head", analytics.HEAD_TO_HEAD_COLUMNS)}
+            """, [key + tuple(pair) for key, pair in head_to_head.items()])
+            self._refresh_form(cursor, [team_id for _, team_id in team_stats])
+            for tournament_id, count in completed.items():
+                self._bump_summary(cursor, tournament_id, completed=count)
+        return [(match_id, old[match_id]["tournament_id"]) for match_id, _, _ in results if match_id in old]
+
+    def set_tie_breakers(self, tournament_id, chain):
+        with self.cursor(write=True) as cursor:
+            cursor.execute("""
+                INSERT INTO Tournament_Rules (tournament_id, tie_breakers) VALUES (%s, %s)
+                ON CONFLICT (tournament_id) DO UPDATE SET tie_breakers = excluded.tie_breakers
+            """, (tournament_id, ",".join(chain)))
+
+    def set_fair_play(self, tournament_id, points_by_team):
+        """Store each team's points; a team set to 0 loses its row, which ranks the same."""
+        with self.cursor(write=True) as cursor:
+            cursor.executemany("""
+                INSERT INTO Fair_Play (tournament_id, team_id, points) VALUES (%s, %s, %s)
+                ON CONFLICT (tournament_id, team_id) DO UPDATE SET points = excluded.points
+            """, [(tournament_id, team_id, points) for team_id, points in points_by_team.items() if points])
+            cursor.executemany(
+                "DELETE FROM Fair_Play WHERE tournament_id = %s AND team_id = %s",
+                [(tournament_id, team_id) for team_id, points in points_by_team.items() if not points]
+            )
+
+    def delete_tournament(self, tournament_id):
+        # Teams, Matches and Points_Table rows go with it (ON DELETE CASCADE)
+        with self.cursor(write=True) as cursor:
+            cursor.execute("DELETE FROM Tournaments WHERE tournament_id=%s", (tournament_id,))
+
+    # -------------------------
+    # Bulk import (csv_import)
+    # -------------------------
+    # These run on the caller's cursor so one CSV chunk is one transaction.
+    def find_tournaments(self, cursor, names):
+        """{name: tournament_id} for the names that exist."""
+        found = {}
+        for chunk in _chunks(names):
+            cursor.execute(
+                f"SELECT name, tournament_id FROM Tournaments WHERE name IN ({', '.join(['%s'] * len(chunk))})",
+                chunk
+            )
+            found.update((row["name"], row["tournament_id"]) for row in cursor.fetchall())
+        return found
+
+    def find_teams(self, cursor, pairs):
+        """{(tournament_id, name): team_id} for the pairs that exist."""
+        found = {}
+        for chunk in _chunks(pairs):
+            cursor.execute(f"""
+                SELECT tournament_id, name, team_id FROM Teams
+                WHERE (tournament_id, name) IN (VALUES {", ".join(["(%s, %s)"] * len(chunk))})
+            """, [value for pair in chunk for value in pair])
+            for row in cursor.fetchall():
+                found.setdefault((row["tournament_id"], row["name"]), row["team_id"])
+        return found
+
+    def insert_teams(self, cursor, rows):
+        """Insert (tournament_id, name) rows; returns [(tournament_id, name, team_id)]."""
+        inserted = []
+        for chunk in _chunks(rows):
+            cursor.execute(f"""
+                INSERT INTO Teams (tournament_id, name, name_key)
+                VALUES {", ".join(["(%s, %s, %s)"] * len(chunk))}
+                RETURNING tournament_id, name, team_id
+            """, [value for tournament_id, name in chunk for value in (tournament_id, name, name_key(name))])
+            inserted.extend((r["tournament_id"], r["name"], r["team_id"]) for r in cursor.fetchall())
+        for tournament_id, count in Counter(row[0] for row in rows).items():
+            self._bump_summary(cursor, tournament_id, teams=count)
+        return inserted
+
+    def insert_matches(self, cursor, rows):
+        """Insert unscored (tournament_id, team1_id, team2_id, match_date) rows."""
+        for chunk in _chunks(rows):
+            cursor.execute(f"""
+                INSERT INTO Matches (tournament_id, team1_id, team2_id, match_date)
+                VALUES {", ".join(["(%s, %s, %s, %s)"] * len(chunk))}
+            """, [value for row in chunk for value in row])
+        for tournament_id, count in Counter(row[0] for row in rows).items():
+            self._bump_summary(cursor, tournament_id, matches=count)
+        return len(rows)
+
+    # -------------------------
+    # Points_Table maintenance (standings.py)
+    # -------------------------
+    def _expected_points_sql(self, tournament_id):
+        scope = "" if tournament_id is None else "AND tournament_id = %(tournament_id)s"
+        return f"""
+            SELECT tournament_id, team_id,
+                   COUNT(*) AS matches_played,
+                   COUNT(*) FILTER (WHERE gf > ga) AS wins,
+                   COUNT(*) FILTER (WHERE gf < ga) AS losses,
+                   COUNT(*) FILTER (WHERE gf = ga) AS draws,
+                   SUM(CASE WHEN gf > ga THEN {standings.WIN_POINTS}
+                            WHEN gf = ga THEN {standings.DRAW_POINTS}
+                            ELSE {standings.LOSS_POINTS} END) AS points
+            FROM (
+                SELECT tournament_id, team1_id AS team_id, team1_score AS gf, team2_score AS ga
+                FROM Matches
+                WHERE team1_score IS NOT NULL AND team2_score IS NOT NULL {scope}
+                UNION ALL
+                SELECT tournament_id, team2_id, team2_score, team1_score
+                FROM Matches
+                WHERE team1_score IS NOT NULL AND team2_score IS NOT NULL {scope}
+            ) sides
+            GROUP BY tournament_id, team_id
+        """
+
+    def rebuild_points_table(self, tournament_id=None):
+        params = {"tournament_id": tournament_id}
+        with self.cursor(write=True) as cursor:
+            self._lock_points_table(cursor, tournament_id)
+            if tournament_id is None:
+                cursor.execute("DELETE FROM Points_Table")
+            else:
+                cursor.execute("DELETE FROM Points_Table WHERE tournament_id = %(tournament_id)s", params)
+            cursor.execute(f"""
+                INSERT INTO Points_Table (tournament_id, team_id, {", ".join(standings.COLUMNS)})
+                {self._expected_points_sql(tournament_id)}
+            """, params)
+            written = cursor.rowcount
+        self._refresh_statistics(["Points_Table"])
+        return written
+
+    def verify_points_table(self, tournament_id=None):
+        scope = "" if tournament_id is None else "WHERE tournament_id = %(tournament_id)s"
+        stored_cols = ", ".join(f"s.{c} AS stored_{c}" for c in standings.COLUMNS)
+        expected_cols = ", ".join(f"e.{c} AS expected_{c}" for c in standings.COLUMNS)
+        differs = " OR ".join(f"s.{c} IS DISTINCT FROM e.{c}" for c in standings.COLUMNS)
+        with self.cursor() as cursor:
+            cursor.execute(f"""
+                WITH expected AS ({self._expected_points_sql(tournament_id)}),
+                stored AS (SELECT * FROM Points_Table {scope})
+                SELECT COALESCE(s.tournament_id, e.tournament_id) AS tournament_id,
+                       COALESCE(s.team_id, e.team_id) AS team_id,
+                       {stored_cols}, {expected_cols}
+                FROM stored s
+                FULL OUTER JOIN expected e
+                  ON e.tournament_id = s.tournament_id AND e.team_id = s.team_id
+                WHERE {differs}
+                ORDER BY 1, 2
+            """, {"tournament_id": tournament_id})
+            return cursor.fetchall()
+
+    # -------------------------
+    # Analytics rollups (analytics.py)
+    # -------------------------
+    def _sides_sql(self, scope=""):
+        """Each scored match once from each team's side; team1 is home.
+
+        ``scope`` is added to both halves, with ``{team}`` standing for
+        that half's team column.
+        """
+        return f"""
+            SELECT tournament_id, team1_id AS team_id, team2_id AS opponent_id, 1 AS home,
+                   team1_score AS gf, team2_score AS ga, match_date, match_id
+            FROM Matches
+            WHERE team1_score IS NOT NULL AND team2_score IS NOT NULL {scope.format(team="team1_id")}
+            UNION ALL
+            SELECT tournament_id, team2_id, team1_id, 0, team2_score, team1_score, match_date, match_id
+            FROM Matches
+            WHERE team1_score IS NOT NULL AND team2_score IS NOT NULL {scope.format(team="team2_id")}
+        """
+
+    def _form_sql(self, sides):
+        # One MAX(CASE) per slot instead of an ordered string aggregate,
+        # which SQLite only gained in 3.44
+        slots = " || ".join(
+            f"COALESCE(MAX(CASE WHEN rn = {i} THEN result END), '')"
+            for i in range(1, analytics.FORM_LENGTH + 1)
+        )
+        return f"""
+            SELECT tournament_id, team_id, {slots} AS form
+            FROM (
+                SELECT tournament_id, team_id,
+                       CASE WHEN gf > ga THEN 'W' WHEN gf < ga THEN 'L' ELSE 'D' END AS result,
+                       ROW_NUMBER() OVER (PARTITION BY team_id ORDER BY match_date DESC, match_id DESC) AS rn
+                FROM ({sides}) sides
+            ) ranked
+            WHERE rn <= {analytics.FORM_LENGTH}
+            GROUP BY tournament_id, team_id
+        """
+
+    def _refresh_form(self, cursor, team_ids):
+        """Recompute the form of the given teams from their latest results."""
+        for chunk in _chunks(sorted(set(team_ids))):
+            placeholders = ", ".join(["%s"] * len(chunk))
+            sides = self._sides_sql(f"AND {{team}} IN ({placeholders})")
+            cursor.execute(f"""
+                UPDATE Team_Stats SET form = recent.form
+                FROM ({self._form_sql(sides)}) recent
+                WHERE Team_Stats.team_id = recent.team_id
+            """, chunk + chunk)
+
+    def _expected_analytics_sql(self, table, tournament_id):
+        scope = "" if tournament_id is None else "AND tournament_id = %(tournament_id)s"
+        sides = self._sides_sql(scope)
+        if table == "Head_To_Head":
+            return f"""
+                SELECT tournament_id, team_id, opponent_id,
+                       COUNT(*) AS played,
+                       SUM(CASE WHEN gf > ga THEN 1 ELSE 0 END) AS wins,
+                       SUM(CASE WHEN gf = ga THEN 1 ELSE 0 END) AS draws,
+                       SUM(CASE WHEN gf < ga THEN 1 ELSE 0 END) AS losses,
+                       SUM(gf) AS goals_for,
+                       SUM(ga) AS goals_against
+                FROM ({sides}) sides
+                GROUP BY tournament_id, team_id, opponent_id
+            """
+        splits = []
+        for side, flag in (("home", 1), ("away", 0)):
+            splits += [
+                f"SUM(CASE WHEN home = {flag} THEN 1 ELSE 0 END) AS {side}_played",
+                f"SUM(CASE WHEN home = {flag} AND gf > ga THEN 1 ELSE 0 END) AS {side}_wins",
+                f"SUM(CASE WHEN home = {flag} AND gf = ga THEN 1 ELSE 0 END) AS {side}_draws",
+                f"SUM(CASE WHEN home = {flag} AND gf < ga THEN 1 ELSE 0 END) AS {side}_losses",
+                f"SUM(CASE WHEN home = {flag} THEN gf ELSE 0 END) AS {side}_goals_for",
+                f"SUM(CASE WHEN home = {flag} THEN ga ELSE 0 END) AS {side}_goals_against",
+            ]
+        return f"""
+            SELECT totals.*, recent.form
+            FROM (
+                SELECT tournament_id, team_id, {", ".join(splits)}
+                FROM ({sides}) sides
+                GROUP BY tournament_id, team_id
+            ) totals
+            JOIN ({self._form_sql(sides)}) recent ON recent.team_id = totals.team_id
+        """
+
+    def rebuild_analytics(self, tournament_id=None):
+        params = {"tournament_id": tournament_id}
+        where = "" if tournament_id is None else "WHERE tournament_id = %(tournament_id)s"
+        written = 0
+        with self.cursor(write=True) as cursor:
+            self._lock_analytics(cursor, tournament_id)
+            for table, key in analytics.TABLE_KEYS.items():
+                columns = key + analytics.TABLE_COLUMNS[table]
+                cursor.execute(f"DELETE FROM {table} {where}", params)
+                cursor.execute(f"""
+                    INSERT INTO {table} ({", ".join(columns)})
+                    SELECT {", ".join(columns)} FROM ({self._expected_analytics_sql(table, tournament_id)}) expected
+                """, params)
+                written += cursor.rowcount
+        self._refresh_statistics(list(analytics.TABLE_KEYS))
+        return written
+
+    def verify_analytics(self, tournament_id=None):
+        where = "" if tournament_id is None else "WHERE tournament_id = %(tournament_id)s"
+        drift = []
+        with self.cursor() as cursor:
+            for table, key in analytics.TABLE_KEYS.items():
+                columns = analytics.TABLE_COLUMNS[table]
+                keys = ", ".join(f"COALESCE(s.{k}, e.{k}) AS {k}" for k in key)
+                stored_cols = ", ".join(f"s.{c} AS stored_{c}" for c in columns)
+                expected_cols = ", ".join(f"e.{c} AS expected_{c}" for c in columns)
+                joined = " AND ".join(f"e.{k} = s.{k}" for k in key)
+                differs = " OR ".join(f"s.{c} IS DISTINCT FROM e.{c}" for c in columns)
+                cursor.execute(f"""
+                    WITH expected AS ({self._expected_analytics_sql(table, tournament_id)}),
+                    stored AS (SELECT * FROM {table} {where})
+                    SELECT {keys}, {stored_cols}, {expected_cols}
+                    FROM stored s
+                    FULL OUTER JOIN expected e ON {joined}
+                    WHERE {differs}
+                    ORDER BY {", ".join(str(i) for i in range(1, len(key) + 1))}
+                """, {"tournament_id": tournament_id})
+                drift += [dict(row, table=table) for row in cursor.fetchall()]
+        return drift
+
+    # -------------------------
+    # Ranking
+    # -------------------------
+    # Sort key per tie-breaker over one team's Points_Table (p), Team_Stats
+    # (s) and Fair_Play (f) rows
+    _RANK_KEYS = {
+        "points": "{p}.points",
+        "wins": "{p}.wins",
+        "goal_difference": "COALESCE({s}.home_goals_for + {s}.away_goals_for"
+                           " - {s}.home_goals_against - {s}.away_goals_against, 0)",
+        "goals_for": "COALESCE({s}.home_goals_for + {s}.away_goals_for, 0)",
+        "fair_play": "COALESCE({f}.points, 0)",
+    }
+    # ORDER BY terms per tie-breaker over the ranking's columns
+    _TIE_BREAK_ORDER = {
+        "goal_difference": "goal_difference DESC",
+        "goals_for": "goals_for DESC",
+        "head_to_head": "head_to_head_points DESC, head_to_head_goal_difference DESC",
+        "wins": "wins DESC",
+        "fair_play": "fair_play_points ASC",
+    }
+
+    def _mini_table_sql(self, level_on):
+        """Each team's points and goal difference against opponents level on ``level_on``.
+
+        Driven from Head_To_Head, with both sides' keys fetched by primary
+        key, so the cost follows the tournament's pairings. That needs
+        current row estimates, hence _refresh_statistics after bulk writes.
+        """
+        joins = [
+            "JOIN Points_Table p1 ON p1.tournament_id = h.tournament_id AND p1.team_id = h.team_id",
+            "JOIN Points_Table p2 ON p2.tournament_id = h.tournament_id AND p2.team_id = h.opponent_id",
+        ]
+        if {"goal_difference", "goals_for"} & set(level_on):
+            joins += [
+                "LEFT JOIN Team_Stats s1 ON s1.tournament_id = h.tournament_id AND s1.team_id = h.team_id",
+                "LEFT JOIN Team_Stats s2 ON s2.tournament_id = h.tournament_id AND s2.team_id = h.opponent_id",
+            ]
+        if "fair_play" in level_on:
+            joins += [
+                "LEFT JOIN Fair_Play f1 ON f1.tournament_id = h.tournament_id AND f1.team_id = h.team_id",
+                "LEFT JOIN Fair_Play f2 ON f2.tournament_id = h.tournament_id AND f2.team_id = h.opponent_id",
+            ]
+        level = " AND ".join(
+            f"{self._RANK_KEYS[key].format(p='p1', s='s1', f='f1')} = {self._RANK_KEYS[key].format(p='p2', s='s2', f='f2')}"
+            for key in level_on
+        )
+        newline = "\n"
+        return f"""
+            SELECT h.team_id,
+                   SUM(h.wins * {standings.WIN_POINTS} + h.draws * {standings.DRAW_POINTS}
+                       + h.losses * {standings.LOSS_POINTS}) AS points,
+                   SUM(h.goals_for - h.goals_against) AS goal_difference
+            FROM Head_To_Head h
+            {newline.join(joins)}
+            WHERE h.tournament_id = %(tournament_id)s AND {level}
+            GROUP BY h.team_id
+        """
+
+    def _ranking_sql(self, chain):
+        """Ranking of one tournament (%(tournament_id)s) by points, then ``chain``.
+
+        Head-to-head counts only the matches between teams still level on
+        points and the tie-breakers before it. The position is a
+        DENSE_RANK over points and the whole chain, so teams level on
+        every step share one.
+        """
+        keys = {key: expression.format(p="pt", s="ts", f="fp") for key, expression in self._RANK_KEYS.items()}
+        if "head_to_head" in chain:
+            mini_table = self._mini_table_sql(("points",) + chain[:chain.index("head_to_head")])
+            head_to_head = f"LEFT JOIN ({mini_table}) mt ON mt.team_id = pt.team_id"
+            head_to_head_points, head_to_head_goal_difference = "COALESCE(mt.points, 0)", "COALESCE(mt.goal_difference, 0)"
+        else:
+            head_to_head = ""
+            head_to_head_points = head_to_head_goal_difference = "0"
+        order = ", ".join(["points DESC"] + [self._TIE_BREAK_ORDER[name] for name in chain])
+        return f"""
+            WITH ranking AS (
+                SELECT pt.team_id, tm.name AS team_name, pt.matches_played, pt.wins, pt.losses,
+                       pt.draws, pt.points,
+                       {keys["goals_for"]} AS goals_for,
+                       COALESCE(ts.home_goals_against + ts.away_goals_against, 0) AS goals_against,
+                       {keys["goal_difference"]} AS goal_difference,
+                       {keys["fair_play"]} AS fair_play_points,
+                       {head_to_head_points} AS head_to_head_points,
+                       {head_to_head_goal_difference} AS head_to_head_goal_difference
+                FROM Points_Table pt
+                JOIN Teams tm ON tm.team_id = pt.team_id
+                LEFT JOIN Team_Stats ts ON ts.tournament_id = pt.tournament_id AND ts.team_id = pt.team_id
+                LEFT JOIN Fair_Play fp ON fp.tournament_id = pt.tournament_id AND fp.team_id = pt.team_id
+                {head_to_head}
+                WHERE pt.tournament_id = %(tournament_id)s
+            )
+            SELECT DENSE_RANK() OVER (ORDER BY {order}) AS position,
+                   team_id, team_name, matches_played, wins, losses, draws, points,
+                   goals_for, goals_against, goal_difference, head_to_head_points, fair_play_points
+            FROM ranking
+            ORDER BY position, team_name
+        """
@@ -0,0 +1,283 @@
+"""PostgreSQL engine: db.py's pool plus the server-side fast paths.
+
+Results are recorded with one set-based statement (plus a form refresh), bulk imports use
+execute_values, tournaments are deleted in batches in the background
+(deletion.py) and the optional Tournament_Summary counters are kept.
+"""
+import io
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+
+import psycopg2
+from psycopg2.extras import execute_values
+
+from sports_data import analytics, columnar, db, deletion, live, standings, summary
+from sports_data.names import name_key
+from sports_data.storage.base import BATCH_ROWS, StorageBackend, _add_excluded
+
+def _signed_record(weight="1"):
+    """Sums of analytics.RECORD_COLUMNS over contrib rows, scaled by ``weight``."""
+    return [
+        f"SUM(sign * {weight})",
+        f"SUM(sign * {weight} * (gf > ga)::int)",
+        f"SUM(sign * {weight} * (gf = ga)::int)",
+        f"SUM(sign * {weight} * (gf < ga)::int)",
+        f"SUM(sign * {weight} * gf)",
+        f"SUM(sign * {weight} * ga)",
+    ]
+
+
+_STATS_COLUMNS = analytics.TEAM_STATS_COLUMNS[:-1]  # form is refreshed afterwards
+
+# One statement per call, however many results: lock the matches, store
+# the scores and upsert the Points_Table, Team_Stats and Head_To_Head
+# deltas (new result minus the old one, if the match was already scored)
+# so re-scoring never double counts. The upserts are relative, so
+# concurrent scorers never lose each other's points, and every table's
+# rows are locked in key order (matches by id, rollups by team), so two
+# scorers sharing a team queue on its row instead of deadlocking.
+RECORD_RESULTS_SQL = f"""
+    WITH input (match_id, s1, s2) AS (VALUES %s),
+    old AS (
+        SELECT m.match_id, m.tournament_id, m.team1_id, m.team2_id,
+               m.team1_score AS old1, m.team2_score AS old2, i.s1, i.s2
+        FROM Matches m
+        JOIN input i ON i.match_id = m.match_id
+        ORDER BY m.match_id
+        FOR UPDATE OF m
+    ),
+    upd AS (
+        UPDATE Matches m
+        SET team1_score = o.s1,
+            team2_score = o.s2,
+            winner_id = CASE WHEN o.s1 > o.s2 THEN o.team1_id
+                             WHEN o.s2 > o.s1 THEN o.team2_id END
+        FROM old o
+        WHERE m.match_id = o.match_id
+    ),
+    contrib AS (
+        SELECT o.tournament_id, c.team_id, c.opponent_id, c.home, c.gf, c.ga, c.sign
+        FROM old o
+        CROSS JOIN LATERAL (VALUES
+            (o.team1_id, o.team2_id, 1, o.s1, o.s2, 1),
+            (o.team2_id, o.team1_id, 0, o.s2, o.s1, 1),
+            (o.team1_id, o.team2_id, 1, o.old1, o.old2, -1),
+            (o.team2_id, o.team1_id, 0, o.old2, o.old1, -1)
+        ) AS c (team_id, opponent_id, home, gf, ga, sign)
+        WHERE c.gf IS NOT NULL
+    ),
+    deltas AS (
+        SELECT tournament_id, team_id,
+               SUM(sign) AS matches_played,
+               SUM(sign * (gf > ga)::int) AS wins,
+               SUM(sign * (gf < ga)::int) AS losses,
+               SUM(sign * (gf = ga)::int) AS draws,
+               SUM(sign * CASE WHEN gf > ga THEN {standings.WIN_POINTS}
+                               WHEN gf = ga THEN {standings.DRAW_POINTS}
+                               ELSE {standings.LOSS_POINTS} END) AS points
+        FROM contrib
+        GROUP BY tournament_id, team_id
+    ),
+    points AS (
+        INSERT INTO Points_Table (tournament_id, team_id, matches_played, wins, losses, draws, points)
+        SELECT tournament_id, team_id, matches_played, wins, losses, draws, points
+        FROM deltas
+        ORDER BY tournament_id, team_id
+        ON CONFLICT (tournament_id, team_id) DO UPDATE
+        SET matches_played = Points_Table.matches_played + EXCLUDED.matches_played,
+            wins = Points_Table.wins + EXCLUDED.wins,
+            losses = Points_Table.losses + EXCLUDED.losses,
+            draws = Points_Table.draws + EXCLUDED.draws,
+            points = Points_Table.points + EXCLUDED.points
+    ),
+    stats AS (
+        INSERT INTO Team_Stats (tournament_id, team_id, {", ".join(_STATS_COLUMNS)})
+        SELECT tournament_id, team_id, {", ".join(_signed_record("home") + _signed_record("(1 - home)"))}
+        FROM contrib
+        GROUP BY tournament_id, team_id
+        ORDER BY tournament_id, team_id
+        ON CONFLICT (tournament_id, team_id) DO UPDATE
+        SET {_add_excluded("Team_Stats", _STATS_COLUMNS)}
+    ),
+    pairs AS (
+        INSERT INTO Head_To_Head (tournament_id, team_id, opponent_id, {", ".join(analytics.HEAD_TO_HEAD_COLUMNS)})
+        SELECT tournament_id, team_id, opponent_id, {", ".join(_signed_record())}
+        FROM contrib
+        GROUP BY tournament_id, team_id, opponent_id
+        ORDER BY tournament_id, team_id, opponent_id
+        ON CONFLICT (tournament_id, team_id, opponent_id) DO UPDATE
+        SET {_add_excluded("Head_To_Head", analytics.HEAD_TO_HEAD_COLUMNS)}
+    )
+    SELECT match_id, tournament_id, team1_id, team2_id, old1 IS NULL AS was_pending FROM old
+"""
+
+PAGE_SIZE = 1_000
+# First key of the per-tournament pg_advisory_xact_lock: scorers hold it
+# shared for the tournaments they score, a one-tournament rebuild holds it
+# exclusively, so rebuilding one tournament never holds up the others
+RESULTS_LOCK = 727_002
+
+
+class PostgresBackend(StorageBackend):
+    name = "postgres"
+    # Out-of-range scores, violated constraints
+    DATA_ERRORS = StorageBackend.DATA_ERRORS + (psycopg2.DataError, psycopg2.IntegrityError)
+
+    @contextmanager
+    def cursor(self, write=False):
+        # Reads may be served by a read replica (db.py)
+        with db.cursor(dict_rows=True, replica=not write) as cursor:
+            yield cursor
+
+    def read_frame(self, sql, params, columns):
+        # COPY streams the result as CSV for pyarrow to parse: no Python
+        # object per row or per value
+        buffer = io.BytesIO()
+        with db.cursor(replica=True) as cursor:
+            query = cursor.mogrify(sql, params).decode()
+            cursor.copy_expert(f"COPY ({query}) TO STDOUT WITH (FORMAT csv)", buffer)
+        return columnar.from_csv(buffer.getbuffer(), columns)
+
+    def iter_rows(self, sql, params, size):
+        # A named cursor keeps the result on the server; each fetchmany
+        # pulls one chunk over the wire
+        with db.connection(replica=True) as conn:
+            with conn.cursor(name=f"export_{uuid.uuid4().hex}", cursor_factory=db.CountingCursor) as cursor:
+                cursor.itersize = size
+                cursor.execute(sql, params)
+                while True:
+                    rows = cursor.fetchmany(size)
+                    if not rows:
+                        break
+                    yield rows
+
+    def copy_csv(self, sql, params, columns, out, size):
+        # The server formats the CSV; psycopg2 copies it to ``out`` in
+        # small blocks, so nothing is decoded in Python
+        with db.cursor(replica=True) as cursor:
+            query = cursor.mogrify(sql, params).decode()
+            cursor.copy_expert(f"COPY ({query}) TO STDOUT WITH (FORMAT csv, HEADER)", out)
+            return cursor.rowcount
+
+    def _bump_summary(self, cursor, tournament_id, teams=0, matches=0, completed=0):
+        summary.bump(cursor, tournament_id, teams=teams, matches=matches, completed=completed)
+
+    def _lock_points_table(self, cursor, tournament_id=None):
+        if tournament_id is None:
+            cursor.execute("LOCK TABLE Points_Table IN EXCLUSIVE MODE")
+        else:
+            cursor.execute("SELECT pg_advisory_xact_lock(%s, %s)", (RESULTS_LOCK, tournament_id))
+
+    def _lock_analytics(self, cursor, tournament_id=None):
+        if tournament_id is None:
+            cursor.execute("LOCK TABLE Team_Stats, Head_To_Head IN EXCLUSIVE MODE")
+        else:
+            cursor.execute("SELECT pg_advisory_xact_lock(%s, %s)", (RESULTS_LOCK, tournament_id))
+
+    def _refresh_statistics(self, tables):
+        # The ranking query joins these tables per team; with the row
+        # estimates of a near-empty tournament the planner nested-loops
+        # whole tables until autovacuum catches up
+        with db.cursor() as cursor:
+            cursor.execute(f"ANALYZE {', '.join(tables)}")
+
+    def resume_pending_work(self):
+        deletion.resume_pending()
+
+    def listen_for_changes(self):
+        live.start()
+
+    def read_concurrency(self):
+        # More workers than pooled connections would only queue on checkout
+        return db.current_settings()["pool_max"]
+
+    def close(self):
+        db.close_pool()
+
+    def get_tournament_summaries(self, limit=None, offset=0):
+        if not summary.enabled():
+            return super().get_tournament_summaries(limit, offset)
+        with self.cursor() as cursor:
+            cursor.execute("""
+                SELECT t.tournament_id, t.name, t.start_date, t.end_date,
+                       COALESCE(s.team_count, 0) AS team_count,
+                       COALESCE(s.match_count, 0) AS match_count,
+                       COALESCE(s.completed, 0) AS completed
+                FROM Tournaments t
+                LEFT JOIN Tournament_Summary s ON s.tournament_id = t.tournament_id
+                WHERE NOT t.deleting
+                ORDER BY t.tournament_id
+                LIMIT %s OFFSET %s
+            """, (limit, offset))
+            return cursor.fetchall()
+
+    def record_results_query(self, results):
+        """RECORD_RESULTS_SQL for ``results`` as one statement: (sql, params)."""
+        values = ", ".join(["(%s::int, %s::int, %s::int)"] * len(results))
+        return RECORD_RESULTS_SQL.replace("VALUES %s", f"VALUES {values}"), [value for row in results for value in row]
+
+    def record_results(self, results):
+        results = list(results)
+        if not results:
+            return []
+        with self.cursor(write=True) as cursor:
+            # Wait out rebuilds of these tournaments; taken in id order, and
+            # before any row lock, so scorers never deadlock on them
+            cursor.execute("""
+                SELECT pg_advisory_xact_lock_shared(%s, tournament_id)
+                FROM (SELECT DISTINCT tournament_id FROM Matches WHERE match_id = ANY(%s) ORDER BY tournament_id) t
+            """, (RESULTS_LOCK, [match_id for match_id, _, _ in results]))
+            cursor.execute(*self.record_results_query(results))
+            recorded = cursor.fetchall()
+            # Form depends on the order of results, not on deltas: recompute
+            # it once the scores above are visible
+            self._refresh_form(cursor, [team for row in recorded for team in (row["team1_id"], row["team2_id"])])
+            newly_completed = Counter(row["tournament_id"] for row in recorded if row["was_pending"])
+            for tournament_id, count in newly_completed.items():
+                self._bump_summary(cursor, tournament_id, completed=count)
+        if len(results) >= BATCH_ROWS:
+            self._refresh_statistics(["Points_Table", "Team_Stats", "Head_To_Head"])
+        return [(row["match_id"], row["tournament_id"]) for row in recorded]
+
+    def delete_tournament(self, tournament_id):
+        # Flags the tournament and removes it in batches on a background thread
+        return deletion.delete_tournament(tournament_id)
+
+    def find_tournaments(self, cursor, names):
+        cursor.execute("SELECT name, tournament_id FROM Tournaments WHERE name = ANY(%s)", (list(names),))
+        return {row["name"]: row["tournament_id"] for row in cursor.fetchall()}
+
+    def find_teams(self, cursor, pairs):
+        pairs = list(pairs)
+        cursor.execute("""
+            SELECT t.tournament_id, t.name, t.team_id
+            FROM Teams t
+            JOIN unnest(%s::int[], %s::text[]) AS wanted(tournament_id, name)
+              ON t.tournament_id = wanted.tournament_id AND t.name = wanted.name
+        """, ([p[0] for p in pairs], [p[1] for p in pairs]))
+        found = {}
+        for row in cursor.fetchall():
+            found.setdefault((row["tournament_id"], row["name"]), row["team_id"])
+        return found
+
+    def insert_teams(self, cursor, rows):
+        inserted = execute_values(
+            cursor,
+            "INSERT INTO Teams (tournament_id, name, name_key) VALUES %s RETURNING tournament_id, name, team_id",
+            [(tournament_id, name, name_key(name)) for tournament_id, name in rows],
+            page_size=PAGE_SIZE, fetch=True
+        )
+        for tournament_id, count in Counter(row[0] for row in rows).items():
+            self._bump_summary(cursor, tournament_id, teams=count)
+        return [(r["tournament_id"], r["name"], r["team_id"]) for r in inserted]
+
+    def insert_matches(self, cursor, rows):
+        execute_values(
+            cursor,
+            "INSERT INTO Matches (tournament_id, team1_id, team2_id, match_date) VALUES %s",
+            rows, page_size=PAGE_SIZE
+        )
+        for tournament_id, count in Counter(row[0] for row in rows).items():
+            self._bump_summary(cursor, tournament_id, matches=count)
+        return len(rows)
@@ -0,0 +1,208 @@
+"""Embedded SQLite engine for single-node deployments and CI.
+
+One connection per thread, opened in WAL mode so readers never block the
+writer. Write transactions start with BEGIN IMMEDIATE so concurrent
+writers queue on busy_timeout instead of failing half-way through.
+Queries keep psycopg2's ``%s`` / ``%(name)s`` placeholders; the cursor
+wrapper rewrites them for sqlite3.
+
+    SPORTS_STORAGE=sqlite SPORTS_SQLITE_PATH=sports.db streamlit run app.py
+"""
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date
+from pathlib import Path
+
+from sports_data import columnar, metrics
+from sports_data.names import name_key
+from sports_data.storage.base import StorageBackend
+
+SCHEMA_PATH = Path(__file__).resolve().parent / "sqlite_schema.sql"
+# FULL OUTER JOIN and IS DISTINCT FROM
+MIN_SQLITE_VERSION = (3, 39, 0)
+
+PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA foreign_keys = ON",
+    "PRAGMA busy_timeout = 5000",
+    "PRAGMA cache_size = -65536",  # 64 MiB
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA mmap_size = 268435456",  # 256 MiB
+)
+
+_PLACEHOLDER = re.compile(r"%\((\w+)\)s|%s|%%")
+
+sqlite3.register_adapter(date, date.isoformat)
+sqlite3.register_converter("DATE", lambda value: date.fromisoformat(value.decode()))
+sqlite3.register_converter("BOOLEAN", lambda value: value not in (b"0", b""))
+
+
+def _translate(sql):
+    def replace(match):
+        if match.group(1):
+            return f":{match.group(1)}"
+        return "?" if match.group(0) == "%s" else "%"
+    return _PLACEHOLDER.sub(replace, sql)
+
+
+def _dict_row(cursor, row):
+    return {column[0]: value for column, value in zip(cursor.description, row)}
+
+
+class _Cursor:
+    """sqlite3 cursor that accepts psycopg2-style placeholders."""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def execute(self, sql, params=()):
+        start = time.perf_counter()
+        try:
+            self._cursor.execute(_translate(sql), params)
+        finally:
+            metrics.statement(time.perf_counter() - start, self._cursor.rowcount, sql)
+        return self
+
+    def executemany(self, sql, seq_of_params):
+        start = time.perf_counter()
+        try:
+            self._cursor.executemany(_translate(sql), seq_of_params)
+        finally:
+            metrics.statement(time.perf_counter() - start, self._cursor.rowcount, sql)
+        return self
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class SQLiteBackend(StorageBackend):
+    name = "sqlite"
+    NO_LIMIT = "-1"
+    DATA_ERRORS = StorageBackend.DATA_ERRORS + (sqlite3.DataError, sqlite3.IntegrityError)
+
+    def __init__(self, path=None):
+        if sqlite3.sqlite_version_info < MIN_SQLITE_VERSION:
+            raise RuntimeError(
+                f"SQLite {'.'.join(map(str, MIN_SQLITE_VERSION))}+ is required, found {sqlite3.sqlite_version}"
+            )
+        self.path = str(path or os.environ.get("SPORTS_SQLITE_PATH", "sports_event_tracker.db"))
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._add_team_name_keys()
+        self._connection().executescript(SCHEMA_PATH.read_text(encoding="utf-8"))
+        self._backfill_analytics()
+
+    def _add_team_name_keys(self):
+        # Files created before Teams.name_key get the column (before the
+        # schema indexes it) filled by names.name_key, and lose the old
+        # lower(name) index; PostgreSQL does this in migration 0011
+        with self.cursor(write=True) as cursor:
+            cursor.execute("SELECT name FROM pragma_table_info('Teams')")
+            columns = {row["name"] for row in cursor.fetchall()}
+            if not columns or "name_key" in columns:
+                return
+            cursor.execute("ALTER TABLE Teams ADD COLUMN name_key TEXT NOT NULL DEFAULT ''")
+            cursor.execute("SELECT team_id, name FROM Teams")
+            cursor.executemany(
+                "UPDATE Teams SET name_key = %s WHERE team_id = %s",
+                [(name_key(row["name"]), row["team_id"]) for row in cursor.fetchall()]
+            )
+            cursor.execute("DROP INDEX IF EXISTS teams_name_prefix_idx")
+
+    def _backfill_analytics(self):
+        # Files created before the analytics rollups have results but no
+        # Team_Stats rows; PostgreSQL does this in migration 0007
+        with self.cursor() as cursor:
+            cursor.execute("""
+                SELECT EXISTS (SELECT 1 FROM Matches WHERE team1_score IS NOT NULL)
+                   AND NOT EXISTS (SELECT 1 FROM Team_Stats) AS missing
+            """)
+            missing = cursor.fetchone()["missing"]
+        if missing:
+            self.rebuild_analytics(None)
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self.path, isolation_level=None, detect_types=sqlite3.PARSE_DECLTYPES,
+                check_same_thread=False
+            )
+            for pragma in PRAGMAS:
+                conn.execute(pragma)
+            conn.row_factory = _dict_row
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    @contextmanager
+    def cursor(self, write=False):
+        if write:
+            # SQLite has one writer at a time anyway. Queueing this
+            # process's writers on a lock, instead of on busy_timeout's
+            # polling, keeps a busy thread from being starved past the timeout
+            with self._write_lock:
+                with self._transaction("BEGIN IMMEDIATE") as cursor:
+                    yield cursor
+        else:
+            with self._transaction("BEGIN") as cursor:
+                yield cursor
+
+    @contextmanager
+    def _transaction(self, begin):
+        conn = self._connection()
+        conn.execute(begin)
+        cursor = _Cursor(conn.cursor())
+        try:
+            yield cursor
+            conn.execute("COMMIT")
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            cursor.close()
+
+    def read_frame(self, sql, params, columns):
+        conn = self._connection()
+        # Plain tuples, transposed into columns, not the dict rows the helpers use
+        conn.row_factory = None
+        start = time.perf_counter()
+        try:
+            rows = conn.execute(_translate(sql), params).fetchall()
+        finally:
+            conn.row_factory = _dict_row
+        metrics.statement(time.perf_counter() - start, len(rows), sql)
+        return columnar.from_rows(rows, columns)
+
+    def iter_rows(self, sql, params, size):
+        # sqlite3 steps the statement as rows are fetched; a cursor of its
+        # own returns plain tuples without touching the connection's rows
+        cursor = self._connection().cursor()
+        cursor.row_factory = None
+        try:
+            start = time.perf_counter()
+            cursor.execute(_translate(sql), params)
+            metrics.statement(time.perf_counter() - start, -1, sql)
+            while True:
+                rows = cursor.fetchmany(size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            cursor.close()
+
+    def close(self):
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
@@ -0,0 +1,123 @@
+-- The PostgreSQL schema after migrations 0001-0005 and 0007-0011, for the SQLite
+-- engine (0006 is PostgreSQL notifications only). Keep in step with migrations/
+-- when a migration changes tables or indexes the helpers rely on.
+
+CREATE TABLE IF NOT EXISTS Tournaments (
+    tournament_id INTEGER PRIMARY KEY,
+    name VARCHAR(100) NOT NULL,
+    start_date DATE NOT NULL,
+    end_date DATE NOT NULL,
+    deleting BOOLEAN NOT NULL DEFAULT 0,
+    CONSTRAINT tournaments_dates_check CHECK (end_date >= start_date)
+);
+
+CREATE TABLE IF NOT EXISTS Teams (
+    team_id INTEGER PRIMARY KEY,
+    tournament_id INTEGER NOT NULL REFERENCES Tournaments (tournament_id) ON DELETE CASCADE,
+    name VARCHAR(100) NOT NULL,
+    -- names.name_key(name), written by the engine (0011)
+    name_key TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS Matches (
+    match_id INTEGER PRIMARY KEY,
+    tournament_id INTEGER NOT NULL REFERENCES Tournaments (tournament_id) ON DELETE CASCADE,
+    team1_id INTEGER NOT NULL REFERENCES Teams (team_id) ON DELETE CASCADE,
+    team2_id INTEGER NOT NULL REFERENCES Teams (team_id) ON DELETE CASCADE,
+    match_date DATE NOT NULL,
+    team1_score INTEGER,
+    team2_score INTEGER,
+    winner_id INTEGER REFERENCES Teams (team_id) ON DELETE SET NULL,
+    CONSTRAINT matches_distinct_teams_check CHECK (team1_id <> team2_id)
+);
+
+CREATE TABLE IF NOT EXISTS Points_Table (
+    tournament_id INTEGER NOT NULL REFERENCES Tournaments (tournament_id) ON DELETE CASCADE,
+    team_id INTEGER NOT NULL REFERENCES Teams (team_id) ON DELETE CASCADE,
+    matches_played INTEGER NOT NULL DEFAULT 0,
+    wins INTEGER NOT NULL DEFAULT 0,
+    losses INTEGER NOT NULL DEFAULT 0,
+    draws INTEGER NOT NULL DEFAULT 0,
+    points INTEGER NOT NULL DEFAULT 0,
+    CONSTRAINT points_table_tournament_team_key UNIQUE (tournament_id, team_id)
+);
+
+CREATE INDEX IF NOT EXISTS teams_tournament_idx
+    ON Teams (tournament_id, team_id);
+-- search_teams (0011); SQLite compares text byte-wise already
+CREATE INDEX IF NOT EXISTS teams_name_key_idx
+    ON Teams (tournament_id, name_key, team_id);
+
+CREATE INDEX IF NOT EXISTS matches_date_idx
+    ON Matches (match_date DESC, match_id DESC);
+
+CREATE INDEX IF NOT EXISTS matches_tournament_date_idx
+    ON Matches (tournament_id, match_date DESC, match_id DESC);
+
+CREATE INDEX IF NOT EXISTS matches_pending_date_idx
+    ON Matches (match_date DESC, match_id DESC)
+    WHERE team1_score IS NULL;
+
+CREATE INDEX IF NOT EXISTS matches_pending_tournament_idx
+    ON Matches (tournament_id, match_date DESC, match_id DESC)
+    WHERE team1_score IS NULL;
+
+CREATE INDEX IF NOT EXISTS matches_team1_idx ON Matches (team1_id);
+CREATE INDEX IF NOT EXISTS matches_team2_idx ON Matches (team2_id);
+CREATE INDEX IF NOT EXISTS matches_winner_idx ON Matches (winner_id) WHERE winner_id IS NOT NULL;
+
+CREATE INDEX IF NOT EXISTS points_table_standings_idx
+    ON Points_Table (tournament_id, points DESC, wins DESC);
+CREATE INDEX IF NOT EXISTS points_table_team_idx ON Points_Table (team_id);
+
+-- Analytics rollups (0007); team1 is the home side
+CREATE TABLE IF NOT EXISTS Team_Stats (
+    tournament_id INTEGER NOT NULL REFERENCES Tournaments (tournament_id) ON DELETE CASCADE,
+    team_id INTEGER NOT NULL REFERENCES Teams (team_id) ON DELETE CASCADE,
+    home_played INTEGER NOT NULL DEFAULT 0,
+    home_wins INTEGER NOT NULL DEFAULT 0,
+    home_draws INTEGER NOT NULL DEFAULT 0,
+    home_losses INTEGER NOT NULL DEFAULT 0,
+    home_goals_for INTEGER NOT NULL DEFAULT 0,
+    home_goals_against INTEGER NOT NULL DEFAULT 0,
+    away_played INTEGER NOT NULL DEFAULT 0,
+    away_wins INTEGER NOT NULL DEFAULT 0,
+    away_draws INTEGER NOT NULL DEFAULT 0,
+    away_losses INTEGER NOT NULL DEFAULT 0,
+    away_goals_for INTEGER NOT NULL DEFAULT 0,
+    away_goals_against INTEGER NOT NULL DEFAULT 0,
+    form VARCHAR(10) NOT NULL DEFAULT '',
+    PRIMARY KEY (tournament_id, team_id)
+);
+
+CREATE TABLE IF NOT EXISTS Head_To_Head (
+    tournament_id INTEGER NOT NULL REFERENCES Tournaments (tournament_id) ON DELETE CASCADE,
+    team_id INTEGER NOT NULL REFERENCES Teams (team_id) ON DELETE CASCADE,
+    opponent_id INTEGER NOT NULL REFERENCES Teams (team_id) ON DELETE CASCADE,
+    played INTEGER NOT NULL DEFAULT 0,
+    wins INTEGER NOT NULL DEFAULT 0,
+    draws INTEGER NOT NULL DEFAULT 0,
+    losses INTEGER NOT NULL DEFAULT 0,
+    goals_for INTEGER NOT NULL DEFAULT 0,
+    goals_against INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (tournament_id, team_id, opponent_id)
+);
+
+CREATE INDEX IF NOT EXISTS team_stats_team_idx ON Team_Stats (team_id);
+CREATE INDEX IF NOT EXISTS head_to_head_team_idx ON Head_To_Head (team_id);
+CREATE INDEX IF NOT EXISTS head_to_head_opponent_idx ON Head_To_Head (opponent_id);
+
+-- Standings rules (0008)
+CREATE TABLE IF NOT EXISTS Tournament_Rules (
+    tournament_id INTEGER PRIMARY KEY REFERENCES Tournaments (tournament_id) ON DELETE CASCADE,
+    tie_breakers VARCHAR(200) NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS Fair_Play (
+    tournament_id INTEGER NOT NULL REFERENCES Tournaments (tournament_id) ON DELETE CASCADE,
+    team_id INTEGER NOT NULL REFERENCES Teams (team_id) ON DELETE CASCADE,
+    points INTEGER NOT NULL DEFAULT 0 CHECK (points >= 0),
+    PRIMARY KEY (tournament_id, team_id)
+);
+
+CREATE INDEX IF NOT EXISTS fair_play_team_idx ON Fair_Play (team_id);
@@ -0,0 +1,125 @@
+"""Optional incrementally maintained per-tournament counters.
+
+When ``SPORTS_SUMMARY_TABLE=1`` the writers keep Tournament_Summary
+(migration 0004) in step with Teams and Matches inside their own
+transactions, so the Dashboard reads one small row per tournament
+instead of counting. Without it, get_tournament_summaries() falls back
+to a grouped query.
+
+Only the migration creates the table. Its header still says this module
+creates it lazily too; that stopped being true, but an applied
+migration's text can't change (see migrate.py's checksums).
+
+Writes made while the setting is off are not counted, so fill the table
+when turning it on for a database that already has data, and check it
+at any time against a recount:
+
+    python -m sports_data.summary rebuild
+    python -m sports_data.summary verify
+"""
+import argparse
+import os
+
+from sports_data import db
+
+COLUMNS = ("team_count", "match_count", "completed")
+
+# Every tournament's counters as recounted from Teams and Matches
+EXPECTED = """
+    SELECT t.tournament_id,
+           COALESCE(tc.team_count, 0) AS team_count,
+           COALESCE(mc.match_count, 0) AS match_count,
+           COALESCE(mc.completed, 0) AS completed
+    FROM Tournaments t
+    LEFT JOIN (SELECT tournament_id, COUNT(*) AS team_count
+               FROM Teams GROUP BY tournament_id) tc ON tc.tournament_id = t.tournament_id
+    LEFT JOIN (SELECT tournament_id, COUNT(*) AS match_count, COUNT(team1_score) AS completed
+               FROM Matches GROUP BY tournament_id) mc ON mc.tournament_id = t.tournament_id
+"""
+
+REBUILD = f"""
+    INSERT INTO Tournament_Summary (tournament_id, team_count, match_count, completed)
+    {EXPECTED}
+    ON CONFLICT (tournament_id) DO UPDATE
+    SET team_count = EXCLUDED.team_count,
+        match_count = EXCLUDED.match_count,
+        completed = EXCLUDED.completed
+"""
+
+VERIFY = f"""
+    SELECT e.tournament_id,
+           {", ".join(f"COALESCE(s.{c}, 0) AS stored_{c}, e.{c} AS expected_{c}" for c in COLUMNS)}
+    FROM ({EXPECTED}) e
+    LEFT JOIN Tournament_Summary s ON s.tournament_id = e.tournament_id
+    WHERE {" OR ".join(f"COALESCE(s.{c}, 0) <> e.{c}" for c in COLUMNS)}
+    ORDER BY e.tournament_id
+"""
+
+
+def enabled():
+    return os.environ.get("SPORTS_SUMMARY_TABLE", "") in ("1", "true", "yes")
+
+
+def rebuild():
+    """Recompute every row from Teams and Matches; returns the rows written.
+
+    The table lock waits for writers that have already bumped a counter
+    to commit, so the recount sees their rows, and holds back new bumps
+    until the recount is in: none is lost or counted twice.
+    """
+    with db.cursor() as cursor:
+        cursor.execute("LOCK TABLE Tournament_Summary IN SHARE ROW EXCLUSIVE MODE")
+        cursor.execute(REBUILD)
+        return cursor.rowcount
+
+
+def verify():
+    """Tournaments whose stored counters differ from a recount.
+
+    One dict per tournament with ``stored_<col>`` and ``expected_<col>``
+    for every column; an empty list means no drift.
+    """
+    with db.cursor(dict_rows=True) as cursor:
+        cursor.execute(VERIFY)
+        return cursor.fetchall()
+
+
+def bump(cursor, tournament_id, teams=0, matches=0, completed=0):
+    """Apply a delta to one tournament's counters on the caller's transaction.
+
+    No-op unless the summary table is enabled.
+    """
+    if not enabled() or not (teams or matches or completed):
+        return
+    cursor.execute("""
+        INSERT INTO Tournament_Summary (tournament_id, team_count, match_count, completed)
+        VALUES (%s, %s, %s, %s)
+        ON CONFLICT (tournament_id) DO UPDATE
+        SET team_count = Tournament_Summary.team_count + EXCLUDED.team_count,
+            match_count = Tournament_Summary.match_count + EXCLUDED.match_count,
+            completed = Tournament_Summary.completed + EXCLUDED.completed
+    """, (tournament_id, teams, matches, completed))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild or verify the Tournament_Summary counters")
+    parser.add_argument("action", choices=["rebuild", "verify"])
+    args = parser.parse_args(argv)
+
+    if args.action == "rebuild":
+        print(f"Rebuilt Tournament_Summary: {rebuild()} rows")
+        return 0
+
+    drift = verify()
+    for row in drift:
+        changes = ", ".join(
+            f"{c} {row[f'stored_{c}']} -> {row[f'expected_{c}']}" for c in COLUMNS
+            if row[f"stored_{c}"] != row[f"expected_{c}"]
+        )
+        print(f"tournament {row['tournament_id']}: {changes}")
+    print(f"{len(drift)} tournaments differ")
+    return 1 if drift else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
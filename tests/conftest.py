@@ -0,0 +1,58 @@
+"""Shared fixtures: one scratch backend per engine in ``storage.BACKENDS``.
+
+SQLite runs on a temporary file. PostgreSQL runs on SPORTS_TEST_DB_NAME
+(default ``Sports_Event_Tracker_test``) on the server configured through
+the usual SPORTS_DB_* / DATABASE_URL variables, created and migrated on
+first use; its tests are skipped when that server can't be reached.
+Never point it at a live database: every test deletes all rows.
+"""
+import os
+
+import psycopg2
+import pytest
+
+from sports_data import cache, storage
+
+TEST_DB = os.environ.get("SPORTS_TEST_DB_NAME", "Sports_Event_Tracker_test")
+
+
+def _open(engine, directory):
+    if engine == "sqlite":
+        return storage.create_backend("sqlite", path=os.path.join(directory, "test.db"))
+    from sports_data import db, migrate
+    try:
+        db.create_database(TEST_DB)
+    except psycopg2.OperationalError as e:
+        pytest.skip(f"no PostgreSQL server: {str(e).strip()}")
+    db.configure({"database": TEST_DB, "dsn": None})
+    migrate.migrate()
+    return storage.create_backend("postgres")
+
+
+def _reset(backend):
+    with backend.cursor(write=True) as cursor:
+        # Teams, Matches and Points_Table cascade
+        cursor.execute("DELETE FROM Tournaments")
+    cache.clear()
+
+
+@pytest.fixture(scope="session", params=sorted(storage.BACKENDS))
+def engine(request, tmp_path_factory):
+    """The engine's name and its backend, installed as the process-wide one."""
+    backend = _open(request.param, str(tmp_path_factory.mktemp(request.param)))
+    previous = storage.set_backend(backend)
+    yield request.param, backend
+    storage.set_backend(previous)
+    backend.close()
+    if request.param == "postgres":
+        from sports_data import db
+        db.configure()
+
+
+@pytest.fixture
+def backend(engine):
+    """The current engine's backend, with empty tables."""
+    _, backend = engine
+    _reset(backend)
+    yield backend
+    _reset(backend)
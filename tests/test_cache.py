@@ -0,0 +1,192 @@
+"""The versioned read cache and the team search prefix cache.
+
+Each test gets fresh caches and a clock it moves by hand. Only the last
+test touches a database, checking cached searches against the query.
+"""
+import types
+from datetime import date
+
+import pytest
+
+from sports_data import cache
+from sports_data.names import name_key
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache, "time", types.SimpleNamespace(monotonic=clock.monotonic))
+    return clock
+
+
+@pytest.fixture
+def read_cache(monkeypatch, clock):
+    fresh = cache.VersionedCache(maxsize=4, ttl=60.0)
+    monkeypatch.setattr(cache, "read_cache", fresh)
+    return fresh
+
+
+@pytest.fixture
+def loads():
+    """A cached per-tournament reader and the list of tournaments it actually loaded."""
+    loaded = []
+
+    @cache.cached(lambda tournament_id: tournament_id)
+    def teams(tournament_id):
+        loaded.append(tournament_id)
+        return [f"team of {tournament_id}"]
+
+    return teams, loaded
+
+
+def test_repeat_reads_are_served_from_memory(read_cache, loads):
+    teams, loaded = loads
+    assert teams(1) == teams(1) == ["team of 1"]
+    assert loaded == [1]
+    assert (read_cache.hits, read_cache.misses) == (1, 1)
+
+
+def test_invalidating_one_tournament_keeps_the_others(read_cache, loads):
+    teams, loaded = loads
+    teams(1), teams(2)
+    cache.invalidate(1)
+    teams(1), teams(2)
+    assert loaded == [1, 2, 1]
+    assert read_cache.version(1) == 1 and read_cache.version(2) == 0
+
+
+def test_every_write_moves_all(read_cache):
+    everything = []
+
+    @cache.cached(lambda: cache.ALL)
+    def tournaments():
+        everything.append(None)
+        return []
+
+    tournaments()
+    cache.invalidate(7)
+    tournaments()
+    assert len(everything) == 2
+
+
+def test_entries_expire_after_ttl(read_cache, loads, clock):
+    teams, loaded = loads
+    teams(1)
+    clock.now += 59
+    teams(1)
+    clock.now += 1
+    teams(1)
+    assert loaded == [1, 1]
+
+
+def test_least_recently_used_entry_is_evicted(read_cache, loads):
+    teams, loaded = loads
+    for tournament_id in (1, 2, 3, 4):
+        teams(tournament_id)
+    teams(1)  # now the most recently used
+    teams(5)  # over maxsize: 2 goes
+    assert read_cache.stats()["size"] == 4
+    assert read_cache.evictions == 1
+    teams(1), teams(3), teams(4), teams(5)
+    assert loaded == [1, 2, 3, 4, 5]
+    teams(2)
+    assert loaded == [1, 2, 3, 4, 5, 2]
+
+
+def test_clear_drops_entries_but_not_versions(read_cache, loads):
+    teams, loaded = loads
+    cache.invalidate(1)
+    teams(1)
+    cache.clear()
+    teams(1)
+    assert loaded == [1, 1]
+    assert read_cache.version(1) == 1
+
+
+# -------------------------
+# Team search prefix cache
+# -------------------------
+TEAMS = ["Alpha", "ALPINE", "Alps", "Beta", "Ölympia", "ÖSTERSUND", "Straße"]
+
+
+@pytest.fixture
+def team_prefixes(monkeypatch, read_cache):
+    fresh = cache.PrefixCache(max_prefixes=8, ttl=60.0)
+    monkeypatch.setattr(cache, "team_prefixes", fresh)
+    return fresh
+
+
+@pytest.fixture
+def searches(team_prefixes):
+    """A cached search over TEAMS (fetching at least 3 rows) and the prefixes it queried."""
+    queried = []
+
+    @cache.prefix_cached(3, limit=2)
+    def search(tournament_id, prefix, limit):
+        queried.append(prefix)
+        found = sorted((name_key(n), n) for n in TEAMS if name_key(n).startswith(prefix))
+        return [{"name": n} for _, n in found[:limit]]
+
+    return search, queried
+
+
+def _names(rows):
+    return [row["name"] for row in rows]
+
+
+def test_complete_result_narrows_longer_prefixes(searches):
+    search, queried = searches
+    assert _names(search(1, "Ö")) == ["Ölympia", "ÖSTERSUND"]
+    assert _names(search(1, "öL")) == ["Ölympia"]
+    assert _names(search(1, "ÖST")) == ["ÖSTERSUND"]
+    assert _names(search(1, "STRASS")) == ["Straße"]
+    assert queried == ["ö", "strass"]
+
+
+def test_cut_off_result_is_not_narrowed(searches, team_prefixes):
+    search, queried = searches
+    # Asked for 3 rows and got 3: "alps" may match teams beyond them
+    assert _names(search(1, "a")) == ["Alpha", "ALPINE"]
+    assert _names(search(1, "alps")) == ["Alps"]
+    assert queried == ["a", "alps"]
+    assert team_prefixes.narrowed == 0
+
+
+def test_cached_rows_page_up_to_what_was_fetched(searches, team_prefixes):
+    search, queried = searches
+    assert _names(search(1, "al", limit=3)) == ["Alpha", "ALPINE", "Alps"]
+    assert _names(search(1, "al", limit=1)) == ["Alpha"]
+    # Fetched 3 and got 3: more rows may exist
+    assert _names(search(1, "al", limit=5)) == ["Alpha", "ALPINE", "Alps"]
+    assert queried == ["al", "al"]
+    assert _names(search(1, "alp", limit=5)) == ["Alpha", "ALPINE", "Alps"]
+    assert queried == ["al", "al"] and team_prefixes.narrowed == 1
+
+
+def test_prefixes_go_with_their_tournament_version(searches):
+    search, queried = searches
+    search(1, "b"), search(2, "b")
+    cache.invalidate(1)
+    search(1, "b"), search(2, "b")
+    assert queried == ["b", "b", "b"]
+
+
+def test_cached_search_agrees_with_the_query(backend):
+    from sports_data import queries
+
+    backend.add_tournament("Cup", date(2024, 1, 1), date(2024, 3, 31))
+    (tournament,) = backend.get_tournaments()
+    tournament_id = tournament["tournament_id"]
+    for name in TEAMS:
+        backend.add_team(tournament_id, name)
+    for prefix in ("", "a", "AL", "alp", "Ö", "öl", "ÖLY", "s", "strass", "x"):
+        cached = queries.search_teams(tournament_id, prefix, limit=3)
+        assert cached == backend.search_teams(tournament_id, prefix, 3), prefix
@@ -0,0 +1,326 @@
+"""Behaviour every storage engine must share.
+
+Each test starts from empty tables (see the ``backend`` fixture in
+conftest.py), seeds a small tournament through the backend's own API and
+asserts on what the helpers return. They run once per engine in
+``storage.BACKENDS``:
+
+    python -m pytest tests/test_conformance.py                 # every engine
+    python -m pytest tests/test_conformance.py -k sqlite       # one engine
+"""
+import io
+import time
+from datetime import date
+
+import pytest
+
+from sports_data import standings
+
+# How long to wait for an asynchronous delete_tournament to finish
+DELETE_TIMEOUT = 30
+
+
+def _tournament_id(backend, name):
+    return next(t["tournament_id"] for t in backend.get_tournaments() if t["name"] == name)
+
+
+def _seed(backend, name="Cup"):
+    """One tournament, teams A-D and four unscored matches; returns ids."""
+    backend.add_tournament(name, date(2024, 1, 1), date(2024, 3, 31))
+    tournament_id = _tournament_id(backend, name)
+    for team in "ABCD":
+        backend.add_team(tournament_id, team)
+    teams = {t["name"]: t["team_id"] for t in backend.get_teams(tournament_id)}
+    for day, (home, away) in enumerate(["AB", "CD", "AC", "BD"], start=1):
+        backend.add_match(tournament_id, teams[home], teams[away], date(2024, 1, day))
+    matches = {
+        (m["team1_name"], m["team2_name"]): m["match_id"]
+        for m in backend.get_matches(tournament_id)
+    }
+    return tournament_id, teams, matches
+
+
+def _standings(backend, tournament_id):
+    frame = backend.get_standings(tournament_id)
+    return {
+        row.team_name: (row.matches_played, row.wins, row.losses, row.draws, row.points)
+        for row in frame.itertuples()
+    }
+
+
+def test_tournaments_round_trip(backend):
+    backend.add_tournament("League", date(2024, 2, 1), date(2024, 6, 30))
+    (row,) = backend.get_tournaments()
+    assert row["name"] == "League"
+    assert row["start_date"] == date(2024, 2, 1) and row["end_date"] == date(2024, 6, 30)
+    assert not row["deleting"]
+
+
+def test_end_date_before_start_is_rejected(backend):
+    with pytest.raises(Exception):
+        backend.add_tournament("Backwards", date(2024, 6, 1), date(2024, 1, 1))
+    assert backend.get_tournaments() == []
+
+
+def test_teams_in_insert_order(backend):
+    tournament_id, teams, _ = _seed(backend)
+    assert [t["name"] for t in backend.get_teams(tournament_id)] == list("ABCD")
+
+
+def test_team_pages_and_prefix_search(backend):
+    tournament_id, teams, _ = _seed(backend)
+    for name in ("alpha", "Alpine", "Beta", "ALPS"):
+        backend.add_team(tournament_id, name)
+    _seed(backend, "Shield")
+    first = backend.get_teams(tournament_id, limit=3)
+    rest = backend.get_teams(tournament_id, after=first[-1]["team_id"])
+    assert [t["name"] for t in first + rest] == list("ABCD") + ["alpha", "Alpine", "Beta", "ALPS"]
+    assert [t["name"] for t in backend.search_teams(tournament_id, "Alp")] == ["alpha", "Alpine", "ALPS"]
+    assert [t["name"] for t in backend.search_teams(tournament_id, "alp", limit=2)] == ["alpha", "Alpine"]
+    assert [t["name"] for t in backend.search_teams(tournament_id, "b")] == ["B", "Beta"]
+    assert [t["name"] for t in backend.search_teams(tournament_id, "")][:3] == ["A", "alpha", "Alpine"]
+    assert backend.search_teams(tournament_id, "alpx") == []
+    # Prefixes are text, not patterns
+    assert backend.search_teams(tournament_id, "%") == backend.search_teams(tournament_id, "_") == []
+
+
+def test_prefix_search_folds_case_beyond_ascii(backend):
+    tournament_id, _, _ = _seed(backend)
+    backend.add_team(tournament_id, "Ölympia")
+    with backend.cursor(write=True) as cursor:
+        backend.insert_teams(cursor, [(tournament_id, "ÖSTERSUND"), (tournament_id, "Straße")])
+    assert [t["name"] for t in backend.search_teams(tournament_id, "ö")] == ["Ölympia", "ÖSTERSUND"]
+    assert [t["name"] for t in backend.search_teams(tournament_id, "öL")] == ["Ölympia"]
+    assert [t["name"] for t in backend.search_teams(tournament_id, "STRASS")] == ["Straße"]
+    assert backend.search_teams(tournament_id, "ol") == []
+
+
+def test_match_against_itself_is_rejected(backend):
+    tournament_id, teams, _ = _seed(backend)
+    with pytest.raises(Exception):
+        backend.add_match(tournament_id, teams["A"], teams["A"], date(2024, 2, 1))
+
+
+def test_matches_newest_first_with_filters(backend):
+    tournament_id, _, matches = _seed(backend)
+    rows = backend.get_matches(tournament_id)
+    assert [(m["team1_name"], m["team2_name"]) for m in rows] == [("B", "D"), ("A", "C"), ("C", "D"), ("A", "B")]
+    assert rows[0]["match_date"] == date(2024, 1, 4) and rows[0]["tournament_name"] == "Cup"
+    assert rows[0]["team1_score"] is None
+    assert len(backend.get_matches(limit=2)) == 2
+    assert len(backend.get_matches(date_from=date(2024, 1, 2), date_to=date(2024, 1, 3))) == 2
+    backend.record_results([(matches[("A", "B")], 1, 0)])
+    assert [m["match_id"] for m in backend.get_matches(status="completed")] == [matches[("A", "B")]]
+    assert len(backend.get_matches(tournament_id, status="pending")) == 3
+    with pytest.raises(ValueError):
+        backend.get_matches(status="postponed")
+
+
+def test_match_frame_keeps_types(backend):
+    tournament_id, _, matches = _seed(backend)
+    backend.record_results([(matches[("A", "B")], 2, 0)])
+    frame = backend.get_match_frame(tournament_id)
+    assert list(frame["match_id"]) == [m["match_id"] for m in backend.get_matches(tournament_id)]
+    assert {str(t) for t in frame.dtypes[["team1_score", "team2_score"]]} == {"int64[pyarrow]"}
+    assert str(frame.dtypes["match_date"]) == "date32[day][pyarrow]"
+    assert frame["team1_score"].isna().sum() == 3 and frame["team1_score"].iloc[-1] == 2
+    assert frame["match_date"].iloc[0] == date(2024, 1, 4) and frame["team1_name"].iloc[0] == "B"
+    assert backend.get_match_frame(tournament_id, status="completed", limit=0).empty
+
+
+def test_keyset_pages_cover_every_match_once(backend):
+    _seed(backend)
+    seen = []
+    after = None
+    while True:
+        page = backend.get_matches(limit=3, after=after)
+        if not page:
+            break
+        seen.extend(m["match_id"] for m in page)
+        after = (page[-1]["match_date"], page[-1]["match_id"])
+    assert seen == [m["match_id"] for m in backend.get_matches()]
+    assert len(seen) == 4
+
+
+def test_stats_and_summaries(backend):
+    tournament_id, _, matches = _seed(backend)
+    _seed(backend, "Shield")
+    backend.record_results([(matches[("A", "B")], 2, 2)])
+    assert tuple(backend.get_tournament_stats(tournament_id)) == (4, 4, 1)
+    summaries = backend.get_tournament_summaries()
+    assert [(s["name"], s["team_count"], s["match_count"], s["completed"]) for s in summaries] == [
+        ("Cup", 4, 4, 1), ("Shield", 4, 4, 0)
+    ]
+    assert [s["name"] for s in backend.get_tournament_summaries(limit=1, offset=1)] == ["Shield"]
+
+
+def test_results_update_standings(backend):
+    tournament_id, _, matches = _seed(backend)
+    recorded = backend.record_results([
+        (matches[("A", "B")], 3, 1),
+        (matches[("C", "D")], 0, 0),
+        (999_999, 1, 0),
+    ])
+    assert sorted(recorded) == sorted([(matches[("A", "B")], tournament_id), (matches[("C", "D")], tournament_id)])
+    assert _standings(backend, tournament_id) == {
+        "A": (1, 1, 0, 0, standings.WIN_POINTS),
+        "B": (1, 0, 1, 0, standings.LOSS_POINTS),
+        "C": (1, 0, 0, 1, standings.DRAW_POINTS),
+        "D": (1, 0, 0, 1, standings.DRAW_POINTS),
+    }
+    assert list(backend.get_standings(tournament_id).columns) == [
+        "position", "team_id", "team_name", "matches_played", "wins", "losses", "draws", "points",
+        "goals_for", "goals_against", "goal_difference", "head_to_head_points", "fair_play_points",
+    ]
+
+
+def test_tie_breakers_rank_with_dense_positions(backend):
+    tournament_id, teams, matches = _seed(backend)
+    # A and C finish level on points, as do B and D; A-C and B-D were draws
+    backend.record_results([
+        (matches[("A", "B")], 2, 0), (matches[("C", "D")], 1, 0),
+        (matches[("A", "C")], 0, 0), (matches[("B", "D")], 1, 1),
+    ])
+
+    def positions():
+        frame = backend.get_standings(tournament_id)
+        return dict(zip(frame["team_name"], frame["position"]))
+
+    assert backend.get_tie_breakers(tournament_id) == standings.DEFAULT_TIE_BREAKERS
+    # Goal difference separates both pairs
+    assert positions() == {"A": 1, "C": 2, "D": 3, "B": 4}
+    row = backend.get_standings(tournament_id).iloc[0]
+    assert (row["goals_for"], row["goals_against"], row["goal_difference"]) == (2, 0, 2)
+    # Head-to-head alone can't: each pair shares a position
+    backend.set_tie_breakers(tournament_id, ("head_to_head",))
+    assert positions() == {"A": 1, "C": 1, "B": 2, "D": 2}
+    backend.set_fair_play(tournament_id, {teams["A"]: 3, teams["C"]: 1})
+    backend.set_tie_breakers(tournament_id, ("head_to_head", "fair_play"))
+    assert backend.get_tie_breakers(tournament_id) == ("head_to_head", "fair_play")
+    assert backend.get_fair_play(tournament_id) == {teams["A"]: 3, teams["C"]: 1}
+    assert [(t["name"], t["points"]) for t in backend.get_fair_play_teams(tournament_id)] == [("A", 3), ("C", 1)]
+    assert positions() == {"C": 1, "A": 2, "B": 3, "D": 3}
+    backend.set_fair_play(tournament_id, {teams["A"]: 0})
+    assert backend.get_fair_play(tournament_id) == {teams["C"]: 1}
+
+
+def test_rescoring_replaces_the_old_result(backend):
+    tournament_id, teams, matches = _seed(backend)
+    match_id = matches[("A", "B")]
+    backend.record_results([(match_id, 3, 1)])
+    backend.record_results([(match_id, 3, 1)])
+    backend.record_results([(match_id, 0, 2)])
+    table = _standings(backend, tournament_id)
+    assert table["A"][:3] == (1, 0, 1) and table["B"][:3] == (1, 1, 0)
+    assert backend.verify_points_table(tournament_id) == []
+    with backend.cursor() as cursor:
+        cursor.execute("SELECT winner_id FROM Matches WHERE match_id = %s", (match_id,))
+        assert cursor.fetchone()["winner_id"] == teams["B"]
+
+
+def test_verify_finds_and_rebuild_fixes_drift(backend):
+    tournament_id, teams, matches = _seed(backend)
+    backend.record_results([(matches[("A", "B")], 1, 0), (matches[("C", "D")], 2, 1)])
+    assert backend.verify_points_table() == []
+    with backend.cursor(write=True) as cursor:
+        cursor.execute("UPDATE Points_Table SET points = points + 5 WHERE team_id = %s", (teams["A"],))
+        cursor.execute("DELETE FROM Points_Table WHERE team_id = %s", (teams["D"],))
+    drift = {row["team_id"]: row for row in backend.verify_points_table(tournament_id)}
+    assert set(drift) == {teams["A"], teams["D"]}
+    assert drift[teams["A"]]["stored_points"] - drift[teams["A"]]["expected_points"] == 5
+    assert drift[teams["D"]]["stored_points"] is None and drift[teams["D"]]["expected_matches_played"] == 1
+    assert backend.rebuild_points_table(tournament_id) == 4
+    assert backend.verify_points_table() == []
+
+
+def test_analytics_follow_results(backend):
+    tournament_id, teams, matches = _seed(backend)
+    backend.record_results([(matches[("A", "B")], 3, 1), (matches[("A", "C")], 0, 0)])
+    backend.record_results([(matches[("A", "B")], 1, 2)])
+    stats = {row["team_id"]: row for row in backend.get_team_analytics(tournament_id)}
+    a = stats[teams["A"]]
+    assert (a["home_played"], a["home_wins"], a["home_draws"], a["home_losses"]) == (2, 0, 1, 1)
+    assert (a["home_goals_for"], a["home_goals_against"], a["away_played"]) == (1, 2, 0)
+    assert a["form"] == "DL" and stats[teams["B"]]["form"] == "W" and stats[teams["D"]]["form"] == ""
+    assert backend.get_team_stats(tournament_id, teams["A"]) == a
+    assert backend.get_team_stats(tournament_id, teams["D"])["form"] == ""
+    other_id, _, _ = _seed(backend, "Shield")
+    assert backend.get_team_stats(other_id, teams["A"]) is None
+    pair = backend.get_head_to_head(tournament_id, teams["B"], teams["A"])
+    assert (pair["played"], pair["wins"], pair["goals_for"], pair["goals_against"]) == (1, 1, 2, 1)
+    assert backend.get_head_to_head(tournament_id, teams["C"], teams["D"]) is None
+    assert backend.verify_analytics() == []
+    with backend.cursor(write=True) as cursor:
+        cursor.execute("UPDATE Team_Stats SET form = 'WWWWW' WHERE team_id = %s", (teams["A"],))
+        cursor.execute("DELETE FROM Head_To_Head WHERE team_id = %s", (teams["B"],))
+    drift = backend.verify_analytics(tournament_id)
+    assert {(row["table"], row["team_id"]) for row in drift} == {
+        ("Team_Stats", teams["A"]), ("Head_To_Head", teams["B"])
+    }
+    backend.rebuild_analytics(tournament_id)
+    assert backend.verify_analytics() == []
+
+
+def test_export_streams_in_chunks(backend):
+    tournament_id, _, matches = _seed(backend)
+    backend.record_results([(matches[("A", "B")], 1, 0)])
+    sql, params, columns = backend.export_query("matches", tournament_id)
+    chunks = list(backend.iter_rows(sql, params, 3))
+    assert [len(rows) for rows in chunks] == [3, 1]
+    assert [row[0] for rows in chunks for row in rows] == [m["match_id"] for m in backend.get_matches(tournament_id)]
+    out = io.BytesIO()
+    assert backend.copy_csv(sql, params, columns, out, 3) == 4
+    lines = out.getvalue().decode().splitlines()
+    assert lines[0] == ",".join(name for name, _ in columns) and len(lines) == 5
+    assert lines[1].endswith(",Cup,2024-01-04,,") and lines[4].endswith(",Cup,2024-01-01,1,0")
+    sql, params, columns = backend.export_query("standings", date_from=date(2024, 4, 1))
+    assert list(backend.iter_rows(sql, params, 10)) == []
+
+
+def test_bulk_import_primitives(backend):
+    tournament_id, teams, _ = _seed(backend)
+    with backend.cursor(write=True) as cursor:
+        assert backend.find_tournaments(cursor, {"Cup", "Nope"}) == {"Cup": tournament_id}
+        assert backend.find_teams(cursor, {(tournament_id, "A"), (tournament_id, "Z")}) == {
+            (tournament_id, "A"): teams["A"]
+        }
+        inserted = backend.insert_teams(cursor, [(tournament_id, "E"), (tournament_id, "F")])
+        assert sorted(name for _, name, _ in inserted) == ["E", "F"]
+        new_ids = {name: team_id for _, name, team_id in inserted}
+        assert backend.insert_matches(cursor, [(tournament_id, new_ids["E"], new_ids["F"], date(2024, 2, 1))]) == 1
+    assert tuple(backend.get_tournament_stats(tournament_id)) == (6, 5, 0)
+    assert backend.get_tournament_summaries()[0]["team_count"] == 6
+
+
+def test_failed_write_rolls_back(backend):
+    tournament_id, teams, _ = _seed(backend)
+    with pytest.raises(RuntimeError), backend.cursor(write=True) as cursor:
+        backend.insert_teams(cursor, [(tournament_id, "E")])
+        raise RuntimeError("abort")
+    assert [t["name"] for t in backend.get_teams(tournament_id)] == list("ABCD")
+
+
+def test_reads_see_own_writes(backend):
+    # With read replicas configured, a read straight after a write must
+    # not be served by one that has not replayed it yet
+    backend.add_tournament("Fresh", date(2024, 1, 1), date(2024, 3, 31))
+    tournament_id = _tournament_id(backend, "Fresh")
+    for n in range(20):
+        backend.add_team(tournament_id, f"T{n}")
+        assert backend.get_teams(tournament_id)[-1]["name"] == f"T{n}"
+
+
+def test_delete_cascades(backend):
+    tournament_id, _, matches = _seed(backend)
+    other_id, _, _ = _seed(backend, "Shield")
+    backend.record_results([(matches[("A", "B")], 1, 0)])
+    backend.delete_tournament(tournament_id)
+    # PostgreSQL deletes in the background
+    deadline = time.monotonic() + DELETE_TIMEOUT
+    while any(t["tournament_id"] == tournament_id for t in backend.get_tournaments()):
+        assert time.monotonic() < deadline, "tournament still present"
+        time.sleep(0.1)
+    assert backend.get_teams(tournament_id) == []
+    assert backend.get_matches(tournament_id) == []
+    assert backend.get_standings(tournament_id).empty
+    assert len(backend.get_teams(other_id)) == 4
@@ -0,0 +1,135 @@
+"""Chunked Teams / Matches CSV import on the SQLite engine.
+
+Small ``chunk_size`` values make rows land on both sides of a chunk
+boundary, so what one chunk learned (ids, duplicates) must carry over to
+the next.
+"""
+import io
+from datetime import date
+
+import pytest
+
+from sports_data import csv_import
+
+pytestmark = pytest.mark.parametrize("engine", ["sqlite"], indirect=True)
+
+
+def _csv(*lines):
+    return io.BytesIO(("\n".join(lines) + "\n").encode("utf-8"))
+
+
+def _rejects(report):
+    return [(line, reason) for line, reason, _ in report.rejected_samples]
+
+
+@pytest.fixture
+def cup(backend):
+    """Tournament "Cup" with teams A and B; returns its id."""
+    backend.add_tournament("Cup", date(2024, 1, 1), date(2024, 3, 31))
+    (tournament,) = backend.get_tournaments()
+    for name in "AB":
+        backend.add_team(tournament["tournament_id"], name)
+    return tournament["tournament_id"]
+
+
+def _team_names(backend, tournament_id):
+    return [t["name"] for t in backend.get_teams(tournament_id)]
+
+
+def test_header_picks_the_kind(backend):
+    assert csv_import.detect_kind([" Tournament_Name", "TEAM_NAME "]) == "teams"
+    assert csv_import.detect_kind(["tournament_name", "team1_name", "team2_name", "match_date", "notes"]) == "matches"
+    assert csv_import.detect_kind(["tournament", "team"]) is None
+    with pytest.raises(ValueError, match="CSV header"):
+        csv_import.import_csv(_csv("name,team", "Cup,A"))
+
+
+def test_team_rejections(backend, cup):
+    report = csv_import.import_csv(_csv(
+        "tournament_name,team_name",
+        "Cup,C",        # line 2
+        "Nope,D",       # unknown tournament
+        "Cup,",         # missing team name
+        "Cup,A",        # already in the database
+        "Cup,C",        # duplicate within the chunk
+        " Cup , E ",    # whitespace is trimmed
+    ), chunk_size=100)
+    assert report.kind == "teams"
+    assert (report.rows_read, report.inserted, report.rejected) == (6, 2, 4)
+    assert _rejects(report) == [
+        (3, "unknown tournament"), (4, "missing team name"), (5, "team already exists"), (6, "team already exists"),
+    ]
+    assert report.reasons == {"unknown tournament": 1, "missing team name": 1, "team already exists": 2}
+    assert _team_names(backend, cup) == ["A", "B", "C", "E"]
+
+
+def test_team_duplicates_across_chunks(backend, cup):
+    chunks = []
+    report = csv_import.import_csv(_csv(
+        "tournament_name,team_name",
+        "Cup,C", "Cup,D",           # chunk 1, lines 2-3
+        "Cup,E", "Cup,C",           # chunk 2: C came in chunk 1
+        "Nope,F", "Cup,D",          # chunk 3: Nope and D both remembered
+        "Cup,G",                    # chunk 4
+    ), chunk_size=2, progress=lambda r: chunks.append(r.rows_read))
+    assert chunks == [2, 4, 6, 7]
+    assert report.inserted == 4
+    assert _rejects(report) == [(5, "team already exists"), (6, "unknown tournament"), (7, "team already exists")]
+    assert _team_names(backend, cup) == ["A", "B", "C", "D", "E", "G"]
+    assert report.fraction_done == 1.0
+
+
+def test_match_rejections(backend, cup):
+    report = csv_import.import_csv(_csv(
+        "tournament_name,team1_name,team2_name,match_date",
+        "Cup,A,B,2024-01-05",       # line 2
+        "Nope,A,B,2024-01-06",      # unknown tournament
+        "Cup,A,Z,2024-01-07",       # unknown team
+        "Cup,A,A,2024-01-08",       # plays itself
+        "Cup,B,A,not a date",       # bad date
+        "Cup,B,A,",                 # missing date
+        "Cup,B,A,2024-01-09",
+    ))
+    assert report.kind == "matches"
+    assert (report.rows_read, report.inserted, report.rejected) == (7, 2, 5)
+    assert _rejects(report) == [
+        (3, "unknown tournament"), (4, "unknown team"), (5, "team plays itself"),
+        (6, "invalid match date"), (7, "invalid match date"),
+    ]
+    matches = backend.get_matches(cup)
+    assert sorted((m["team1_name"], m["team2_name"], m["match_date"]) for m in matches) == [
+        ("A", "B", date(2024, 1, 5)), ("B", "A", date(2024, 1, 9)),
+    ]
+
+
+def test_matches_resolve_names_across_chunks(backend, cup):
+    report = csv_import.import_csv(_csv(
+        "tournament_name,team1_name,team2_name,match_date",
+        "Cup,A,B,2024-01-05", "Cup,A,Q,2024-01-06",     # chunk 1
+        "Cup,B,A,2024-01-07", "Cup,Q,B,2024-01-08",     # chunk 2: A, B and Q already looked up
+        "Nope,A,B,2024-01-09",                          # chunk 3
+    ), chunk_size=2)
+    assert report.inserted == 2
+    assert _rejects(report) == [(3, "unknown team"), (5, "unknown team"), (6, "unknown tournament")]
+    assert len(backend.get_matches(cup)) == 2
+
+
+def test_rejected_rows_keep_their_values(backend, cup):
+    report = csv_import.import_csv(_csv("tournament_name,team_name", "Nope,Zed"))
+    assert report.rejected_samples == [(2, "unknown tournament", {"tournament_name": "Nope", "team_name": "Zed"})]
+
+
+def test_failed_chunk_rolls_back_alone(backend, cup, monkeypatch):
+    insert_teams = backend.insert_teams
+    calls = []
+
+    def failing_second_chunk(cursor, rows):
+        calls.append(rows)
+        if len(calls) == 2:
+            raise RuntimeError("disk full")
+        return insert_teams(cursor, rows)
+
+    monkeypatch.setattr(backend, "insert_teams", failing_second_chunk)
+    with pytest.raises(RuntimeError):
+        csv_import.import_csv(_csv("tournament_name,team_name", "Cup,C", "Cup,D", "Cup,E"), chunk_size=2)
+    assert _team_names(backend, cup) == ["A", "B", "C", "D"]
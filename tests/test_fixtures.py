@@ -0,0 +1,143 @@
+"""Fixture generation: pairings, brackets and the date scheduler.
+
+Pairings and schedules are checked as plain generators for a range of
+field sizes; the last tests insert through create_fixtures on each
+engine.
+"""
+from collections import Counter, defaultdict
+from datetime import date, timedelta
+from itertools import combinations
+
+import pytest
+
+from sports_data import fixtures
+
+FIELD_SIZES = range(2, 17)
+
+
+def _teams(n):
+    return [100 + i for i in range(n)]
+
+
+@pytest.mark.parametrize("n", FIELD_SIZES)
+def test_round_robin_pairs_meet_once_and_teams_once_per_round(n):
+    teams = _teams(n)
+    rounds = list(fixtures.round_robin(teams))
+    assert len(rounds) == (n - 1 if n % 2 == 0 else n)
+    for pairs in rounds:
+        playing = [team for pair in pairs for team in pair]
+        assert len(playing) == len(set(playing))
+    met = Counter(frozenset(pair) for pairs in rounds for pair in pairs)
+    assert set(met) == {frozenset(pair) for pair in combinations(teams, 2)}
+    assert set(met.values()) == {1}
+    assert sum(map(len, rounds)) == fixtures.fixture_count(n, "round_robin")
+
+
+@pytest.mark.parametrize("n", FIELD_SIZES)
+def test_round_robin_balances_home_and_away(n):
+    rounds = list(fixtures.round_robin(_teams(n)))
+    home = Counter(h for pairs in rounds for h, _ in pairs)
+    away = Counter(a for pairs in rounds for _, a in pairs)
+    for team in _teams(n):
+        assert abs(home[team] - away[team]) <= 1
+        venues = ["H" if pair[0] == team else "A" for pairs in rounds for pair in pairs if team in pair]
+        assert "HHH" not in "".join(venues) and "AAA" not in "".join(venues)
+
+
+@pytest.mark.parametrize("n", FIELD_SIZES)
+def test_double_round_robin_plays_each_fixture_both_ways(n):
+    rounds = list(fixtures.round_robin(_teams(n), legs=2))
+    played = Counter(pair for pairs in rounds for pair in pairs)
+    assert set(played) == {pair for pair in combinations(_teams(n), 2)} | {
+        (b, a) for a, b in combinations(_teams(n), 2)
+    }
+    assert set(played.values()) == {1}
+    assert sum(map(len, rounds)) == fixtures.fixture_count(n, "double_round_robin")
+
+
+def test_knockout_byes_go_to_top_seeds():
+    seeds = _teams(6)
+    (pairs,) = fixtures.knockout(seeds)
+    # Bracket of 8: seeds 1 and 2 wait for 8 and 7, who don't exist
+    assert pairs == [(seeds[3], seeds[4]), (seeds[2], seeds[5])]
+    assert len(pairs) == fixtures.fixture_count(6, "knockout")
+
+
+@pytest.mark.parametrize("n", range(2, 34))
+def test_knockout_first_round_fills_a_power_of_two_bracket(n):
+    (pairs,) = fixtures.knockout(_teams(n))
+    size = 1 << (n - 1).bit_length()
+    playing = [team for pair in pairs for team in pair]
+    assert len(playing) == len(set(playing))
+    assert len(pairs) == fixtures.fixture_count(n, "knockout") == n - size // 2
+    # Winners plus the teams with byes make the next, full round
+    assert len(pairs) + (n - len(playing)) == size // 2
+    byes = [team for team in _teams(n) if team not in playing]
+    assert byes == _teams(n)[:len(byes)]
+
+
+def test_schedule_respects_rest_days_capacity_and_round_order():
+    rounds = list(fixtures.round_robin(_teams(10)))
+    start = date(2024, 1, 1)
+    scheduled = list(fixtures.schedule(rounds, start, date(2024, 12, 31), rest_days=2, per_date=3))
+    assert len(scheduled) == 45
+
+    per_day = Counter(day for _, _, day in scheduled)
+    assert max(per_day.values()) <= 3
+    days = defaultdict(list)
+    for home, away, day in scheduled:
+        days[home].append(day)
+        days[away].append(day)
+    for team_days in days.values():
+        assert all(later - earlier >= timedelta(days=3) for earlier, later in zip(team_days, team_days[1:]))
+
+    # No match of a round before the previous round's first day
+    position = 0
+    previous_first = start
+    for pairs in rounds:
+        round_days = [day for _, _, day in scheduled[position:position + len(pairs)]]
+        assert min(round_days) >= previous_first
+        previous_first = min(round_days)
+        position += len(pairs)
+
+
+def test_schedule_packs_dates_without_constraints():
+    scheduled = list(fixtures.schedule(fixtures.round_robin(_teams(4)), date(2024, 1, 1), date(2024, 1, 3)))
+    assert sorted(day.day for _, _, day in scheduled) == [1, 1, 2, 2, 3, 3]
+
+
+def test_schedule_fails_when_the_window_is_too_short():
+    rounds = fixtures.round_robin(_teams(6))
+    with pytest.raises(ValueError, match="Not enough dates"):
+        list(fixtures.schedule(rounds, date(2024, 1, 1), date(2024, 1, 4), rest_days=1))
+
+
+@pytest.mark.parametrize("rest_days, per_date", [(-1, None), (0, 0)])
+def test_schedule_rejects_bad_settings(rest_days, per_date):
+    with pytest.raises(ValueError):
+        list(fixtures.schedule([], date(2024, 1, 1), date(2024, 1, 2), rest_days, per_date))
+
+
+def _tournament(backend, days, teams):
+    backend.add_tournament("League", date(2024, 1, 1), date(2024, 1, 1) + timedelta(days=days - 1))
+    (tournament,) = backend.get_tournaments()
+    for i in range(teams):
+        backend.add_team(tournament["tournament_id"], f"Team {i + 1}")
+    return tournament["tournament_id"]
+
+
+def test_create_fixtures_inserts_a_season(backend):
+    tournament_id = _tournament(backend, days=60, teams=6)
+    count, first, last = fixtures.create_fixtures(tournament_id, "double_round_robin", rest_days=1, per_date=2)
+    assert count == 30
+    matches = backend.get_matches(tournament_id)
+    assert len(matches) == 30
+    assert first == min(m["match_date"] for m in matches) == date(2024, 1, 1)
+    assert last == max(m["match_date"] for m in matches) <= date(2024, 2, 29)
+
+
+def test_create_fixtures_inserts_nothing_when_dates_run_out(backend):
+    tournament_id = _tournament(backend, days=3, teams=8)
+    with pytest.raises(ValueError, match="Not enough dates"):
+        fixtures.create_fixtures(tournament_id, "round_robin", per_date=2)
+    assert backend.get_matches(tournament_id) == []
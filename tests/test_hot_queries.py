@@ -0,0 +1,33 @@
+"""``python -m sports_data.migrate check`` on a generated data set.
+
+Every hot helper's own statement (migrate.HOT_QUERIES) must be
+servable from its index. PostgreSQL only: SQLite plans aren't checked.
+"""
+import pytest
+
+from benchmarks import generate
+from sports_data import analytics, db, migrate
+
+pytestmark = pytest.mark.parametrize("engine", ["postgres"], indirect=True)
+
+# (tournaments, teams per tournament, matches per tournament): enough
+# teams per tournament that paging and prefix search each have a clear
+# best index, small enough to load in a second or two
+DATA_SET = (20, 200, 1_000)
+
+
+@pytest.fixture
+def plans(engine):
+    generate.generate(*DATA_SET)
+    analytics.rebuild_analytics()
+    with db.cursor() as cursor:
+        cursor.execute("ANALYZE Points_Table, Team_Stats, Head_To_Head")
+    yield {label: (expected, used, ok) for label, expected, used, ok in migrate.check_indexes()}
+    with db.cursor() as cursor:
+        generate.reset(cursor)
+
+
+def test_hot_queries_use_their_indexes(plans):
+    misses = {label: (expected, used) for label, (expected, used, ok) in plans.items() if not ok}
+    assert misses == {}
+    assert set(plans) == {label for label, _, _ in migrate.HOT_QUERIES}
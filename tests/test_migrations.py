@@ -0,0 +1,9 @@
+"""Migration texts that have to agree with constants in the Python code."""
+import re
+
+from sports_data import analytics, migrate
+
+
+def test_analytics_backfill_uses_form_length():
+    (migration,) = [m for m in migrate.discover() if m.name == "analytics_rollups"]
+    assert [int(n) for n in re.findall(r"\brn <= (\d+)", migration.sql)] == [analytics.FORM_LENGTH]
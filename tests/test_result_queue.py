@@ -0,0 +1,166 @@
+"""The write-behind result queue against a temporary journal.
+
+The applier thread is not started: each test drains the journal itself
+with ``apply_batch``, so what is pending, applied, superseded or rejected
+is checked between batches. The journal logic doesn't depend on the
+engine, so these run on SQLite only.
+"""
+import sqlite3
+from datetime import date
+
+import pytest
+
+from sports_data import result_queue
+
+pytestmark = pytest.mark.parametrize("engine", ["sqlite"], indirect=True)
+
+
+@pytest.fixture
+def journal(backend, tmp_path, monkeypatch):
+    """result_queue on an empty journal of its own, applying to ``backend``."""
+    monkeypatch.setattr(result_queue, "PATH", str(tmp_path / "result_queue.db"))
+    monkeypatch.setattr(result_queue, "start", lambda: None)
+    return result_queue
+
+
+def _seed(backend):
+    """One tournament, teams A-D and three unscored matches; returns (tournament_id, [match_id])."""
+    backend.add_tournament("Cup", date(2024, 1, 1), date(2024, 3, 31))
+    (tournament,) = backend.get_tournaments()
+    tournament_id = tournament["tournament_id"]
+    for team in "ABCD":
+        backend.add_team(tournament_id, team)
+    teams = {t["name"]: t["team_id"] for t in backend.get_teams(tournament_id)}
+    for day, (home, away) in enumerate(["AB", "CD", "AC"], start=1):
+        backend.add_match(tournament_id, teams[home], teams[away], date(2024, 1, day))
+    return tournament_id, sorted(m["match_id"] for m in backend.get_matches(tournament_id))
+
+
+def _scores(backend, tournament_id):
+    return {m["match_id"]: (m["team1_score"], m["team2_score"]) for m in backend.get_matches(tournament_id)}
+
+
+def _statuses(journal):
+    return {
+        row["seq"]: row["status"]
+        for status in result_queue.STATUSES
+        for row in journal.entries(status)
+    }
+
+
+def test_submit_queues_without_touching_the_database(backend, journal):
+    tournament_id, (m1, m2, _) = _seed(backend)
+    seqs = journal.submit([(m1, 2, 1), (m2, 0, 0)], labels={m1: "A vs B"})
+    assert [row["seq"] for row in journal.entries()] == seqs
+    assert journal.entries()[0]["label"] == "A vs B"
+    assert journal.counts() == {"pending": 2, "applied": 0, "superseded": 0, "rejected": 0}
+    assert _scores(backend, tournament_id)[m1] == (None, None)
+
+
+def test_negative_scores_are_refused_at_submit(journal):
+    with pytest.raises(ValueError):
+        journal.submit([(1, -1, 0)])
+    assert journal.counts()["pending"] == 0
+
+
+def test_newer_score_supersedes_pending_one(backend, journal):
+    tournament_id, (m1, m2, _) = _seed(backend)
+    (old,) = journal.submit([(m1, 1, 0)])
+    other, new = journal.submit([(m2, 3, 3), (m1, 0, 2)])
+    assert _statuses(journal) == {old: "superseded", other: "pending", new: "pending"}
+
+    assert journal.apply_batch() == 2
+    assert _statuses(journal) == {old: "superseded", other: "applied", new: "applied"}
+    assert _scores(backend, tournament_id)[m1] == (0, 2)
+    assert journal.apply_batch() == 0
+
+
+def test_applied_score_is_not_superseded(backend, journal):
+    tournament_id, (m1, _, _) = _seed(backend)
+    (first,) = journal.submit([(m1, 1, 0)])
+    journal.drain()
+    (second,) = journal.submit([(m1, 1, 1)])
+    assert _statuses(journal) == {first: "applied", second: "pending"}
+    journal.drain()
+    assert _statuses(journal) == {first: "applied", second: "applied"}
+    assert _scores(backend, tournament_id)[m1] == (1, 1)
+
+
+def test_batches_follow_submission_order(backend, journal, monkeypatch):
+    tournament_id, matches = _seed(backend)
+    monkeypatch.setattr(result_queue, "BATCH_SIZE", 2)
+    seqs = journal.submit([(match_id, 1, 0) for match_id in matches])
+    assert journal.apply_batch() == 2
+    assert [row["seq"] for row in journal.entries()] == seqs[2:]
+    assert journal.drain() == 1
+    assert set(_scores(backend, tournament_id).values()) == {(1, 0)}
+
+
+def test_unknown_match_is_rejected(backend, journal):
+    tournament_id, (m1, _, _) = _seed(backend)
+    good, gone = journal.submit([(m1, 2, 0), (m1 + 1_000, 1, 1)])
+    assert journal.apply_batch() == 2
+    assert _statuses(journal) == {good: "applied", gone: "rejected"}
+    (rejected,) = journal.entries("rejected")
+    assert rejected["error"] == "match no longer exists"
+    assert _scores(backend, tournament_id)[m1] == (2, 0)
+
+
+def test_refused_values_are_bisected_out(backend, journal, monkeypatch):
+    tournament_id, (m1, m2, m3) = _seed(backend)
+    record_results = backend.record_results
+    calls = []
+
+    def refusing(results):
+        calls.append([match_id for match_id, _, _ in results])
+        if any(match_id == m2 for match_id, _, _ in results):
+            raise ValueError("score out of range")
+        return record_results(results)
+
+    monkeypatch.setattr(backend, "record_results", refusing)
+    s1, s2, s3 = journal.submit([(m1, 1, 0), (m2, 9, 9), (m3, 0, 1)])
+    assert journal.apply_batch() == 3
+
+    # The whole batch, then halves until m2 stands alone
+    assert calls == [[m1, m2, m3], [m1], [m2, m3], [m2], [m3]]
+    assert _statuses(journal) == {s1: "applied", s2: "rejected", s3: "applied"}
+    (rejected,) = journal.entries("rejected")
+    assert rejected["error"] == "score out of range"
+    scores = _scores(backend, tournament_id)
+    assert (scores[m1], scores[m2], scores[m3]) == ((1, 0), (None, None), (0, 1))
+
+
+def test_transient_error_leaves_batch_pending_for_retry(backend, journal, monkeypatch):
+    tournament_id, (m1, m2, _) = _seed(backend)
+    record_results = backend.record_results
+    failures = [sqlite3.OperationalError("database is locked")]
+
+    def flaky(results):
+        if failures:
+            raise failures.pop()
+        return record_results(results)
+
+    monkeypatch.setattr(backend, "record_results", flaky)
+    seqs = journal.submit([(m1, 1, 0), (m2, 2, 2)])
+    with pytest.raises(sqlite3.OperationalError):
+        journal.apply_batch()
+    pending = journal.entries()
+    assert [row["seq"] for row in pending] == seqs
+    assert [(row["attempts"], row["error"]) for row in pending] == [(1, "database is locked")] * 2
+    assert _scores(backend, tournament_id)[m1] == (None, None)
+
+    assert journal.apply_batch() == 2
+    applied = journal.entries("applied")
+    assert sorted(row["seq"] for row in applied) == seqs
+    assert {(row["attempts"], row["error"]) for row in applied} == {(2, None)}
+    assert _scores(backend, tournament_id)[m2] == (2, 2)
+
+
+def test_settled_entries_are_purged_after_keep_period(backend, journal, monkeypatch):
+    _, (m1, m2, _) = _seed(backend)
+    journal.submit([(m1, 1, 0)])
+    journal.drain()
+    monkeypatch.setattr(result_queue, "KEEP_APPLIED_SECONDS", 0)
+    (kept,) = journal.submit([(m2, 0, 1)])
+    journal.drain()
+    assert _statuses(journal) == {kept: "applied"}
@@ -0,0 +1,13 @@
+"""A short benchmarks.stress round per engine: no drift, no failed submissions.
+
+The full benchmark (``python -m benchmarks.stress``) runs longer and at
+more concurrency levels; this keeps the concurrency guarantees in CI.
+"""
+from benchmarks import stress
+
+
+def test_concurrent_scoring_leaves_no_drift(backend):
+    result = stress.run(backend, sessions=4, seconds=2, teams=6, legs=2, batch=2, hot_share=0.5)
+    assert result["submissions"] > 0
+    assert result["errors"] == {}
+    assert result["drift"] == 0